@@ -7,10 +7,18 @@ import json
 from datetime import datetime
 from modules.browser_config import (
     launch_selenium_browser,
-    detect_mobile_version_selenium
+    set_interceptors,
+    find_document_request,
+    summarize_served_document,
+    detect_mobile_version,
+    kill_browser,
+    reset_browser_state,
+    DEFAULT_PAGE_LOAD_TIMEOUT,
+    VIEWPORT_PROFILES
 )
 from modules.http_monitor import (
     intercept_requests_selenium,
+    serialize_request,
     save_requests
 )
 from modules.dom_analyzer import (
@@ -21,12 +29,34 @@ from modules.user_interactions import (
     simulate_user_interaction,
     simulate_navigation
 )
+from modules.page_settle import wait_for_page_settle
+from modules.dom_tracker import DomTracker
+from modules.deadline import AuditDeadline, AuditTimeout, DEFAULT_AUDIT_DEADLINE
+from modules.log_config import setup_logging, log_event, ProgressCounter
+from modules.response_cache import ResponseCache
+from modules.response_store import ResponseStore, get_store_dir
+from modules.request_blocker import BlockingPolicy, DEFAULT_BLOCKING_POLICY
+from modules.audit_pipeline import AuditPipeline, write_json
+from modules.job_queue import SQLiteJobQueue
+from modules.audit_worker import AuditWorker
+from modules.audit_service import create_app
+from modules.audit_diff import write_diff
+from modules.asset_index import (
+    AssetIndex,
+    AssetHashCache,
+    identify_assets,
+    merge_identified_versions
+)
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import TimeoutException
+import functools
 import threading
 import time
 import logging
+import multiprocessing
 
-# Configuration de base pour les logs
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Cache des empreintes de bibliothèques, partagé par les audits d'un même dossier de projets
+ASSET_CACHE_FILE = 'asset_cache.json'
 
 def parse_arguments():
     """
@@ -36,21 +66,56 @@ def parse_arguments():
         argparse.Namespace: Les arguments analysés.
     """
     parser = argparse.ArgumentParser(description='Bone Brocker - Web Auditor')
-    parser.add_argument('--url', required=True, help='URL à auditer (ex: https://www.google.com)')
+    parser.add_argument('--url', help='URL à auditer (ex: https://www.google.com)')
     parser.add_argument('--browser', choices=['firefox'], default='firefox', help='Navigateur à utiliser (seulement Firefox est supporté)')
     parser.add_argument('--mode', choices=['automatique', 'manuel'], default='automatique', help='Mode de navigation (automatique ou manuel)')
     parser.add_argument('--mobile', action='store_true', help='Activer l\'émulation mobile')
+    parser.add_argument('--viewports', default=None, help=f"Auditer en parallèle plusieurs profils d'affichage séparés par des virgules (ex: desktop,mobile). Profils : {', '.join(VIEWPORT_PROFILES)}")
+    parser.add_argument('--record', action='store_true', help='Enregistrer les réponses complètes dans le projet pour un rejeu ultérieur')
+    parser.add_argument('--replay', default=None, help='Rejouer l\'audit hors ligne depuis un projet enregistré (chemin du projet)')
+    parser.add_argument('--block-policy', default=None, help='Fichier JSON de politique de blocage des requêtes (mode automatique)')
+    parser.add_argument('--no-block', action='store_true', help='Désactiver le blocage des images, polices, médias et traceurs en mode automatique')
+    parser.add_argument('--asset-index', default=None, help='Index JSON des empreintes de bibliothèques connues (voir modules/asset_index.py)')
+    parser.add_argument('--analysis-processes', action='store_true', help='Analyser le DOM dans un processus séparé (pages volumineuses)')
+    parser.add_argument('--settle-idle-ms', type=int, default=None, help='Durée sans requête réseau en cours (ms) pour considérer la page stable')
+    parser.add_argument('--settle-timeout', type=float, default=None, help='Durée maximale d\'attente de stabilisation de la page (secondes)')
+    parser.add_argument('--deadline', type=float, default=None, help=f'Durée maximale de l\'audit en secondes (défaut : {DEFAULT_AUDIT_DEADLINE} en mode automatique, illimitée en mode manuel)')
+    parser.add_argument('--settle-dom', action='store_true', help='Attendre également l\'arrêt des mutations du DOM')
+    parser.add_argument('--queue', default=None, help='Base SQLite de la file de tâches partagée (audits distribués)')
+    parser.add_argument('--enqueue', action='store_true', help='Ajouter l\'audit de --url à la file --queue au lieu de l\'exécuter')
+    parser.add_argument('--priority', type=int, default=0, help='Priorité de la tâche ajoutée à la file')
+    parser.add_argument('--worker', action='store_true', help='Exécuter les audits de la file --queue')
+    parser.add_argument('--workers', type=int, default=1, help='Nombre de processus travailleurs locaux')
+    parser.add_argument('--results-dir', default='users', help='Dossier partagé où publier les projets des travailleurs')
+    parser.add_argument('--exit-when-empty', action='store_true', help='Arrêter les travailleurs quand la file est vide')
+    parser.add_argument('--serve', action='store_true', help='Démarrer le service HTTP d\'audit')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse d\'écoute du service HTTP')
+    parser.add_argument('--port', type=int, default=5000, help='Port d\'écoute du service HTTP')
+    parser.add_argument('--max-concurrency', type=int, default=2, help='Nombre maximal d\'audits simultanés du service HTTP')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Niveau minimal des logs')
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text', help='Format des logs sur la console (texte ou JSON Lines)')
+    parser.add_argument('--log-file', default=None, help='Fichier de logs structurés (JSON Lines)')
+    parser.add_argument('--log-request-rate', type=float, default=20, help='Nombre maximal de requêtes journalisées par seconde (0 : pas de limite)')
+    parser.add_argument('--quiet', action='store_true', help='N\'afficher que les avertissements, les erreurs et des compteurs d\'avancement')
+    parser.add_argument('--diff', nargs=2, metavar=('ANCIEN', 'NOUVEAU'), default=None, help='Comparer deux projets d\'audit (technologies et requêtes capturées)')
+    parser.add_argument('--diff-output', default=None, help='Fichier JSON Lines de la comparaison (sortie standard par défaut)')
     args = parser.parse_args()
+    if not args.url and not (args.worker or args.serve or args.diff):
+        parser.error("--url est obligatoire (sauf avec --worker, --serve ou --diff).")
+    if (args.enqueue or args.worker) and not args.queue:
+        parser.error("--queue est obligatoire avec --enqueue et --worker.")
     return args
 
-def create_project_directory():
+def create_project_directory(base_dir='users'):
     """
     Crée un répertoire unique pour stocker les résultats de l'audit.
 
+    Args:
+        base_dir (str): Répertoire contenant les projets.
+
     Returns:
         str: Le chemin du répertoire créé.
     """
-    base_dir = 'users'
     if not os.path.exists(base_dir):
         os.makedirs(base_dir)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -70,6 +135,22 @@ def update_state_json(project_dir, audit_info):
     with open(state_file, 'w', encoding='utf-8') as f:
         json.dump(audit_info, f, indent=4, ensure_ascii=False)
 
+def report_progress(progress_callback, phase, **data):
+    """
+    Signale l'avancement de l'audit (phase courante, requête capturée...).
+
+    Args:
+        progress_callback (callable): Fonction f(phase, data) ou None.
+        phase (str): Nom de la phase ('launch', 'load', 'analysis', 'request'...).
+        **data: Détails de l'événement.
+    """
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(phase, data)
+    except Exception as e:
+        logging.error(f"Erreur lors du signalement de l'avancement : {e}")
+
 def monitor_requests(driver, requests_file, stop_event):
     """
     Surveille les requêtes HTTP/HTTPS en temps réel et les sauvegarde dans un fichier JSON.
@@ -82,27 +163,15 @@ def monitor_requests(driver, requests_file, stop_event):
     print("Début de la surveillance des requêtes HTTP/HTTPS...")
     logging.info("Début de la surveillance des requêtes HTTP/HTTPS...")
     processed_requests = set()
+    # Compteur affiché en mode silencieux à la place d'une ligne par requête
+    progress = ProgressCounter('Requêtes capturées')
 
     while not stop_event.is_set():
         try:
             for request in driver.requests:
                 if request.response and request.url not in processed_requests:
                     processed_requests.add(request.url)
-                    # Tenter d'accéder aux cookies via 'cookies' attribut
-                    try:
-                        cookies = request.response.cookies
-                    except AttributeError:
-                        # Si 'cookies' n'existe pas, récupérer via 'Set-Cookie' header
-                        set_cookie = request.response.headers.get('Set-Cookie', '')
-                        cookies = set_cookie if set_cookie else ''
-                    data = {
-                        'url': request.url,
-                        'method': request.method,
-                        'status_code': request.response.status_code,
-                        'request_headers': dict(request.headers),
-                        'response_headers': dict(request.response.headers),
-                        'cookies': cookies
-                    }
+                    data = serialize_request(request)
 
                     # Lire les requêtes déjà sauvegardées
                     with open(requests_file, 'r', encoding='utf-8') as f:
@@ -118,34 +187,296 @@ def monitor_requests(driver, requests_file, stop_event):
                     with open(requests_file, 'w', encoding='utf-8') as f:
                         json.dump(existing_data, f, indent=4, ensure_ascii=False)
 
-                    print(f"Nouvelle requête capturée : {request.url}")
-                    logging.info(f"Nouvelle requête capturée : {request.url}")
+                    # Journalisation échantillonnée et écrite en arrière-plan (voir modules.log_config)
+                    log_event('request', "Nouvelle requête capturée : %s", request.url,
+                              method=data['method'], url=request.url, status_code=data['status_code'])
+                    progress.increment()
             time.sleep(1)  # Pause pour éviter une surcharge CPU
         except Exception as e:
             print(f"Erreur lors de la surveillance des requêtes : {e}")
             logging.error(f"Erreur lors de la surveillance des requêtes : {e}")
             break
+    progress.close()
     print("Fin de la surveillance des requêtes.")
     logging.info("Fin de la surveillance des requêtes.")
 
-def run_selenium_audit(url, mode, mobile, project_dir):
+def build_settle_options(args):
+    """
+    Construit les options de stabilisation de la page à partir des arguments.
+
+    Args:
+        args (argparse.Namespace): Les arguments analysés.
+
+    Returns:
+        dict: Options de stabilisation (voir modules.page_settle).
+    """
+    return {
+        'idle_ms': args.settle_idle_ms,
+        'timeout': args.settle_timeout,
+        'wait_dom': args.settle_dom
+    }
+
+def build_blocking_policy(args):
+    """
+    Construit la politique de blocage des requêtes à partir des arguments.
+
+    Le blocage n'est appliqué qu'en mode automatique : en mode manuel,
+    l'utilisateur doit voir la page complète.
+
+    Args:
+        args (argparse.Namespace): Les arguments analysés.
+
+    Returns:
+        BlockingPolicy: La politique de blocage, ou None si elle est désactivée.
+    """
+    if args.mode != 'automatique' or args.no_block:
+        return None
+    if args.block_policy:
+        return BlockingPolicy.from_file(args.block_policy)
+    return BlockingPolicy.from_dict(DEFAULT_BLOCKING_POLICY)
+
+def describe_blocking(blocking_policy):
+    """
+    Résume la politique de blocage appliquée pour state.json.
+    """
+    if blocking_policy is None:
+        return None
+    return {
+        'policy': blocking_policy.to_dict(),
+        'blocked_requests': blocking_policy.blocked_count
+    }
+
+def build_interceptors(url, response_cache=None, response_store=None, replay=False, blocking_policy=None,
+                       profile=None):
+    """
+    Construit les intercepteurs Selenium Wire de l'audit.
+
+    Args:
+        url (str): URL auditée.
+        response_cache (ResponseCache): Cache de réponses partagé (optionnel).
+        response_store (ResponseStore): Enregistrement des réponses (optionnel).
+        replay (bool): Rejouer l'enregistrement au lieu d'enregistrer.
+        blocking_policy (BlockingPolicy): Politique de blocage des requêtes (optionnel).
+        profile (str): Profil d'affichage du navigateur (identifie le navigateur auprès du cache
+            et de l'enregistrement).
+
+    Returns:
+        tuple: (intercepteurs de requêtes, intercepteurs de réponses).
+    """
+    request_interceptors = []
+    response_interceptors = []
+    # Le blocage passe en premier : une requête bloquée n'est servie ni par le rejeu ni par
+    # le cache, et sa réponse vide n'est pas enregistrée (voir ResponseStore.response_interceptor)
+    if blocking_policy:
+        request_interceptors.append(blocking_policy.create_interceptor(url))
+    if response_store:
+        store_request_interceptor, store_response_interceptor = response_store.create_interceptors(profile)
+    if response_store and replay:
+        request_interceptors.append(store_request_interceptor)
+    if response_cache:
+        cache_request_interceptor, cache_response_interceptor = response_cache.create_interceptors(profile)
+        request_interceptors.append(cache_request_interceptor)
+        response_interceptors.append(cache_response_interceptor)
+    if response_store and not replay:
+        response_interceptors.append(store_response_interceptor)
+    return request_interceptors, response_interceptors
+
+def describe_recording(response_store, replay):
+    """
+    Résume l'enregistrement utilisé par l'audit pour state.json.
+    """
+    if response_store is None:
+        return None
+    return {
+        'mode': 'replay' if replay else 'record',
+        'store': response_store.store_dir,
+        'stats': dict(response_store.stats)
+    }
+
+def get_technologies(dom_analysis_future):
+    """
+    Retourne les technologies détectées par l'analyse du DOM en arrière-plan,
+    sans propager d'erreur (sauvegarde des résultats partiels).
+
+    Args:
+        dom_analysis_future (concurrent.futures.Future): Tâche d'analyse du DOM (ou None).
+
+    Returns:
+        dict: Technologies détectées, ou un dictionnaire vide si l'analyse n'a pas abouti.
+    """
+    if dom_analysis_future is None:
+        return {}
+    try:
+        technologies_detected = dom_analysis_future.result()['technologies']
+    except Exception as e:
+        logging.error(f"Erreur lors de l'analyse du DOM : {e}")
+        return {}
+    return technologies_detected
+
+def merge_library_versions(technologies_detected, identified_assets, asset_cache=None):
+    """
+    Complète les technologies détectées avec les bibliothèques identifiées par empreinte.
+
+    Args:
+        technologies_detected (dict): Technologies détectées dans le DOM.
+        identified_assets (list): Bibliothèques identifiées (voir identify_assets).
+        asset_cache (AssetHashCache): Cache persistant des identifications à sauvegarder (optionnel).
+
+    Returns:
+        tuple: (technologies complétées, bibliothèques identifiées).
+    """
+    if asset_cache:
+        asset_cache.save()
+    logging.info(f"{len(identified_assets)} bibliothèques identifiées par empreinte.")
+    return merge_identified_versions(technologies_detected, identified_assets), identified_assets
+
+def submit_served_snapshot(driver, pipeline):
+    """
+    Lance le résumé du contenu servi dans l'étage d'analyse du pipeline : seules
+    la lecture de l'URL finale et la recherche du document occupent le navigateur.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+        pipeline (AuditPipeline): Pipeline de l'audit.
+
+    Returns:
+        concurrent.futures.Future: Résumé du contenu servi, ou None en cas d'échec.
+    """
+    try:
+        request = find_document_request(driver)
+        return pipeline.analysis.submit(
+            pipeline.run_cpu_bound, summarize_served_document,
+            driver.current_url, request.response if request else None
+        )
+    except Exception as e:
+        logging.error(f"Erreur lors de la capture du contenu servi : {e}")
+        return None
+
+def get_served_content(served_future):
+    """
+    Retourne le résumé du contenu servi, sans propager d'erreur : un document
+    illisible ne doit pas faire échouer l'audit.
+
+    Args:
+        served_future (concurrent.futures.Future): Tâche de résumé (ou None).
+
+    Returns:
+        dict: Résumé du contenu servi, ou None.
+    """
+    if served_future is None:
+        return None
+    try:
+        return served_future.result()
+    except Exception:
+        # Erreur déjà journalisée par l'étage d'analyse
+        return None
+
+def run_selenium_audit(url, mode, mobile, project_dir, settle_options=None, profile=None, response_cache=None,
+                       response_store=None, replay=False, blocking_policy=None, asset_index=None, asset_cache=None,
+                       analysis_processes=False, driver=None, progress_callback=None, deadline_seconds=None,
+                       cancel_event=None, capture_served=False):
     """
     Exécute l'audit web en utilisant Selenium avec Firefox.
 
+    L'audit dispose d'un budget de temps réparti entre ses phases (chargement,
+    analyse, interactions, capture). À l'échéance, le navigateur est tué et les
+    résultats partiels sont sauvegardés avec le statut 'timed_out'.
+
     Args:
         url (str): URL à auditer.
         mode (str): Mode de navigation ('automatique' ou 'manuel').
         mobile (bool): Activer l'émulation mobile si True.
         project_dir (str): Chemin du répertoire du projet utilisateur.
+        settle_options (dict): Options de stabilisation de la page (optionnel).
+        profile (str): Profil d'affichage (voir VIEWPORT_PROFILES, optionnel).
+        response_cache (ResponseCache): Cache de réponses partagé entre navigateurs (optionnel).
+        response_store (ResponseStore): Enregistrement des réponses (optionnel).
+        replay (bool): Rejouer 'response_store' hors ligne au lieu de l'alimenter.
+        blocking_policy (BlockingPolicy): Politique de blocage des requêtes (optionnel).
+        asset_index (AssetIndex): Index des empreintes de bibliothèques connues (optionnel).
+        asset_cache (AssetHashCache): Cache persistant des identifications (optionnel).
+        analysis_processes (bool): Analyser le DOM dans un processus séparé plutôt qu'un thread.
+        driver (webdriver.Firefox): Navigateur déjà lancé à réutiliser (optionnel) ; il
+            n'est alors pas fermé à la fin de l'audit, et ses intercepteurs sont détachés.
+            Son propriétaire efface son état entre deux audits (voir reset_browser_state).
+        progress_callback (callable): Fonction f(phase, data) notifiée de l'avancement (optionnel).
+        deadline_seconds (float): Durée maximale de l'audit (défaut : DEFAULT_AUDIT_DEADLINE
+            en mode automatique, illimitée en mode manuel).
+        cancel_event (threading.Event): Événement d'annulation de l'audit (optionnel).
+        capture_served (bool): Résumer le contenu servi, pour comparer les profils
+            d'affichage (voir run_multi_viewport_audit).
+
+    Returns:
+        dict: Informations de l'audit sauvegardées dans state.json.
     """
+    audit_info = None
+    identified_assets = []
+    dom_analysis_future = None
+    served_future = None
+    dom_tracker = None
+    if deadline_seconds is None and mode == 'automatique':
+        deadline_seconds = DEFAULT_AUDIT_DEADLINE
+    audit_deadline = AuditDeadline(deadline_seconds, cancel_event=cancel_event)
+    # Requêtes capturées au moment d'une interruption (résultats partiels)
+    partial_requests = []
+    request_interceptors, response_interceptors = build_interceptors(
+        url, response_cache, response_store, replay, blocking_policy, profile
+    )
+    if progress_callback is not None:
+        # Chaque requête est signalée dès l'arrivée de sa réponse (flux SSE du service)
+        response_interceptors.append(
+            lambda request, response: report_progress(progress_callback, 'request', request=serialize_request(request))
+        )
+    # L'analyse du DOM et les écritures sur disque s'exécutent en parallèle du navigateur
+    pipeline = AuditPipeline(use_processes=analysis_processes)
+    owns_driver = driver is None
+
+    def interrupt_audit():
+        # Relever les requêtes déjà capturées avant de tuer le navigateur
+        try:
+            partial_requests[:] = intercept_requests_selenium(driver)
+        except Exception as e:
+            logging.error(f"Erreur lors de la sauvegarde des requêtes capturées : {e}")
+        if driver is not None:
+            kill_browser(driver)
+
     try:
-        print(f"Lancement de Selenium Firefox en mode {mode}...")
-        logging.info(f"Lancement de Selenium Firefox en mode {mode}...")
-        # Lancer Firefox via Selenium
-        driver = launch_selenium_browser(browser_name='firefox', mode=mode, mobile=mobile)
+        audit_deadline.start_phase('load')
+        report_progress(progress_callback, 'launch', mode=mode, profile=profile)
+        if owns_driver:
+            print(f"Lancement de Selenium Firefox en mode {mode}...")
+            logging.info(f"Lancement de Selenium Firefox en mode {mode}...")
+            # Lancer Firefox via Selenium
+            driver = launch_selenium_browser(
+                browser_name='firefox',
+                mode=mode,
+                mobile=mobile,
+                profile=profile,
+                request_interceptors=request_interceptors,
+                response_interceptors=response_interceptors,
+                offline=replay
+            )
+        else:
+            # Navigateur réutilisé (état effacé par son propriétaire) : capture vide avec
+            # les intercepteurs de cet audit
+            del driver.requests
+            set_interceptors(driver, request_interceptors, response_interceptors)
+        # Le chien de garde tue le navigateur si l'audit dépasse son budget
+        audit_deadline.watch(interrupt_audit)
         print(f"Naviguer vers l'URL : {url}")
         logging.info(f"Naviguer vers l'URL : {url}")
-        driver.get(url)
+        report_progress(progress_callback, 'load', url=url)
+        audit_deadline.check()
+        driver.set_page_load_timeout(max(1, min(DEFAULT_PAGE_LOAD_TIMEOUT, audit_deadline.remaining())))
+        try:
+            driver.get(url)
+        except TimeoutException:
+            audit_deadline.check()
+            # Chargement interrompu par Firefox : l'audit se poursuit sur la page partielle
+            logging.warning(f"Chargement de {url} interrompu (délai de chargement dépassé).")
+        # Attendre que la page soit réellement chargée (réseau inactif et document complet)
+        wait_for_page_settle(driver, settle_options, audit_deadline)
+        report_progress(progress_callback, 'settled', title=driver.title)
         title = driver.title
         print(f"Titre de la page : {title}")
         logging.info(f"Titre de la page : {title}")
@@ -159,53 +490,95 @@ def run_selenium_audit(url, mode, mobile, project_dir):
         else:
             logging.info(f"Page chargée avec le titre : {title}")
 
-        # Analyse du DOM et détection des technologies
+        audit_deadline.start_phase('analysis')
+        if capture_served:
+            # Résumé du contenu réellement servi (comparaison entre profils d'affichage)
+            served_future = submit_served_snapshot(driver, pipeline)
+
+        # Analyse du DOM et détection des technologies, en arrière-plan
         logging.info("Analyse du DOM et détection des technologies utilisées...")
+        report_progress(progress_callback, 'analysis')
+        # Suivre ensuite les modifications du DOM étape par étape (deltas uniquement)
+        dom_tracker = DomTracker(driver)
+        dom_tracker.install()
         html_content = driver.page_source
-        dom_analysis = analyze_page(url, html_content)
-        technologies_detected = dom_analysis['technologies']
-        logging.info(f"Technologies détectées : {technologies_detected}")
+        dom_analysis_future = pipeline.analysis.submit(pipeline.run_cpu_bound, analyze_page, url, html_content)
 
-        # Sauvegarder les résultats de l'analyse du DOM
+        # Sauvegarder les résultats de l'analyse du DOM dès qu'ils sont disponibles
         dom_analysis_file = os.path.join(project_dir, 'dom_analysis.json')
-        with open(dom_analysis_file, 'w', encoding='utf-8') as f:
-            json.dump(dom_analysis, f, indent=4, ensure_ascii=False)
-        logging.info("Analyse du DOM sauvegardée dans dom_analysis.json.")
+        pipeline.save_json_when_done(dom_analysis_future, dom_analysis_file)
 
         if mode == 'automatique':
             print("Simuler des interactions utilisateur...")
             logging.info("Simuler des interactions utilisateur...")
+            report_progress(progress_callback, 'interactions')
+            audit_deadline.start_phase('interactions')
             # Simuler des interactions utilisateur
-            simulate_user_interaction(driver)
-            simulate_navigation(driver)
+            simulate_user_interaction(driver, settle_options, dom_tracker, audit_deadline)
+            simulate_navigation(driver, settle_options, dom_tracker, audit_deadline)
+            pipeline.io.submit(write_json, os.path.join(project_dir, 'dom_changes.json'), dom_tracker.steps)
 
             print("Capture des requêtes HTTP/HTTPS...")
             logging.info("Capture des requêtes HTTP/HTTPS...")
             # Capturer les requêtes HTTP/HTTPS
+            audit_deadline.start_phase('capture')
+            captured_requests = driver.requests
             requests_data = intercept_requests_selenium(driver)
             assert isinstance(requests_data, list), "Les requêtes capturées doivent être une liste"
             print(f"{len(requests_data)} requêtes capturées.")
             logging.info(f"{len(requests_data)} requêtes capturées.")
+            report_progress(progress_callback, 'capture', count=len(requests_data))
 
             print("Sauvegarde des requêtes dans un fichier JSON...")
             logging.info("Sauvegarde des requêtes dans un fichier JSON...")
             # Sauvegarder les requêtes dans un fichier JSON
-            save_requests(project_dir, requests_data)
+            pipeline.io.submit(save_requests, project_dir, requests_data)
+
+            # Identifier les versions exactes des bibliothèques capturées
+            identification_future = None
+            if asset_index:
+                identification_future = pipeline.analysis.submit(
+                    identify_assets, captured_requests, asset_index, asset_cache
+                )
 
-            # Fermer le navigateur
-            driver.quit()
+            # Fermer le navigateur pendant que l'analyse et les écritures se terminent
+            audit_deadline.check()
+            audit_deadline.finish()
+            if owns_driver:
+                driver.quit()
             print("Test Selenium Firefox réussi.")
             logging.info("Test Selenium Firefox réussi.")
 
+            report_progress(progress_callback, 'save')
+            pipeline.close()
+            technologies_detected = dom_analysis_future.result()['technologies']
+            # Technologies apparues au fil des interactions (chargements dynamiques, navigation)
+            for name, version in dom_tracker.technologies.items():
+                technologies_detected.setdefault(name, version)
+            logging.info(f"Technologies détectées : {technologies_detected}")
+            if identification_future:
+                try:
+                    technologies_detected, identified_assets = merge_library_versions(
+                        technologies_detected, identification_future.result(), asset_cache
+                    )
+                except Exception as e:
+                    logging.error(f"Erreur lors de l'identification des bibliothèques : {e}")
+
             # Sauvegarder les informations de l'audit
             audit_info = {
                 'url': url,
                 'browser': 'firefox',
                 'mode': mode,
                 'mobile': mobile,
+                'profile': profile,
                 'timestamp': datetime.now().isoformat(),
                 'technologies_detected': technologies_detected,
-                'interactions': 'Simulées automatiquement'
+                'identified_assets': identified_assets,
+                'served_content': get_served_content(served_future),
+                'recording': describe_recording(response_store, replay),
+                'blocking': describe_blocking(blocking_policy),
+                'interactions': 'Simulées automatiquement',
+                'status': 'completed'
             }
             update_state_json(project_dir, audit_info)
             print("Informations de l'audit sauvegardées dans state.json.")
@@ -217,6 +590,9 @@ def run_selenium_audit(url, mode, mobile, project_dir):
             print("La capture des requêtes commencera en arrière-plan.")
             logging.info("La capture des requêtes commencera en arrière-plan.")
 
+            # La session manuelle est la phase de capture : elle dispose de tout le temps restant
+            audit_deadline.start_phase('capture')
+
             # Créer un fichier pour les requêtes
             requests_file = os.path.join(project_dir, 'requests.log')
             with open(requests_file, 'w', encoding='utf-8') as f:
@@ -224,7 +600,9 @@ def run_selenium_audit(url, mode, mobile, project_dir):
 
             # Démarrer un thread pour surveiller les requêtes
             stop_event = threading.Event()
-            monitor_thread = threading.Thread(target=monitor_requests, args=(driver, requests_file, stop_event))
+            monitor_thread = threading.Thread(
+                target=monitor_requests, args=(driver, requests_file, stop_event)
+            )
             monitor_thread.start()
 
             try:
@@ -242,7 +620,11 @@ def run_selenium_audit(url, mode, mobile, project_dir):
                         logging.info("Navigateur fermé par l'utilisateur.")
                         break
 
-                    time.sleep(1)
+                    # Attente interrompue dès l'échéance de l'audit ou son annulation
+                    if audit_deadline.wait(1):
+                        print("Durée maximale de l'audit atteinte.")
+                        audit_deadline.expire()
+                        break
             except KeyboardInterrupt:
                 print("Interruption par l'utilisateur.")
                 logging.info("Interruption par l'utilisateur.")
@@ -250,44 +632,344 @@ def run_selenium_audit(url, mode, mobile, project_dir):
                 # Signaler au thread de surveiller d'arrêter
                 stop_event.set()
                 monitor_thread.join()
+                audit_deadline.finish()
+
+                # Identifier les versions exactes des bibliothèques capturées
+                identification_future = None
+                if asset_index:
+                    identification_future = pipeline.analysis.submit(
+                        identify_assets, driver.requests, asset_index, asset_cache
+                    )
 
                 # Fermer le navigateur si ce n'est pas déjà fait
-                if hasattr(driver.service, 'process') and driver.service.process.poll() is None:
+                if owns_driver and hasattr(driver.service, 'process') and driver.service.process.poll() is None:
                     driver.quit()
                     logging.info("Navigateur fermé par le script.")
                 print("Audit manuel terminé.")
                 logging.info("Audit manuel terminé.")
 
+                report_progress(progress_callback, 'save')
+                pipeline.close()
+                technologies_detected = dom_analysis_future.result()['technologies']
+                logging.info(f"Technologies détectées : {technologies_detected}")
+                if identification_future:
+                    try:
+                        technologies_detected, identified_assets = merge_library_versions(
+                            technologies_detected, identification_future.result(), asset_cache
+                        )
+                    except Exception as e:
+                        logging.error(f"Erreur lors de l'identification des bibliothèques : {e}")
+
                 # Sauvegarder les informations de l'audit
                 audit_info = {
                     'url': url,
                     'browser': 'firefox',
                     'mode': mode,
                     'mobile': mobile,
+                    'profile': profile,
                     'timestamp': datetime.now().isoformat(),
                     'technologies_detected': technologies_detected,
-                    'interactions': 'Simulées manuellement'
+                    'identified_assets': identified_assets,
+                    'served_content': get_served_content(served_future),
+                    'recording': describe_recording(response_store, replay),
+                    'blocking': describe_blocking(blocking_policy),
+                    'interactions': 'Simulées manuellement',
+                    'status': ('cancelled' if audit_deadline.cancelled else 'timed_out') if audit_deadline.timed_out else 'completed'
                 }
                 update_state_json(project_dir, audit_info)
                 print("Informations de l'audit sauvegardées dans state.json.")
                 logging.info("Informations de l'audit sauvegardées dans state.json.")
 
     except Exception as e:
-        logging.error(f"Erreur lors de l'audit Selenium : {e}")
-        print(f"Erreur lors de l'audit Selenium : {e}")
+        timed_out = isinstance(e, AuditTimeout) or audit_deadline.timed_out
+        if timed_out:
+            # Navigateur tué par le chien de garde (ou ici, si l'échéance a été détectée avant)
+            audit_deadline.expire()
+            status = 'cancelled' if audit_deadline.cancelled else 'timed_out'
+            logging.warning(f"Audit interrompu ({status}) pendant la phase '{audit_deadline.phase}' : {e}")
+            print(f"Audit interrompu pendant la phase '{audit_deadline.phase}' : {e}")
+        else:
+            status = 'error'
+            logging.error(f"Erreur lors de l'audit Selenium : {e}")
+            print(f"Erreur lors de l'audit Selenium : {e}")
+            if owns_driver and driver is not None:
+                kill_browser(driver)
+        audit_deadline.finish()
+        pipeline.close()
+        if partial_requests:
+            save_requests(project_dir, partial_requests)
+        technologies_detected = get_technologies(dom_analysis_future)
+        if dom_tracker is not None:
+            for name, version in dom_tracker.technologies.items():
+                technologies_detected.setdefault(name, version)
         # Optionnel : sauvegarder les informations d'audit en cas d'échec
         audit_info = {
             'url': url,
             'browser': 'firefox',
             'mode': mode,
             'mobile': mobile,
+            'profile': profile,
             'timestamp': datetime.now().isoformat(),
-            'technologies_detected': technologies_detected if 'technologies_detected' in locals() else {},
-            'interactions': 'Erreur durant l\'audit'
+            'technologies_detected': technologies_detected,
+            'identified_assets': identified_assets,
+            'served_content': get_served_content(served_future),
+            'recording': describe_recording(response_store, replay),
+            'blocking': describe_blocking(blocking_policy),
+            'interactions': 'Interrompues (délai dépassé)' if timed_out else 'Erreur durant l\'audit',
+            'status': status,
+            'error': str(e)
         }
+        if timed_out:
+            audit_info['timeout'] = {
+                'phase': audit_deadline.phase,
+                'deadline': deadline_seconds,
+                'captured_requests': len(partial_requests)
+            }
         update_state_json(project_dir, audit_info)
         print("Informations de l'audit sauvegardées dans state.json malgré l'erreur.")
         logging.info("Informations de l'audit sauvegardées dans state.json malgré l'erreur.")
+    if not owns_driver and driver is not None:
+        # Les requêtes d'arrière-plan de la dernière page ne doivent plus alimenter cet audit
+        # (progression, cache, enregistrement) une fois terminé
+        set_interceptors(driver)
+    report_progress(progress_callback, 'done', status=audit_info['status'])
+    return audit_info
+
+def run_multi_viewport_audit(url, profiles, project_dir, settle_options=None, response_store=None, replay=False,
+                             blocking_policy=None, asset_index=None, asset_cache=None, deadline_seconds=None):
+    """
+    Audite une même URL sous plusieurs profils d'affichage en parallèle.
+
+    Les navigateurs partagent un cache local de réponses : une ressource identique
+    n'est téléchargée qu'une seule fois. Les résultats de chaque profil sont
+    sauvegardés côte à côte dans un sous-dossier du projet.
+
+    Args:
+        url (str): URL à auditer.
+        profiles (list): Noms des profils d'affichage (voir VIEWPORT_PROFILES).
+        project_dir (str): Chemin du répertoire du projet utilisateur.
+        settle_options (dict): Options de stabilisation de la page (optionnel).
+        response_store (ResponseStore): Enregistrement des réponses partagé par les profils (optionnel).
+        replay (bool): Rejouer 'response_store' hors ligne au lieu de l'alimenter.
+        blocking_policy (BlockingPolicy): Politique de blocage partagée par les profils (optionnel).
+        asset_index (AssetIndex): Index des empreintes de bibliothèques connues (optionnel).
+        asset_cache (AssetHashCache): Cache persistant des identifications (optionnel).
+        deadline_seconds (float): Durée maximale de l'audit de chaque profil (optionnel).
+
+    Returns:
+        dict: Synthèse de l'audit multi-profils sauvegardée dans state.json.
+    """
+    for profile in profiles:
+        if profile not in VIEWPORT_PROFILES:
+            raise ValueError(f"Profil d'affichage non supporté : {profile}. Choisissez parmi {list(VIEWPORT_PROFILES)}.")
+
+    response_cache = ResponseCache()
+    print(f"Audit en parallèle des profils : {', '.join(profiles)}")
+    logging.info(f"Audit en parallèle des profils : {', '.join(profiles)}")
+
+    with ThreadPoolExecutor(max_workers=len(profiles)) as executor:
+        futures = {}
+        for profile in profiles:
+            profile_dir = os.path.join(project_dir, profile)
+            os.makedirs(profile_dir, exist_ok=True)
+            futures[profile] = executor.submit(
+                run_selenium_audit, url, 'automatique', profile == 'mobile', profile_dir,
+                settle_options, profile, response_cache, response_store, replay, blocking_policy,
+                asset_index, asset_cache, deadline_seconds=deadline_seconds, capture_served=True
+            )
+        results = {profile: future.result() for profile, future in futures.items()}
+
+    audit_info = {
+        'url': url,
+        'browser': 'firefox',
+        'mode': 'automatique',
+        'profiles': {
+            profile: {
+                'directory': profile,
+                'status': result['status'] if result else None,
+                'technologies_detected': result['technologies_detected'] if result else {},
+                'served_content': result.get('served_content') if result else None
+            }
+            for profile, result in results.items()
+        },
+        'response_cache': dict(response_cache.stats),
+        'recording': describe_recording(response_store, replay),
+        'blocking': describe_blocking(blocking_policy),
+        'timestamp': datetime.now().isoformat()
+    }
+
+    # Comparaison du contenu servi aux profils mobile et desktop
+    mobile_content = audit_info['profiles'].get('mobile', {}).get('served_content')
+    desktop_content = audit_info['profiles'].get('desktop', {}).get('served_content')
+    if mobile_content and desktop_content:
+        audit_info['mobile_version'] = detect_mobile_version(mobile_content, desktop_content)
+        logging.info(f"Version mobile distincte : {audit_info['mobile_version']['is_mobile_version']}")
+
+    update_state_json(project_dir, audit_info)
+    print(f"Cache local : {response_cache.stats['hits']} réponses partagées entre profils.")
+    logging.info(f"Cache local : {response_cache.stats}")
+    return audit_info
+
+def build_job_payload(args):
+    """
+    Construit les paramètres d'une tâche d'audit distribuée à partir des arguments.
+
+    Args:
+        args (argparse.Namespace): Les arguments analysés.
+
+    Returns:
+        dict: Paramètres de l'audit (sérialisables en JSON).
+    """
+    return {
+        'url': args.url,
+        'mode': 'automatique',
+        'mobile': args.mobile,
+        'settle_idle_ms': args.settle_idle_ms,
+        'settle_timeout': args.settle_timeout,
+        'settle_dom': args.settle_dom,
+        'no_block': args.no_block,
+        'block_policy': args.block_policy,
+        'asset_index': args.asset_index,
+        'deadline': args.deadline
+    }
+
+def run_audit_job(payload, project_dir, driver=None, progress_callback=None, cancel_event=None,
+                  asset_cache_file=None):
+    """
+    Exécute une tâche d'audit distribuée ou soumise au service HTTP (voir build_job_payload).
+
+    Args:
+        payload (dict): Paramètres de l'audit.
+        project_dir (str): Répertoire où produire les résultats.
+        driver (webdriver.Firefox): Navigateur à réutiliser (optionnel).
+        progress_callback (callable): Fonction f(phase, data) notifiée de l'avancement (optionnel).
+        cancel_event (threading.Event): Événement d'annulation de l'audit (optionnel).
+        asset_cache_file (str): Cache des empreintes de bibliothèques (défaut : celui du
+            dossier 'users'). Les travailleurs utilisent celui du dossier partagé des projets.
+
+    Returns:
+        dict: Informations de l'audit.
+    """
+    job_args = argparse.Namespace(**payload)
+    asset_index = AssetIndex.load(job_args.asset_index) if job_args.asset_index else None
+    asset_cache_file = asset_cache_file or os.path.join('users', ASSET_CACHE_FILE)
+    asset_cache = AssetHashCache(asset_cache_file) if asset_index else None
+    return run_selenium_audit(
+        job_args.url, job_args.mode, job_args.mobile, project_dir, build_settle_options(job_args),
+        blocking_policy=build_blocking_policy(job_args), asset_index=asset_index, asset_cache=asset_cache,
+        driver=driver, progress_callback=progress_callback, deadline_seconds=payload.get('deadline'),
+        cancel_event=cancel_event
+    )
+
+def launch_service_browser(payload):
+    """
+    Lance un navigateur réutilisable par le service HTTP pour les audits de ce profil.
+
+    Le cache HTTP de Firefox est désactivé : sans cela, les ressources déjà
+    chargées par un audit précédent ne passeraient plus par Selenium Wire et
+    manqueraient dans requests.log.
+
+    Args:
+        payload (dict): Paramètres de l'audit.
+
+    Returns:
+        webdriver.Firefox: Instance du navigateur lancé.
+    """
+    return launch_selenium_browser(
+        browser_name='firefox', mode='automatique', mobile=payload.get('mobile', False), disable_cache=True,
+        reusable=True
+    )
+
+def build_logging_options(args):
+    """
+    Construit les options de journalisation à partir des arguments.
+
+    Args:
+        args (argparse.Namespace): Les arguments analysés.
+
+    Returns:
+        dict: Paramètres de setup_logging (voir modules.log_config).
+    """
+    return {
+        'level': args.log_level,
+        'log_format': args.log_format,
+        'log_file': args.log_file,
+        'quiet': args.quiet,
+        'request_rate': args.log_request_rate
+    }
+
+def run_worker_process(queue_path, results_dir, exit_when_empty, logging_options=None):
+    """
+    Point d'entrée d'un processus travailleur.
+
+    Args:
+        queue_path (str): Base SQLite de la file de tâches.
+        results_dir (str): Dossier partagé où publier les projets.
+        exit_when_empty (bool): Arrêter le travailleur quand la file est vide.
+        logging_options (dict): Options de journalisation à appliquer dans ce processus (optionnel).
+    """
+    if logging_options is not None:
+        # Le thread d'écriture des logs du processus parent n'existe pas dans ce processus
+        setup_logging(**logging_options)
+    # Cache des empreintes dans le dossier partagé : commun aux travailleurs de tous les nœuds
+    audit_func = functools.partial(run_audit_job, asset_cache_file=os.path.join(results_dir, ASSET_CACHE_FILE))
+    worker = AuditWorker(SQLiteJobQueue(queue_path), audit_func, results_dir)
+    try:
+        worker.run(exit_when_empty=exit_when_empty)
+    except KeyboardInterrupt:
+        worker.stop()
+
+def run_workers(queue_path, results_dir, count, exit_when_empty=False, logging_options=None):
+    """
+    Lance plusieurs processus travailleurs locaux sur la même file de tâches.
+
+    Args:
+        queue_path (str): Base SQLite de la file de tâches.
+        results_dir (str): Dossier partagé où publier les projets.
+        count (int): Nombre de processus travailleurs.
+        exit_when_empty (bool): Arrêter les travailleurs quand la file est vide.
+        logging_options (dict): Options de journalisation des processus travailleurs (optionnel).
+    """
+    if count <= 1:
+        run_worker_process(queue_path, results_dir, exit_when_empty)
+        return
+    processes = [
+        multiprocessing.Process(
+            target=run_worker_process, args=(queue_path, results_dir, exit_when_empty, logging_options)
+        )
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def run_diff(old_dir, new_dir, output_file=None):
+    """
+    Compare deux projets d'audit et écrit les différences au format JSON Lines.
+
+    Args:
+        old_dir (str): Répertoire du projet de référence.
+        new_dir (str): Répertoire du projet à comparer.
+        output_file (str): Fichier de sortie (sortie standard si absent).
+    """
+    for audit_dir in (old_dir, new_dir):
+        if not os.path.isdir(audit_dir):
+            print(f"Projet introuvable : {audit_dir}")
+            logging.error(f"Projet introuvable : {audit_dir}")
+            sys.exit(1)
+    try:
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as output:
+                summary = write_diff(old_dir, new_dir, output)
+            print(f"Comparaison enregistrée dans : {output_file}")
+        else:
+            summary = write_diff(old_dir, new_dir, sys.stdout)
+    except ValueError as e:
+        print(f"Comparaison impossible : {e}")
+        logging.error(f"Comparaison impossible : {e}")
+        sys.exit(1)
+    logging.info(f"Comparaison de {old_dir} et {new_dir} : {summary['counts']}")
 
 def main():
     """
@@ -296,13 +978,66 @@ def main():
     # Analyser les arguments en ligne de commande
     args = parse_arguments()
 
+    # Logs non bloquants : écrits par un thread dédié
+    setup_logging(**build_logging_options(args))
+
+    # Comparaison de deux audits existants
+    if args.diff:
+        run_diff(*args.diff, args.diff_output)
+        return
+
+    # Audits distribués : ajout à la file ou exécution des tâches de la file
+    if args.enqueue:
+        job_id = SQLiteJobQueue(args.queue).enqueue(build_job_payload(args), priority=args.priority)
+        print(f"Tâche {job_id} ajoutée à la file {args.queue}.")
+        logging.info(f"Tâche {job_id} ajoutée à la file {args.queue}.")
+        return
+    if args.worker:
+        run_workers(args.queue, args.results_dir, args.workers, args.exit_when_empty, build_logging_options(args))
+        return
+
+    # Service HTTP : les audits sont soumis, suivis et consultés via l'API
+    if args.serve:
+        default_payload = build_job_payload(args)
+        del default_payload['url'], default_payload['mobile']
+        audit_func = functools.partial(run_audit_job, asset_cache_file=os.path.join(args.results_dir, ASSET_CACHE_FILE))
+        app = create_app(audit_func, launch_service_browser, args.results_dir, args.max_concurrency, default_payload,
+                         browser_reset=reset_browser_state)
+        print(f"Service d'audit à l'écoute sur http://{args.host}:{args.port}")
+        logging.info(f"Service d'audit à l'écoute sur http://{args.host}:{args.port}")
+        app.run(host=args.host, port=args.port, threaded=True)
+        return
+
     # Créer un répertoire de projet unique
     project_dir = create_project_directory()
     print(f"Répertoire de projet créé : {project_dir}")
     logging.info(f"Répertoire de projet créé : {project_dir}")
 
+    # Enregistrement ou rejeu des réponses
+    response_store = None
+    replay = args.replay is not None
+    if replay:
+        response_store = ResponseStore(get_store_dir(args.replay)).load()
+        print(f"Rejeu hors ligne depuis : {response_store.store_dir}")
+        logging.info(f"Rejeu hors ligne depuis : {response_store.store_dir}")
+    elif args.record:
+        response_store = ResponseStore(get_store_dir(project_dir))
+        logging.info(f"Enregistrement des réponses dans : {response_store.store_dir}")
+
+    # Index des bibliothèques connues et cache des empreintes partagé entre les audits
+    asset_index = AssetIndex.load(args.asset_index) if args.asset_index else None
+    asset_cache = AssetHashCache(os.path.join('users', ASSET_CACHE_FILE)) if asset_index else None
+
     # Exécuter l'audit Selenium
-    run_selenium_audit(args.url, args.mode, args.mobile, project_dir)
+    if args.viewports:
+        profiles = [profile.strip() for profile in args.viewports.split(',') if profile.strip()]
+        run_multi_viewport_audit(args.url, profiles, project_dir, build_settle_options(args), response_store, replay,
+                                 build_blocking_policy(args), asset_index, asset_cache, args.deadline)
+    else:
+        run_selenium_audit(args.url, args.mode, args.mobile, project_dir, build_settle_options(args),
+                           response_store=response_store, replay=replay, blocking_policy=build_blocking_policy(args),
+                           asset_index=asset_index, asset_cache=asset_cache,
+                           analysis_processes=args.analysis_processes, deadline_seconds=args.deadline)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,282 @@
+# modules/asset_index.py
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import logging
+from modules.log_config import setup_logging
+from urllib.parse import urlsplit
+from seleniumwire.utils import decode as decode_body
+
+# Extensions des fichiers de bibliothèques indexés
+INDEXED_EXTENSIONS = ('.js', '.mjs', '.css')
+
+# Types de contenu des réponses à identifier
+IDENTIFIED_CONTENT_TYPES = ('javascript', 'ecmascript', 'text/css')
+
+def hash_content(content):
+    """
+    Calcule les empreintes SHA-256 d'un fichier : brute, et normalisée (fins de
+    ligne et espaces finaux) pour résister aux réécritures mineures des CDN.
+
+    Args:
+        content (bytes): Contenu du fichier.
+
+    Returns:
+        tuple: (empreinte brute, empreinte normalisée).
+    """
+    normalized = b'\n'.join(line.rstrip() for line in content.replace(b'\r\n', b'\n').split(b'\n')).strip()
+    return hashlib.sha256(content).hexdigest(), hashlib.sha256(normalized).hexdigest()
+
+class AssetIndex:
+    """
+    Index des empreintes de fichiers de bibliothèques connues vers leur nom et version.
+    """
+
+    def __init__(self, assets=None):
+        """
+        Args:
+            assets (dict): Empreinte -> {'name', 'version', 'file'} (optionnel).
+        """
+        self.assets = assets or {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge un index depuis un fichier JSON.
+
+        Raises:
+            FileNotFoundError: Si le fichier n'existe pas.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Index des bibliothèques introuvable : {path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            index = cls(json.load(f).get('assets', {}))
+        logging.info(f"{len(index.assets)} empreintes de bibliothèques chargées depuis {path}.")
+        return index
+
+    @classmethod
+    def build_from_directory(cls, releases_dir):
+        """
+        Construit l'index hors ligne à partir d'un dossier de versions de bibliothèques
+        organisé en '<releases_dir>/<nom>/<version>/.../<fichier>'.
+
+        Args:
+            releases_dir (str): Dossier racine des versions de bibliothèques.
+
+        Returns:
+            AssetIndex: L'index construit.
+        """
+        index = cls()
+        for name in sorted(os.listdir(releases_dir)):
+            library_dir = os.path.join(releases_dir, name)
+            if not os.path.isdir(library_dir):
+                continue
+            for version in sorted(os.listdir(library_dir)):
+                version_dir = os.path.join(library_dir, version)
+                if not os.path.isdir(version_dir):
+                    continue
+                for root, dirs, files in os.walk(version_dir):
+                    for file_name in files:
+                        if not file_name.lower().endswith(INDEXED_EXTENSIONS):
+                            continue
+                        file_path = os.path.join(root, file_name)
+                        with open(file_path, 'rb') as f:
+                            content = f.read()
+                        entry = {
+                            'name': name,
+                            'version': version,
+                            'file': os.path.relpath(file_path, version_dir).replace(os.sep, '/')
+                        }
+                        for content_hash in hash_content(content):
+                            index.assets.setdefault(content_hash, entry)
+        logging.info(f"{len(index.assets)} empreintes indexées depuis {releases_dir}.")
+        return index
+
+    def save(self, path):
+        """
+        Sauvegarde l'index dans un fichier JSON.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'assets': self.assets}, f, indent=4, ensure_ascii=False)
+
+    def lookup(self, hashes):
+        """
+        Recherche la bibliothèque correspondant à l'une des empreintes.
+
+        Args:
+            hashes (tuple): Empreintes calculées par hash_content.
+
+        Returns:
+            dict: {'name', 'version', 'file'} ou None.
+        """
+        for content_hash in hashes:
+            if content_hash in self.assets:
+                return self.assets[content_hash]
+        return None
+
+class AssetHashCache:
+    """
+    Cache persistant des identifications, indexé par URL et validateur HTTP
+    (ETag ou Last-Modified), partagé entre les audits : un même fichier servi
+    à de nombreux sites n'est haché et résolu qu'une seule fois.
+
+    Plusieurs processus (travailleurs) peuvent partager le même fichier : la
+    sauvegarde fusionne les entrées présentes sur disque et remplace le fichier
+    d'un bloc, un lecteur ne voit donc jamais un fichier à moitié écrit.
+    """
+
+    def __init__(self, cache_file):
+        """
+        Args:
+            cache_file (str): Chemin du fichier JSON du cache.
+        """
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries = self._read_entries()
+
+    def _read_entries(self):
+        """
+        Lit les entrées enregistrées sur disque (vide si le fichier est absent ou illisible).
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logging.warning(f"Cache des empreintes illisible, il sera recréé : {self.cache_file}")
+            return {}
+
+    @staticmethod
+    def get_key(url, validator):
+        return f"{url}\n{validator}"
+
+    def get(self, url, validator):
+        with self._lock:
+            return self._entries.get(self.get_key(url, validator))
+
+    def set(self, url, validator, value):
+        with self._lock:
+            self._entries[self.get_key(url, validator)] = value
+
+    def save(self):
+        """
+        Sauvegarde le cache sur disque, fusionné avec les entrées enregistrées
+        entre-temps par d'autres processus.
+        """
+        with self._lock:
+            directory = os.path.dirname(self.cache_file) or '.'
+            os.makedirs(directory, exist_ok=True)
+            merged = self._read_entries()
+            merged.update(self._entries)
+            self._entries = merged
+            # Écriture dans un fichier temporaire du même dossier puis remplacement atomique
+            fd, temp_file = tempfile.mkstemp(prefix='.asset_cache.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                os.replace(temp_file, self.cache_file)
+            except Exception:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                raise
+
+def is_identifiable(request):
+    """
+    Indique si une requête capturée porte un script ou une feuille de style.
+    """
+    if not request.response or request.response.status_code != 200:
+        return False
+    content_type = (request.response.headers.get('Content-Type') or '').lower()
+    if any(identified in content_type for identified in IDENTIFIED_CONTENT_TYPES):
+        return True
+    return urlsplit(request.url).path.lower().endswith(INDEXED_EXTENSIONS)
+
+def identify_assets(requests_list, asset_index, asset_cache=None):
+    """
+    Identifie les bibliothèques connues parmi les scripts et feuilles de style capturés.
+
+    Chaque corps n'est haché qu'une fois : le résultat est mis en cache par
+    URL + ETag (ou Last-Modified), au sein de l'audit comme entre les audits.
+    Un corps illisible (encodage invalide) est ignoré sans interrompre
+    l'identification des autres ressources.
+
+    Args:
+        requests_list (list): Requêtes Selenium Wire (driver.requests).
+        asset_index (AssetIndex): Index des bibliothèques connues.
+        asset_cache (AssetHashCache): Cache persistant des identifications (optionnel).
+
+    Returns:
+        list: Bibliothèques identifiées {'url', 'name', 'version', 'file'}.
+    """
+    identified = []
+    resolved = {}
+    for request in requests_list:
+        if not is_identifiable(request):
+            continue
+        headers = request.response.headers
+        validator = headers.get('ETag') or headers.get('Last-Modified')
+        key = (request.url, validator)
+        if validator and key in resolved:
+            match = resolved[key]
+        else:
+            cached = asset_cache.get(request.url, validator) if asset_cache and validator else None
+            if cached is not None:
+                match = cached.get('match')
+            else:
+                try:
+                    body = decode_body(request.response.body, headers.get('Content-Encoding', 'identity'))
+                except Exception as e:
+                    logging.warning(f"Corps illisible, identification ignorée pour {request.url} : {e}")
+                    continue
+                match = asset_index.lookup(hash_content(body))
+                if asset_cache and validator:
+                    asset_cache.set(request.url, validator, {'match': match})
+            resolved[key] = match
+        if match:
+            identified.append(dict(match, url=request.url))
+    return identified
+
+def normalize_library_name(name):
+    """
+    Normalise un nom de bibliothèque pour la comparaison ('Vue.js' et 'vue' sont équivalents).
+    """
+    return name.lower().replace('.js', '').replace(' ', '').replace('-', '')
+
+def merge_identified_versions(technologies, identified_assets):
+    """
+    Complète les technologies détectées avec les versions identifiées par empreinte.
+
+    Args:
+        technologies (dict): Technologies détectées (nom -> version).
+        identified_assets (list): Résultat de identify_assets.
+
+    Returns:
+        dict: Technologies mises à jour.
+    """
+    merged = dict(technologies)
+    known_names = {normalize_library_name(name): name for name in merged}
+    for asset in identified_assets:
+        name = known_names.setdefault(normalize_library_name(asset['name']), asset['name'])
+        if merged.get(name, 'Unknown') == 'Unknown':
+            merged[name] = asset['version']
+    return merged
+
+def main():
+    """
+    Construit l'index des bibliothèques depuis un dossier de versions.
+    """
+    parser = argparse.ArgumentParser(description='Bone Brocker - Index des bibliothèques connues')
+    parser.add_argument('releases_dir', help='Dossier organisé en <nom>/<version>/<fichiers>')
+    parser.add_argument('output', help='Fichier JSON de l\'index à créer')
+    args = parser.parse_args()
+    setup_logging()
+    AssetIndex.build_from_directory(args.releases_dir).save(args.output)
+    print(f"Index des bibliothèques sauvegardé dans {args.output}.")
+
+if __name__ == "__main__":
+    main()
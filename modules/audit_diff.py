@@ -0,0 +1,349 @@
+# modules/audit_diff.py
+
+import functools
+import itertools
+import json
+import os
+from urllib.parse import urlsplit
+
+# Paramètres de requête sans incidence sur la ressource (anti-cache, horodatages)
+VOLATILE_QUERY_PARAMS = {'_', 'cb', 'cachebuster', 'cache_buster', 'rnd', 'rand', 'random', 'ts', 'timestamp', 'nocache'}
+
+# En-têtes de réponse pris en compte dans l'empreinte d'un échange
+RELEVANT_RESPONSE_HEADERS = (
+    'content-type',
+    'server',
+    'x-powered-by',
+    'x-generator',
+    'via',
+    'strict-transport-security',
+    'content-security-policy',
+    'x-frame-options',
+    'x-content-type-options'
+)
+
+# Ports par défaut supprimés lors de la normalisation des URL
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+@functools.lru_cache(maxsize=4096)
+def normalize_origin(origin):
+    """
+    Normalise l'origine d'une URL (schéma et hôte en minuscules, port par défaut
+    supprimé). Les captures ne contiennent que quelques origines : le résultat
+    est mis en cache.
+    """
+    parts = urlsplit(origin)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{parts.port}'
+    return f'{scheme}://{netloc}'
+
+def normalize_url(url):
+    """
+    Normalise une URL pour comparer deux captures : schéma et hôte en minuscules,
+    port par défaut et fragment supprimés, paramètres volatils retirés et
+    paramètres restants triés.
+
+    Args:
+        url (str): URL capturée.
+
+    Returns:
+        str: URL normalisée.
+    """
+    url = url.partition('#')[0]
+    base, _, query = url.partition('?')
+    scheme, separator, rest = base.partition('://')
+    if not separator:
+        # URL sans autorité (data:, about:...) : comparée telle quelle
+        return url
+    netloc, _, path = rest.partition('/')
+    normalized = f'{normalize_origin(scheme + separator + netloc)}/{path}'
+    if query:
+        # Les paramètres sont comparés tels quels (sans décodage) pour rester rapide
+        query = '&'.join(sorted(
+            parameter for parameter in query.split('&')
+            if parameter and parameter.partition('=')[0].lower() not in VOLATILE_QUERY_PARAMS
+        ))
+        if query:
+            normalized = f'{normalized}?{query}'
+    return normalized
+
+def get_relevant_headers(headers):
+    """
+    Extrait les en-têtes de réponse pertinents (noms en minuscules).
+    """
+    lowered = {name.lower(): value for name, value in (headers or {}).items()}
+    return {name: lowered[name] for name in RELEVANT_RESPONSE_HEADERS if name in lowered}
+
+def fingerprint_exchange(exchange):
+    """
+    Calcule l'identité et l'empreinte d'un échange capturé.
+
+    Args:
+        exchange (dict): Entrée de requests.log.
+
+    Returns:
+        tuple: (clé (méthode, URL normalisée), empreinte, résumé de l'échange).
+    """
+    key = (exchange.get('method', 'GET').upper(), normalize_url(exchange.get('url', '')))
+    headers = get_relevant_headers(exchange.get('response_headers'))
+    summary = {
+        'status_code': exchange.get('status_code'),
+        'headers': headers,
+        'blocked': exchange.get('blocked', False)
+    }
+    # L'empreinte est un tuple hachable : comparée directement dans les tables de hachage
+    fingerprint = (summary['status_code'], tuple(headers.items()), summary['blocked'])
+    return key, fingerprint, summary
+
+def iter_json_array(path, chunk_size=1024 * 1024):
+    """
+    Parcourt les éléments d'un fichier contenant un tableau JSON sans charger
+    l'ensemble du tableau en mémoire.
+
+    Args:
+        path (str): Chemin du fichier (ex: requests.log).
+        chunk_size (int): Taille des blocs lus.
+
+    Yields:
+        Les éléments du tableau, un par un.
+
+    Raises:
+        ValueError: Si le fichier ne contient pas un tableau JSON valide.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        eof = False
+        opened = False
+        while True:
+            # Ignorer les espaces et les virgules séparatrices
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+                position += 1
+            if position < len(buffer):
+                if not opened:
+                    if buffer[position] != '[':
+                        raise ValueError(f"Le fichier ne contient pas un tableau JSON : {path}")
+                    opened = True
+                    position += 1
+                    continue
+                if buffer[position] == ']':
+                    return
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    # Élément coupé en fin de bloc : lire la suite, sauf en fin de fichier
+                    if eof:
+                        raise ValueError(f"Tableau JSON invalide ou incomplet : {path}")
+                else:
+                    yield item
+                    continue
+            elif eof:
+                if not opened:
+                    return
+                raise ValueError(f"Tableau JSON incomplet : {path}")
+            # Lire la suite du fichier en conservant la partie non consommée
+            chunk = f.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+
+def load_state(audit_dir):
+    """
+    Charge le state.json d'un audit (dictionnaire vide s'il est absent).
+    """
+    path = os.path.join(audit_dir, 'state.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def get_audit_profiles(audit_dir):
+    """
+    Retourne les sous-dossiers des profils d'un audit multi-profils (--viewports).
+
+    Returns:
+        dict: Profil -> dossier, ou None pour un audit simple.
+    """
+    profiles = load_state(audit_dir).get('profiles')
+    if not profiles:
+        return None
+    return {
+        profile: os.path.join(audit_dir, (details or {}).get('directory', profile))
+        for profile, details in profiles.items()
+    }
+
+def has_audit_data(audit_dir):
+    """
+    Indique si un dossier contient des résultats d'audit comparables
+    (requests.log, technologies de state.json ou dom_analysis.json).
+    """
+    return (
+        os.path.exists(os.path.join(audit_dir, 'requests.log'))
+        or os.path.exists(os.path.join(audit_dir, 'dom_analysis.json'))
+        or 'technologies_detected' in load_state(audit_dir)
+    )
+
+def get_compared_dirs(old_dir, new_dir):
+    """
+    Associe les dossiers à comparer : le projet lui-même pour un audit simple,
+    chaque profil pour un audit multi-profils.
+
+    Returns:
+        list: Tuples (profil ou None, dossier ancien ou None, dossier nouveau ou None).
+
+    Raises:
+        ValueError: Si les deux audits ne sont pas de même nature ou si un dossier
+            ne contient aucun résultat comparable.
+    """
+    old_profiles = get_audit_profiles(old_dir)
+    new_profiles = get_audit_profiles(new_dir)
+    if (old_profiles is None) != (new_profiles is None):
+        raise ValueError("Impossible de comparer un audit multi-profils (--viewports) à un audit simple.")
+    if old_profiles is None:
+        pairs = [(None, old_dir, new_dir)]
+    else:
+        pairs = [
+            (profile, old_profiles.get(profile), new_profiles.get(profile))
+            for profile in sorted(set(old_profiles) | set(new_profiles))
+        ]
+    for _, *audit_dirs in pairs:
+        for audit_dir in audit_dirs:
+            if audit_dir is not None and not has_audit_data(audit_dir):
+                raise ValueError(f"Aucun résultat d'audit (requests.log, technologies) dans : {audit_dir}")
+    return pairs
+
+def load_technologies(audit_dir):
+    """
+    Charge les technologies détectées d'un audit (state.json, sinon dom_analysis.json).
+    Un dossier absent (profil audité d'un seul côté) n'a aucune technologie.
+    """
+    if audit_dir is None:
+        return {}
+    for name, key in (('state.json', 'technologies_detected'), ('dom_analysis.json', 'technologies')):
+        path = os.path.join(audit_dir, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                technologies = json.load(f).get(key)
+            if technologies is not None:
+                return technologies
+    return {}
+
+def diff_technologies(old_technologies, new_technologies):
+    """
+    Compare les technologies détectées de deux audits.
+
+    Yields:
+        dict: Différence {'kind': 'technology', 'change': 'added'|'removed'|'changed', ...}.
+    """
+    for name, version in new_technologies.items():
+        if name not in old_technologies:
+            yield {'kind': 'technology', 'change': 'added', 'name': name, 'version': version}
+        elif old_technologies[name] != version:
+            yield {'kind': 'technology', 'change': 'changed', 'name': name,
+                   'old_version': old_technologies[name], 'version': version}
+    for name, version in old_technologies.items():
+        if name not in new_technologies:
+            yield {'kind': 'technology', 'change': 'removed', 'name': name, 'version': version}
+
+def index_exchanges(requests_file):
+    """
+    Indexe les empreintes des échanges d'une capture : (méthode, URL normalisée)
+    -> {empreinte: [nombre d'occurrences, résumé]}.
+    """
+    index = {}
+    if requests_file is None or not os.path.exists(requests_file):
+        return index
+    for exchange in iter_json_array(requests_file):
+        key, fingerprint, summary = fingerprint_exchange(exchange)
+        entry = index.setdefault(key, {}).setdefault(fingerprint, [0, summary])
+        entry[0] += 1
+    return index
+
+def diff_exchanges(old_requests_file, new_requests_file):
+    """
+    Compare les échanges capturés de deux audits. Chaque capture est lue en flux
+    et réduite une seule fois à ses empreintes ; les ensembles ajoutés, supprimés
+    et modifiés sont ensuite obtenus par recherche dans une table de hachage.
+
+    Yields:
+        dict: Différence {'kind': 'request', 'change': 'added'|'removed'|'changed', ...}.
+    """
+    old_index = index_exchanges(old_requests_file)
+    new_index = index_exchanges(new_requests_file)
+    for key, new_fingerprints in new_index.items():
+        method, url = key
+        old_fingerprints = old_index.pop(key, None)
+        if old_fingerprints is None:
+            for count, summary in new_fingerprints.values():
+                yield {'kind': 'request', 'change': 'added', 'method': method, 'url': url, 'count': count, **summary}
+        elif {fp: entry[0] for fp, entry in old_fingerprints.items()} != {fp: entry[0] for fp, entry in new_fingerprints.items()}:
+            yield {
+                'kind': 'request',
+                'change': 'changed',
+                'method': method,
+                'url': url,
+                'old': [dict(summary, count=count) for count, summary in old_fingerprints.values()],
+                'new': [dict(summary, count=count) for count, summary in new_fingerprints.values()]
+            }
+    # Les clés restantes n'existent que dans l'ancienne capture
+    for (method, url), old_fingerprints in old_index.items():
+        for count, summary in old_fingerprints.values():
+            yield {'kind': 'request', 'change': 'removed', 'method': method, 'url': url, 'count': count, **summary}
+
+def get_requests_file(audit_dir):
+    return os.path.join(audit_dir, 'requests.log') if audit_dir is not None else None
+
+def diff_audits(old_dir, new_dir):
+    """
+    Compare deux audits (technologies détectées et échanges capturés). Les audits
+    multi-profils (--viewports) sont comparés profil par profil ; chaque
+    différence porte alors le profil concerné.
+
+    Args:
+        old_dir (str): Répertoire du projet de référence.
+        new_dir (str): Répertoire du projet à comparer.
+
+    Yields:
+        dict: Différences, puis un résumé {'kind': 'summary', ...}.
+
+    Raises:
+        ValueError: Voir get_compared_dirs.
+    """
+    pairs = get_compared_dirs(old_dir, new_dir)
+    counts = {}
+    for profile, old_audit_dir, new_audit_dir in pairs:
+        differences = itertools.chain(
+            diff_technologies(load_technologies(old_audit_dir), load_technologies(new_audit_dir)),
+            diff_exchanges(get_requests_file(old_audit_dir), get_requests_file(new_audit_dir))
+        )
+        for difference in differences:
+            counter = counts.setdefault(difference['kind'], {'added': 0, 'removed': 0, 'changed': 0})
+            counter[difference['change']] += 1
+            if profile is not None:
+                difference['profile'] = profile
+            yield difference
+    summary = {'kind': 'summary', 'old': old_dir, 'new': new_dir, 'counts': counts}
+    if pairs[0][0] is not None:
+        summary['profiles'] = [profile for profile, _, _ in pairs]
+    yield summary
+
+def write_diff(old_dir, new_dir, output):
+    """
+    Écrit la comparaison de deux audits au format JSON Lines, au fil du calcul.
+
+    Args:
+        old_dir (str): Répertoire du projet de référence.
+        new_dir (str): Répertoire du projet à comparer.
+        output (file): Flux de sortie texte.
+
+    Returns:
+        dict: Résumé de la comparaison.
+    """
+    summary = None
+    for difference in diff_audits(old_dir, new_dir):
+        output.write(json.dumps(difference, ensure_ascii=False) + '\n')
+        summary = difference
+    return summary
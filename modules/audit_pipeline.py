@@ -0,0 +1,152 @@
+# modules/audit_pipeline.py
+
+import json
+import queue
+import threading
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Marqueur d'arrêt des threads d'un étage
+_STOP = object()
+
+class PipelineStage:
+    """
+    Étage du pipeline d'audit : une file bornée alimentant des threads de travail.
+
+    Lorsque la file est pleine, 'submit' bloque l'appelant (contre-pression), ce
+    qui borne la mémoire occupée par les tâches en attente.
+    """
+
+    def __init__(self, name, workers=1, queue_size=8):
+        """
+        Args:
+            name (str): Nom de l'étage (pour les logs).
+            workers (int): Nombre de threads de travail.
+            queue_size (int): Taille maximale de la file d'attente.
+        """
+        self.name = name
+        self._closed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._run, name=f'{name}-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                future, func, args = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(*args))
+                except BaseException as e:
+                    logging.error(f"Erreur dans l'étage '{self.name}' du pipeline : {e}")
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, func, *args):
+        """
+        Ajoute une tâche à l'étage.
+
+        Args:
+            func (callable): Fonction à exécuter.
+            *args: Arguments de la fonction.
+
+        Returns:
+            concurrent.futures.Future: Résultat de la tâche.
+        """
+        future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def close(self):
+        """
+        Attend la fin des tâches en cours puis arrête les threads de l'étage.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+def write_json(path, data):
+    """
+    Écrit des données dans un fichier JSON (même format que les autres fichiers du projet).
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+class AuditPipeline:
+    """
+    Pipeline d'un audit : l'analyse (CPU) et les écritures sur disque (E/S)
+    s'exécutent dans des étages séparés pendant que le thread principal
+    continue de piloter le navigateur.
+
+    Utilisation :
+        with AuditPipeline() as pipeline:
+            analysis = pipeline.analysis.submit(pipeline.run_cpu_bound, analyze_page, url, html)
+            pipeline.save_json_when_done(analysis, path)
+    """
+
+    def __init__(self, analysis_workers=1, io_workers=1, queue_size=8, use_processes=False):
+        """
+        Args:
+            analysis_workers (int): Nombre de travailleurs de l'étage d'analyse.
+            io_workers (int): Nombre de travailleurs de l'étage d'écriture.
+            queue_size (int): Taille maximale de chaque file d'attente.
+            use_processes (bool): Exécuter l'analyse dans des processus séparés
+                (contourne le GIL pour les gros documents).
+        """
+        self._process_pool = ProcessPoolExecutor(max_workers=analysis_workers) if use_processes else None
+        self.analysis = PipelineStage('analysis', analysis_workers, queue_size)
+        self.io = PipelineStage('io', io_workers, queue_size)
+
+    def run_cpu_bound(self, func, *args):
+        """
+        Exécute une fonction CPU dans un processus séparé si le pipeline en dispose,
+        sinon directement dans le thread courant. La fonction et ses arguments
+        doivent alors être sérialisables (pickle).
+        """
+        if self._process_pool:
+            return self._process_pool.submit(func, *args).result()
+        return func(*args)
+
+    def save_json_when_done(self, future, path):
+        """
+        Programme l'écriture du résultat d'une tâche dans un fichier JSON dès
+        qu'il est disponible, sans bloquer l'appelant.
+
+        Args:
+            future (concurrent.futures.Future): Tâche produisant les données.
+            path (str): Chemin du fichier JSON.
+        """
+        def on_done(done_future):
+            if done_future.exception() is None:
+                self.io.submit(write_json, path, done_future.result())
+        future.add_done_callback(on_done)
+
+    def close(self):
+        """
+        Attend la fin de toutes les tâches et libère les travailleurs.
+        L'étage d'analyse est vidé en premier car il peut alimenter l'étage d'écriture.
+        """
+        self.analysis.close()
+        self.io.close()
+        if self._process_pool:
+            self._process_pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
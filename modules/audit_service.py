@@ -0,0 +1,368 @@
+# modules/audit_service.py
+
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime
+from flask import Flask, Response, abort, jsonify, render_template, request, send_from_directory
+
+# Fichiers d'un projet pouvant être servis par le service
+SERVED_ARTIFACTS = {'state.json', 'dom_analysis.json', 'dom_changes.json', 'requests.log'}
+
+# Nombre maximal d'événements 'request' conservés par audit (les suivants ne sont que comptés)
+MAX_REQUEST_EVENTS = 2000
+
+# Durée de conservation (secondes) et nombre maximal des audits terminés suivis par le service
+FINISHED_AUDIT_RETENTION = 3600
+MAX_FINISHED_AUDITS = 200
+
+class AuditRecord:
+    """
+    Suivi d'un audit soumis au service : statut et historique des événements
+    d'avancement, consultable par plusieurs clients SSE.
+    """
+
+    def __init__(self, audit_id, payload, priority, project_dir):
+        self.audit_id = audit_id
+        self.payload = payload
+        self.priority = priority
+        self.project_dir = project_dir
+        self.status = 'queued'
+        self.submitted_at = datetime.now().isoformat()
+        self.events = []
+        self.request_events = 0
+        self.dropped_events = 0
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._condition = threading.Condition()
+
+    def add_event(self, phase, data=None):
+        """
+        Ajoute un événement et réveille les clients en attente.
+
+        Au-delà de MAX_REQUEST_EVENTS, les événements 'request' ne sont plus conservés.
+        """
+        with self._condition:
+            if phase == 'request':
+                if self.request_events >= MAX_REQUEST_EVENTS:
+                    self.dropped_events += 1
+                    return
+                self.request_events += 1
+            elif phase == 'finished':
+                self.finished_at = time.time()
+                if self.dropped_events:
+                    data = dict(data or {}, dropped_request_events=self.dropped_events)
+            self.events.append({'phase': phase, 'data': data or {}, 'time': time.time()})
+            self._condition.notify_all()
+
+    def compact(self):
+        """
+        Allège l'historique d'un audit terminé : les événements 'request' ne
+        conservent que la méthode, l'URL et le statut (les indices des événements,
+        utilisés par les clients SSE connectés, restent inchangés).
+        """
+        with self._condition:
+            for event in self.events:
+                request_data = event['data'].get('request') if event['phase'] == 'request' else None
+                if request_data:
+                    event['data'] = {'request': {
+                        key: request_data.get(key) for key in ('method', 'url', 'status_code', 'blocked')
+                    }}
+
+    def wait_events(self, start, timeout):
+        """
+        Retourne les événements à partir de l'index 'start', en attendant au plus
+        'timeout' secondes qu'il y en ait de nouveaux.
+        """
+        with self._condition:
+            if len(self.events) <= start:
+                self._condition.wait(timeout)
+            return self.events[start:]
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'timed_out', 'cancelled', 'error')
+
+    def to_dict(self):
+        return {
+            'id': self.audit_id,
+            'url': self.payload.get('url'),
+            'priority': self.priority,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at,
+            'project_dir': self.project_dir,
+            'events': len(self.events)
+        }
+
+class AuditScheduler:
+    """
+    Ordonnanceur des audits soumis au service : au plus 'max_concurrency' audits
+    simultanés, les plus prioritaires d'abord (puis par ordre d'arrivée).
+
+    Chaque emplacement d'exécution conserve ses navigateurs d'un audit à l'autre
+    (un par profil d'affichage), évitant le coût de lancement de Firefox. L'état
+    d'un navigateur (cookies, stockage) est effacé après chaque audit ; s'il ne
+    peut pas l'être, le navigateur est relancé.
+    """
+
+    def __init__(self, audit_func, browser_factory, max_concurrency=2, browser_reset=None):
+        """
+        Args:
+            audit_func (callable): Fonction f(payload, project_dir, driver, progress_callback, cancel_event)
+                exécutant l'audit et retournant les informations de l'audit.
+            browser_factory (callable): Fonction f(payload) lançant un navigateur adapté à l'audit.
+            max_concurrency (int): Nombre maximal d'audits simultanés.
+            browser_reset (callable): Fonction f(driver) effaçant l'état laissé par un audit,
+                retournant False en cas d'échec (sans elle, chaque audit a son navigateur).
+        """
+        self.audit_func = audit_func
+        self.browser_factory = browser_factory
+        self.browser_reset = browser_reset
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'audit-slot-{index}', daemon=True)
+            for index in range(max_concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, record):
+        """
+        Ajoute un audit à la file d'attente.
+        """
+        self._queue.put((-record.priority, next(self._sequence), record))
+        record.add_event('queued', {'position': self._queue.qsize()})
+
+    @staticmethod
+    def get_browser_key(payload):
+        return 'mobile' if payload.get('mobile') else payload.get('profile') or 'desktop'
+
+    def _run(self):
+        browsers = {}
+        while True:
+            _, _, record = self._queue.get()
+            if record.cancel_event.is_set():
+                # Audit annulé avant son démarrage
+                record.status = 'cancelled'
+                record.add_event('finished', {'status': record.status})
+                record.compact()
+                self._queue.task_done()
+                continue
+            key = self.get_browser_key(record.payload)
+            record.status = 'running'
+            try:
+                if key not in browsers:
+                    browsers[key] = self.browser_factory(record.payload)
+                audit_info = self.audit_func(
+                    record.payload, record.project_dir, browsers[key], record.add_event, record.cancel_event
+                ) or {}
+                status = audit_info.get('status')
+                record.status = status if status in ('completed', 'timed_out', 'cancelled') else 'error'
+            except Exception as e:
+                logging.error(f"Erreur lors de l'audit {record.audit_id} : {e}")
+                record.status = 'error'
+                record.add_event('error', {'message': str(e)})
+            finally:
+                # Navigateur tué, dans un état incohérent ou impossible à effacer : il sera relancé
+                if record.status != 'completed' or not self._reset_browser(browsers.get(key)):
+                    self._discard_browser(browsers.pop(key, None))
+                record.add_event('finished', {'status': record.status})
+                record.compact()
+                self._queue.task_done()
+
+    def _reset_browser(self, driver):
+        """
+        Efface l'état laissé par un audit dans un navigateur conservé.
+
+        Returns:
+            bool: True si le navigateur peut servir à l'audit suivant.
+        """
+        if driver is None or self.browser_reset is None:
+            return False
+        try:
+            return self.browser_reset(driver) is not False
+        except Exception as e:
+            logging.warning(f"Erreur lors de l'effacement de l'état du navigateur : {e}")
+            return False
+
+    @staticmethod
+    def _discard_browser(driver):
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Erreur lors de la fermeture du navigateur : {e}")
+
+def format_sse(event, data):
+    """
+    Formate un événement Server-Sent Events.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def evict_finished_audits(audits, retention=FINISHED_AUDIT_RETENTION, max_finished=MAX_FINISHED_AUDITS):
+    """
+    Oublie les audits terminés depuis plus de 'retention' secondes, et les plus
+    anciens au-delà de 'max_finished' audits terminés (leurs projets restent sur disque).
+
+    Args:
+        audits (dict): Identifiant -> AuditRecord (modifié sur place).
+        retention (float): Durée de conservation des audits terminés (secondes).
+        max_finished (int): Nombre maximal d'audits terminés conservés.
+    """
+    now = time.time()
+    finished = sorted(
+        (record for record in list(audits.values()) if record.finished and record.finished_at is not None),
+        key=lambda record: record.finished_at
+    )
+    excess = len(finished) - max_finished
+    for index, record in enumerate(finished):
+        if index < excess or now - record.finished_at > retention:
+            audits.pop(record.audit_id, None)
+
+def create_app(audit_func, browser_factory, results_dir='users', max_concurrency=2, default_payload=None,
+               template_folder=None, browser_reset=None):
+    """
+    Crée l'application Flask du service d'audit.
+
+    Les audits terminés sont oubliés après FINISHED_AUDIT_RETENTION secondes
+    (voir evict_finished_audits) ; leurs projets restent dans 'results_dir'.
+
+    Routes :
+        POST /audits                        Soumettre un audit ({'url', 'mobile', 'priority', 'deadline'}).
+        GET  /audits                        Lister les audits.
+        GET  /audits/<id>                   Statut d'un audit.
+        DELETE /audits/<id>                 Annuler un audit (en attente ou en cours).
+        GET  /audits/<id>/events            Avancement et requêtes capturées (SSE).
+        GET  /audits/<id>/artifacts/<nom>   Fichiers du projet (state.json...).
+        GET  /audits/<id>/report            Rapport HTML.
+
+    Args:
+        audit_func (callable): Voir AuditScheduler.
+        browser_factory (callable): Voir AuditScheduler.
+        results_dir (str): Dossier des projets.
+        max_concurrency (int): Nombre maximal d'audits simultanés.
+        default_payload (dict): Paramètres communs à tous les audits (optionnel).
+        template_folder (str): Dossier des templates HTML (optionnel).
+        browser_reset (callable): Voir AuditScheduler.
+
+    Returns:
+        Flask: L'application.
+    """
+    template_folder = template_folder or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+    app = Flask(__name__, template_folder=template_folder)
+    scheduler = AuditScheduler(audit_func, browser_factory, max_concurrency, browser_reset)
+    audits = {}
+
+    def get_record(audit_id):
+        record = audits.get(audit_id)
+        if record is None:
+            abort(404, description=f"Audit inconnu : {audit_id}")
+        return record
+
+    @app.post('/audits')
+    def submit_audit():
+        data = request.get_json(silent=True) or {}
+        if not data.get('url'):
+            return jsonify({'error': "Le champ 'url' est obligatoire."}), 400
+        try:
+            priority = int(data.get('priority', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': "Le champ 'priority' doit être un entier."}), 400
+        deadline = data.get('deadline')
+        if deadline is not None:
+            try:
+                deadline = float(deadline)
+            except (TypeError, ValueError):
+                return jsonify({'error': "Le champ 'deadline' doit être un nombre de secondes."}), 400
+        evict_finished_audits(audits)
+        audit_id = uuid.uuid4().hex[:12]
+        payload = dict(default_payload or {})
+        payload.update({
+            'url': data['url'],
+            'mode': 'automatique',
+            'mobile': bool(data.get('mobile', False))
+        })
+        if deadline is not None:
+            payload['deadline'] = deadline
+        project_dir = os.path.join(results_dir, f'service_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{audit_id}')
+        os.makedirs(project_dir, exist_ok=True)
+        record = AuditRecord(audit_id, payload, priority, project_dir)
+        audits[audit_id] = record
+        scheduler.submit(record)
+        return jsonify(record.to_dict()), 202
+
+    @app.get('/audits')
+    def list_audits():
+        evict_finished_audits(audits)
+        return jsonify([record.to_dict() for record in list(audits.values())])
+
+    @app.get('/audits/<audit_id>')
+    def get_audit(audit_id):
+        return jsonify(get_record(audit_id).to_dict())
+
+    @app.delete('/audits/<audit_id>')
+    def cancel_audit(audit_id):
+        record = get_record(audit_id)
+        if record.finished:
+            return jsonify({'error': "L'audit est déjà terminé.", 'status': record.status}), 409
+        # Annulation coopérative : l'audit en cours s'interrompt et tue son navigateur
+        record.cancel_event.set()
+        record.add_event('cancelling')
+        return jsonify(record.to_dict()), 202
+
+    @app.get('/audits/<audit_id>/events')
+    def stream_events(audit_id):
+        record = get_record(audit_id)
+
+        def generate():
+            index = 0
+            while True:
+                events = record.wait_events(index, timeout=15)
+                if not events:
+                    # Commentaire SSE pour garder la connexion ouverte
+                    yield ': keepalive\n\n'
+                for event in events:
+                    yield format_sse(event['phase'], event['data'])
+                index += len(events)
+                if events and events[-1]['phase'] == 'finished':
+                    return
+
+        return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    @app.get('/audits/<audit_id>/artifacts/<name>')
+    def get_artifact(audit_id, name):
+        record = get_record(audit_id)
+        if name not in SERVED_ARTIFACTS:
+            abort(404)
+        return send_from_directory(os.path.abspath(record.project_dir), name)
+
+    @app.get('/audits/<audit_id>/report')
+    def get_report(audit_id):
+        record = get_record(audit_id)
+        if not record.finished:
+            return jsonify({'error': "L'audit n'est pas terminé.", 'status': record.status}), 409
+
+        def load(name, default):
+            path = os.path.join(record.project_dir, name)
+            if not os.path.exists(path):
+                return default
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        return render_template(
+            'report_template.html',
+            audit_info=load('state.json', {}),
+            requests=load('requests.log', []),
+            dom_analysis=load('dom_analysis.json', {}),
+            charts={}
+        )
+
+    return app
@@ -0,0 +1,174 @@
+# modules/audit_worker.py
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import uuid
+import logging
+
+class AuditWorker:
+    """
+    Travailleur d'audit : réclame des tâches dans une file partagée, exécute
+    l'audit en prolongeant régulièrement son bail, puis publie les résultats
+    dans le dossier partagé des projets.
+
+    Les résultats sont produits dans un dossier local temporaire, copiés dans
+    un dossier de préparation caché du dossier partagé, puis renommés à leur
+    place définitive : un travailleur interrompu pendant la copie ne laisse
+    jamais de projet partiel sous le nom 'job_<id>'.
+    """
+
+    def __init__(self, job_queue, audit_func, results_dir, worker_id=None,
+                 lease_seconds=120, poll_interval=2):
+        """
+        Args:
+            job_queue (JobQueue): File de tâches partagée.
+            audit_func (callable): Fonction f(payload, project_dir, cancel_event=...) exécutant
+                l'audit et retournant les informations de l'audit (dict avec une clé 'status').
+                L'audit est annulé via 'cancel_event' si le bail est perdu.
+            results_dir (str): Dossier partagé où publier les projets terminés.
+            worker_id (str): Identifiant du travailleur (généré si absent).
+            lease_seconds (float): Durée du bail d'une tâche.
+            poll_interval (float): Attente entre deux réclamations quand la file est vide.
+        """
+        self.job_queue = job_queue
+        self.audit_func = audit_func
+        self.results_dir = results_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    def _heartbeat(self, job_id, done_event, lease_lost):
+        """
+        Prolonge le bail de la tâche tant que l'audit est en cours.
+        """
+        interval = self.lease_seconds / 3
+        while not done_event.wait(interval):
+            try:
+                if not self.job_queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                    logging.warning(f"Bail perdu pour la tâche {job_id}.")
+                    lease_lost.set()
+                    return
+            except Exception as e:
+                logging.error(f"Erreur lors du heartbeat de la tâche {job_id} : {e}")
+
+    def publish(self, local_dir, job_id):
+        """
+        Publie les résultats d'une tâche dans le dossier partagé.
+
+        La copie (qui peut traverser des systèmes de fichiers) se fait dans un
+        dossier de préparation du dossier partagé ; seul le renommage final,
+        atomique, rend le projet visible.
+
+        Returns:
+            str: Chemin du projet publié.
+        """
+        os.makedirs(self.results_dir, exist_ok=True)
+        target_dir = os.path.join(self.results_dir, f'job_{job_id}')
+        staging_dir = os.path.join(self.results_dir, f'.job_{job_id}.{uuid.uuid4().hex}')
+        try:
+            shutil.copytree(local_dir, staging_dir)
+            if os.path.exists(target_dir):
+                # Résultats d'une tentative précédente : écartés par renommage, supprimés
+                # seulement une fois les nouveaux résultats en place
+                previous_dir = f'{staging_dir}.old'
+                os.rename(target_dir, previous_dir)
+                os.rename(staging_dir, target_dir)
+                shutil.rmtree(previous_dir, ignore_errors=True)
+            else:
+                os.rename(staging_dir, target_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        shutil.rmtree(local_dir, ignore_errors=True)
+        return target_dir
+
+    def owns_lease(self, job_id):
+        """
+        Vérifie (en le prolongeant) que le bail de la tâche est toujours détenu.
+
+        Returns:
+            bool: False si une autre instance a repris la tâche.
+        """
+        try:
+            return self.job_queue.heartbeat(job_id, self.worker_id, self.lease_seconds)
+        except Exception as e:
+            logging.error(f"Erreur lors de la vérification du bail de la tâche {job_id} : {e}")
+            return False
+
+    def process(self, job):
+        """
+        Exécute une tâche réclamée et enregistre son résultat dans la file.
+
+        Args:
+            job (dict): Tâche retournée par JobQueue.claim.
+        """
+        job_id = job['id']
+        logging.info(f"[{self.worker_id}] Tâche {job_id} (tentative {job['attempts']}/{job['max_attempts']}) : {job['payload'].get('url')}")
+        done_event = threading.Event()
+        lease_lost = threading.Event()
+        heartbeat_thread = threading.Thread(target=self._heartbeat, args=(job_id, done_event, lease_lost), daemon=True)
+        heartbeat_thread.start()
+
+        local_dir = tempfile.mkdtemp(prefix=f'bone_breaker_job_{job_id}_')
+        try:
+            # Bail perdu : l'audit est annulé au lieu de se poursuivre pour rien
+            audit_info = self.audit_func(job['payload'], local_dir, cancel_event=lease_lost) or {}
+            status = audit_info.get('status')
+            error = None if status == 'completed' else f"Audit terminé avec le statut {status}"
+        except Exception as e:
+            audit_info, status, error = {}, None, str(e)
+        finally:
+            done_event.set()
+            heartbeat_thread.join()
+
+        # Bail vérifié avant toute publication : un bail expiré sans que le heartbeat
+        # l'ait remarqué ne doit pas écraser le projet du nouveau détenteur
+        if lease_lost.is_set() or not self.owns_lease(job_id):
+            logging.warning(f"[{self.worker_id}] Bail perdu pour la tâche {job_id} : résultats abandonnés.")
+            shutil.rmtree(local_dir, ignore_errors=True)
+            return
+        if error:
+            if status == 'timed_out':
+                # Résultats partiels conservés pour diagnostic (remplacés par une nouvelle tentative)
+                error = f"{error} : résultats partiels dans {self.publish(local_dir, job_id)}"
+            else:
+                shutil.rmtree(local_dir, ignore_errors=True)
+            self.job_queue.fail(job_id, self.worker_id, error)
+            return
+        project_dir = self.publish(local_dir, job_id)
+        self.job_queue.complete(job_id, self.worker_id, {
+            'project_dir': project_dir,
+            'status': audit_info.get('status'),
+            'technologies_detected': audit_info.get('technologies_detected', {})
+        })
+        logging.info(f"[{self.worker_id}] Tâche {job_id} terminée : {project_dir}")
+
+    def run(self, exit_when_empty=False):
+        """
+        Boucle principale du travailleur.
+
+        Args:
+            exit_when_empty (bool): S'arrêter dès que la file ne contient plus de tâche
+                en attente ni en cours.
+        """
+        logging.info(f"Travailleur {self.worker_id} démarré.")
+        while not self.stop_event.is_set():
+            job = self.job_queue.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                stats = self.job_queue.stats()
+                if exit_when_empty and not stats.get('pending') and not stats.get('running'):
+                    break
+                self.stop_event.wait(self.poll_interval)
+                continue
+            self.process(job)
+        logging.info(f"Travailleur {self.worker_id} arrêté.")
+
+    def stop(self):
+        """
+        Demande l'arrêt du travailleur après la tâche en cours.
+        """
+        self.stop_event.set()
@@ -3,10 +3,42 @@
 from seleniumwire import webdriver as wire_webdriver  # Importer Selenium Wire WebDriver pour Firefox
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from seleniumwire.utils import decode as decode_body
+from modules.dom_analyzer import parse_dom
+from modules.page_settle import NetworkActivity
+import hashlib
 import os
 import platform
+import threading
 import logging
 
+# Script exécuté dans le contexte privilégié de Firefox : efface les données de tous les
+# sites (cookies, stockage local, IndexedDB, caches, permissions...)
+_CLEAR_ALL_DATA_SCRIPT = """
+const callback = arguments[arguments.length - 1];
+Services.clearData.deleteData(Ci.nsIClearDataService.CLEAR_ALL, () => callback(true));
+"""
+
+# Durée maximale par défaut du chargement d'une page (secondes)
+DEFAULT_PAGE_LOAD_TIMEOUT = 60
+
+# Profils d'affichage (taille de fenêtre et User-Agent) disponibles pour l'audit
+VIEWPORT_PROFILES = {
+    'desktop': {
+        'width': 1366,
+        'height': 768,
+        'user_agent': None  # User-Agent par défaut de Firefox
+    },
+    'mobile': {
+        'width': 375,
+        'height': 667,
+        'user_agent': (
+            'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) '
+            'AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/119.0 Mobile/15E148 Safari/605.1.15'
+        )
+    }
+}
+
 def find_firefox_path():
     """
     Détecte le chemin de l'exécutable Firefox en fonction du système d'exploitation.
@@ -46,7 +78,67 @@ def find_firefox_path():
         logging.error("Firefox n'a pas été trouvé sur ce système.")
         raise FileNotFoundError("Firefox n'a pas été trouvé sur ce système.")
 
-def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=None, mobile=False):
+def chain_request_interceptors(interceptors):
+    """
+    Combine plusieurs intercepteurs de requêtes Selenium Wire en un seul.
+
+    Les intercepteurs sont appelés dans l'ordre ; dès que l'un d'eux fournit une
+    réponse (cache, rejeu, blocage...), les suivants ne sont pas appelés.
+
+    Args:
+        interceptors (list): Intercepteurs de la forme f(request).
+
+    Returns:
+        callable: Intercepteur combiné.
+    """
+    def interceptor(request):
+        for request_interceptor in interceptors:
+            request_interceptor(request)
+            if request.response is not None:
+                break
+    return interceptor
+
+def chain_response_interceptors(interceptors):
+    """
+    Combine plusieurs intercepteurs de réponses Selenium Wire en un seul.
+
+    Args:
+        interceptors (list): Intercepteurs de la forme f(request, response).
+
+    Returns:
+        callable: Intercepteur combiné.
+    """
+    def interceptor(request, response):
+        for response_interceptor in interceptors:
+            response_interceptor(request, response)
+    return interceptor
+
+def set_interceptors(driver, request_interceptors=None, response_interceptors=None):
+    """
+    Installe les intercepteurs Selenium Wire d'un navigateur (en remplaçant les
+    précédents), par exemple pour réutiliser un même navigateur entre plusieurs audits.
+
+    Le suivi de l'activité réseau (driver.network_activity, utilisé pour détecter
+    la stabilisation de la page) est toujours installé en premier : il voit aussi
+    les requêtes servies ou bloquées par les intercepteurs suivants.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium Wire.
+        request_interceptors (list): Intercepteurs de requêtes (optionnel).
+        response_interceptors (list): Intercepteurs de réponses (optionnel).
+    """
+    activity = NetworkActivity()
+    driver.network_activity = activity
+    driver.request_interceptor = chain_request_interceptors(
+        [activity.request_interceptor, *(request_interceptors or [])]
+    )
+    driver.response_interceptor = chain_response_interceptors(
+        [activity.response_interceptor, *(response_interceptors or [])]
+    )
+
+def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=None, mobile=False,
+                            profile=None, request_interceptors=None, response_interceptors=None, offline=False,
+                            page_load_timeout=DEFAULT_PAGE_LOAD_TIMEOUT, disable_cache=False, reusable=False):
     """
     Lance le navigateur spécifié avec Selenium Wire.
 
@@ -54,11 +146,26 @@ def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=No
         browser_name (str): Nom du navigateur ('firefox').
         mode (str): Mode de navigation ('automatique' ou 'manuel').
         proxy (str): Adresse du serveur proxy (optionnel).
-        mobile (bool): Activer l'émulation mobile si True.
+        mobile (bool): Activer l'émulation mobile si True (profil 'mobile').
+        profile (str): Nom du profil d'affichage (voir VIEWPORT_PROFILES, optionnel).
+        request_interceptors (list): Intercepteurs de requêtes Selenium Wire (optionnel).
+        response_interceptors (list): Intercepteurs de réponses Selenium Wire (optionnel).
+        offline (bool): Ne jamais contacter les serveurs d'origine (rejeu d'un enregistrement).
+        page_load_timeout (float): Durée maximale du chargement d'une page (secondes).
+        disable_cache (bool): Désactiver le cache HTTP de Firefox (navigateur réutilisé
+            entre plusieurs audits : toutes les ressources doivent passer par Selenium Wire).
+        reusable (bool): Autoriser l'accès au contexte privilégié de Firefox, nécessaire
+            pour effacer l'état du navigateur entre deux audits (voir reset_browser_state).
 
     Returns:
         webdriver.Firefox: Instance du navigateur lancé.
     """
+    if profile is None and mobile:
+        profile = 'mobile'
+    if profile is not None and profile not in VIEWPORT_PROFILES:
+        raise ValueError(f"Profil d'affichage non supporté : {profile}. Choisissez parmi {list(VIEWPORT_PROFILES)}.")
+    viewport = VIEWPORT_PROFILES.get(profile)
+
     if browser_name.lower() == 'firefox':
         options = FirefoxOptions()
         if mode == 'automatique':
@@ -72,16 +179,32 @@ def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=No
             options.set_preference('network.proxy.type', 1)
             options.set_preference('network.proxy.http', proxy)
             options.set_preference('network.proxy.ssl', proxy)
-        if mobile:
-            # Ajuster la taille de la fenêtre pour simuler un appareil mobile
-            options.add_argument('--width=375')
-            options.add_argument('--height=667')
+        if disable_cache:
+            # Une ressource servie par le cache de Firefox n'est pas vue par Selenium Wire
+            options.set_preference('browser.cache.disk.enable', False)
+            options.set_preference('browser.cache.memory.enable', False)
+            options.set_preference('browser.cache.offline.enable', False)
+        if viewport:
+            # Ajuster la taille de la fenêtre et le User-Agent selon le profil
+            options.add_argument(f"--width={viewport['width']}")
+            options.add_argument(f"--height={viewport['height']}")
+            if viewport['user_agent']:
+                options.set_preference('general.useragent.override', viewport['user_agent'])
 
         seleniumwire_options = {
             'verify_ssl': False,
         }
+        if offline:
+            # Ne pas contacter le serveur d'origine pour générer les certificats TLS
+            seleniumwire_options['mitm_upstream_cert'] = False
 
-        service = FirefoxService()
+        if reusable:
+            # Contexte privilégié (chrome) requis par reset_browser_state : option de ligne
+            # de commande depuis Firefox 138, variable d'environnement auparavant
+            options.add_argument('-remote-allow-system-access')
+            service = FirefoxService(env=dict(os.environ, MOZ_REMOTE_ALLOW_SYSTEM_ACCESS='1'))
+        else:
+            service = FirefoxService()
 
         try:
             driver = wire_webdriver.Firefox(
@@ -90,8 +213,11 @@ def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=No
                 service=service
             )
             logging.info("WebDriver Firefox initialisé avec succès.")
-            if mobile:
-                driver.set_window_size(375, 667)
+            # Sans limite, driver.get peut rester bloqué indéfiniment sur un site qui ne répond pas
+            driver.set_page_load_timeout(page_load_timeout)
+            if viewport:
+                driver.set_window_size(viewport['width'], viewport['height'])
+            set_interceptors(driver, request_interceptors, response_interceptors)
             return driver
         except Exception as e:
             logging.error(f"Erreur lors de l'initialisation de Firefox : {e}")
@@ -99,18 +225,153 @@ def launch_selenium_browser(browser_name='firefox', mode='automatique', proxy=No
     else:
         raise ValueError("Navigateur non supporté. Choisissez 'firefox'.")
 
-def detect_mobile_version_selenium(driver, url):
+def reset_browser_state(driver):
     """
-    Détecte si la page actuelle est en mode mobile.
+    Efface l'état laissé par l'audit précédent dans un navigateur réutilisé :
+    retour à une page vide, puis suppression des données de tous les sites
+    (cookies, stockage, caches, permissions) et des requêtes capturées.
+
+    WebDriver n'efface les cookies et le stockage que de l'origine affichée :
+    l'effacement passe par le contexte privilégié de Firefox, disponible si le
+    navigateur a été lancé avec 'reusable=True'.
 
     Args:
         driver (webdriver.Firefox): Instance du navigateur Selenium.
-        url (str): URL de la page à vérifier.
 
     Returns:
-        bool: True si la page est en mode mobile, False sinon.
+        bool: False si l'état n'a pas pu être effacé : le navigateur doit être relancé.
+    """
+    try:
+        driver.get('about:blank')
+        with driver.context(driver.CONTEXT_CHROME):
+            driver.execute_async_script(_CLEAR_ALL_DATA_SCRIPT)
+        del driver.requests
+    except Exception as e:
+        logging.warning(f"Impossible d'effacer l'état du navigateur : {e}")
+        return False
+    return True
+
+def kill_browser(driver, grace_period=5):
+    """
+    Ferme le navigateur sans rester bloqué : driver.quit() est tenté pendant
+    'grace_period' secondes, puis le processus geckodriver est tué.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+        grace_period (float): Délai accordé à une fermeture normale (secondes).
+    """
+    def quit_driver():
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f"Fermeture normale du navigateur impossible : {e}")
+
+    quit_thread = threading.Thread(target=quit_driver, name='browser-quit', daemon=True)
+    quit_thread.start()
+    quit_thread.join(grace_period)
+    if not quit_thread.is_alive():
+        logging.info("Navigateur fermé.")
+        return
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is not None and process.poll() is None:
+        process.kill()
+        logging.warning("Navigateur bloqué : processus geckodriver tué.")
+
+def find_document_request(driver):
+    """
+    Retrouve la requête du document principal affiché par le navigateur.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+
+    Returns:
+        seleniumwire.request.Request: Requête du document ou None.
+    """
+    current_url = driver.current_url
+    candidates = [request for request in driver.requests if request.response and request.url == current_url]
+    for request in reversed(candidates):
+        if request.headers.get('Sec-Fetch-Dest', 'document') == 'document':
+            return request
+    return candidates[-1] if candidates else None
+
+def summarize_served_document(final_url, response):
+    """
+    Résume le contenu servi pour le document principal : URL finale, empreinte
+    du document et ressources référencées. Ne dépend pas du navigateur : peut
+    s'exécuter dans l'étage d'analyse du pipeline.
+
+    Args:
+        final_url (str): URL finale du document.
+        response (seleniumwire.request.Response): Réponse du document (ou None).
+
+    Returns:
+        dict: Résumé du contenu servi.
+    """
+    snapshot = {
+        'final_url': final_url,
+        'status_code': None,
+        'document_hash': None,
+        'scripts': [],
+        'stylesheets': [],
+        'viewport_meta': None
+    }
+    if response is None:
+        logging.warning("Document principal introuvable parmi les requêtes capturées.")
+        return snapshot
+
+    body = decode_body(response.body, response.headers.get('Content-Encoding', 'identity'))
+    soup = parse_dom(body)
+    viewport = soup.find('meta', attrs={'name': 'viewport'})
+    snapshot.update({
+        'status_code': response.status_code,
+        'document_hash': hashlib.sha256(body).hexdigest(),
+        'scripts': sorted({script['src'] for script in soup.find_all('script', src=True)}),
+        'stylesheets': sorted({
+            link['href'] for link in soup.find_all('link', href=True)
+            if 'stylesheet' in (link.get('rel') or [])
+        }),
+        'viewport_meta': viewport.get('content') if viewport else None
+    })
+    return snapshot
+
+def capture_served_snapshot(driver):
+    """
+    Résume le contenu réellement servi pour le document principal du navigateur
+    (voir summarize_served_document).
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+
+    Returns:
+        dict: Résumé du contenu servi.
+    """
+    request = find_document_request(driver)
+    return summarize_served_document(driver.current_url, request.response if request else None)
+
+def detect_mobile_version(mobile_snapshot, desktop_snapshot):
+    """
+    Détecte si le site sert une version mobile distincte en comparant le contenu
+    servi au profil mobile et au profil desktop.
+
+    Args:
+        mobile_snapshot (dict): Contenu servi au profil mobile (capture_served_snapshot).
+        desktop_snapshot (dict): Contenu servi au profil desktop (capture_served_snapshot).
+
+    Returns:
+        dict: {'is_mobile_version': bool, 'responsive': bool, 'differences': list}.
     """
-    # Vérifier la taille de la fenêtre ou des éléments spécifiques
-    width = driver.get_window_size()['width']
-    # Définir un seuil, par exemple, moins de 800 pixels de largeur pour mobile
-    return width < 800
+    differences = []
+    if mobile_snapshot['final_url'] != desktop_snapshot['final_url']:
+        differences.append('final_url')
+    if mobile_snapshot['scripts'] != desktop_snapshot['scripts']:
+        differences.append('scripts')
+    if mobile_snapshot['stylesheets'] != desktop_snapshot['stylesheets']:
+        differences.append('stylesheets')
+    # Un document différent seul peut venir d'un jeton ou d'un horodatage : non décisif
+    if mobile_snapshot['document_hash'] != desktop_snapshot['document_hash']:
+        differences.append('document')
+    return {
+        'is_mobile_version': any(difference != 'document' for difference in differences),
+        'responsive': bool(mobile_snapshot['viewport_meta']),
+        'differences': differences
+    }
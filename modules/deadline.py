@@ -0,0 +1,172 @@
+# modules/deadline.py
+
+import math
+import threading
+import time
+import logging
+
+# Durée maximale par défaut d'un audit automatique (secondes)
+DEFAULT_AUDIT_DEADLINE = 300
+
+# Répartition du budget entre les phases de l'audit (fractions du temps restant)
+DEFAULT_PHASE_BUDGETS = {
+    'load': 0.4,           # Chargement et stabilisation de la page
+    'analysis': 0.1,       # Lecture du DOM et résumé du contenu servi
+    'interactions': 0.35,  # Interactions simulées (ou session manuelle)
+    'capture': 0.15        # Capture des requêtes, identification et sauvegarde
+}
+
+class AuditTimeout(Exception):
+    """
+    Levée lorsque le budget de temps d'un audit (ou de l'une de ses phases) est
+    épuisé, ou lorsque l'audit a été annulé.
+    """
+
+    def __init__(self, phase, cancelled=False):
+        self.phase = phase
+        self.cancelled = cancelled
+        reason = 'Audit annulé' if cancelled else 'Délai de l\'audit dépassé'
+        super().__init__(f"{reason} (phase : {phase})")
+
+class AuditDeadline:
+    """
+    Budget de temps global d'un audit, réparti entre ses phases.
+
+    Chaque phase reçoit une part du temps restant à son démarrage : le temps
+    non consommé par une phase rapide profite aux suivantes. L'annulation est
+    coopérative (les étapes appellent 'check' entre deux opérations) ; un
+    chien de garde appelle en plus 'on_expire' dès l'expiration, pour
+    débloquer un appel bloqué dans le navigateur (en le tuant).
+    """
+
+    def __init__(self, total_seconds=None, phase_budgets=None, cancel_event=None):
+        """
+        Args:
+            total_seconds (float): Durée maximale de l'audit (None : illimitée).
+            phase_budgets (dict): Phase -> fraction du budget (voir DEFAULT_PHASE_BUDGETS).
+            cancel_event (threading.Event): Événement d'annulation externe (optionnel).
+        """
+        self.total_seconds = total_seconds
+        self.phase_budgets = dict(phase_budgets or DEFAULT_PHASE_BUDGETS)
+        self.cancel_event = cancel_event or threading.Event()
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + total_seconds if total_seconds else math.inf
+        self.phase = None
+        self.phase_expires_at = self.expires_at
+        self.timed_out = False
+        self.on_expire = None
+        self._remaining_phases = list(self.phase_budgets)
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._interrupted = threading.Event()
+        self._watchdog = None
+
+    def start_phase(self, phase):
+        """
+        Démarre une phase et calcule son échéance.
+
+        Raises:
+            AuditTimeout: Si le budget est déjà épuisé.
+        """
+        self.check()
+        now = time.monotonic()
+        if phase in self._remaining_phases:
+            # Part de la phase parmi les phases restantes, appliquée au temps restant
+            shares = sum(self.phase_budgets[name] for name in self._remaining_phases)
+            fraction = self.phase_budgets[phase] / shares if shares else 1
+            self._remaining_phases = self._remaining_phases[self._remaining_phases.index(phase) + 1:]
+        else:
+            fraction = 1
+        if not self._remaining_phases:
+            # Dernière phase : tout le temps restant
+            fraction = 1
+        self.phase = phase
+        self.phase_expires_at = min(self.expires_at, now + (self.expires_at - now) * fraction)
+        logging.debug(f"Phase '{phase}' : {self.remaining():.1f}s disponibles.")
+
+    def remaining(self):
+        """
+        Retourne le temps restant (secondes) avant l'échéance de la phase courante.
+        """
+        return max(0.0, self.phase_expires_at - time.monotonic())
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def expired(self):
+        return self.timed_out or self.cancelled or time.monotonic() >= self.phase_expires_at
+
+    def check(self):
+        """
+        Vérifie que l'audit peut se poursuivre.
+
+        Raises:
+            AuditTimeout: Si l'échéance de la phase est dépassée ou si l'audit a été annulé.
+        """
+        if self.expired:
+            self.expire()
+            raise AuditTimeout(self.phase, cancelled=self.cancelled)
+
+    def wait(self, seconds):
+        """
+        Attend 'seconds' secondes au plus, en s'interrompant dès l'annulation ou l'échéance.
+
+        Returns:
+            bool: True si l'audit a expiré ou a été annulé pendant l'attente.
+        """
+        self.cancel_event.wait(min(seconds, self.remaining()))
+        return self.expired
+
+    def expire(self):
+        """
+        Marque l'audit comme expiré et appelle 'on_expire' (une seule fois). Les
+        appels concurrents attendent la fin de 'on_expire'.
+        """
+        with self._lock:
+            first_call = not self.timed_out
+            self.timed_out = True
+        if not first_call:
+            self._interrupted.wait()
+            return
+        logging.warning(f"Audit interrompu pendant la phase '{self.phase}' "
+                        f"après {time.monotonic() - self.started_at:.1f}s.")
+        if self.on_expire is not None:
+            try:
+                self.on_expire()
+            except Exception as e:
+                logging.error(f"Erreur lors de l'interruption de l'audit : {e}")
+        self._interrupted.set()
+
+    def watch(self, on_expire, poll_interval=0.5):
+        """
+        Démarre le chien de garde : 'on_expire' est appelé dès l'échéance de la
+        phase courante ou l'annulation, même si l'audit est bloqué.
+
+        Args:
+            on_expire (callable): Fonction sans argument (ex: tuer le navigateur).
+            poll_interval (float): Intervalle maximal entre deux vérifications (secondes).
+        """
+        self.on_expire = on_expire
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(
+                target=self._watch, args=(poll_interval,), name='audit-watchdog', daemon=True
+            )
+            self._watchdog.start()
+
+    def _watch(self, poll_interval):
+        while not self._finished.is_set():
+            # Échéance recalculée à chaque tour : elle change avec la phase
+            self.cancel_event.wait(min(poll_interval, self.remaining()))
+            if self._finished.is_set():
+                return
+            if self.expired:
+                self.expire()
+                return
+
+    def finish(self):
+        """
+        Arrête le chien de garde (fin de l'audit).
+        """
+        self._finished.set()
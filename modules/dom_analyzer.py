@@ -18,6 +18,56 @@ def parse_dom(html_content):
     soup = BeautifulSoup(html_content, 'lxml')
     return soup
 
+def detect_script_technology(src, technologies):
+    """
+    Détecte les frameworks JavaScript à partir de l'attribut src d'une balise <script>.
+    
+    Args:
+        src (str): Valeur de l'attribut src.
+        technologies (dict): Dictionnaire des technologies détectées, mis à jour.
+    """
+    src = src.lower()
+    
+    # Exemple de détection de React
+    if 'react' in src:
+        technologies['React'] = extract_version(src, 'react')
+    
+    # Exemple de détection de Angular
+    if 'angular' in src:
+        technologies['Angular'] = extract_version(src, 'angular')
+    
+    # Exemple de détection de Vue.js
+    if 'vue' in src:
+        technologies['Vue.js'] = extract_version(src, 'vue')
+    
+    # Ajouter d'autres détections selon les besoins
+
+def detect_meta_technology(name, content, technologies):
+    """
+    Détecte le CMS à partir d'une balise <meta name="generator">.
+    
+    Args:
+        name (str): Valeur de l'attribut name.
+        content (str): Valeur de l'attribut content.
+        technologies (dict): Dictionnaire des technologies détectées, mis à jour.
+    """
+    if name == 'generator':
+        technologies['CMS'] = content
+
+def detect_link_technology(href, technologies):
+    """
+    Détecte les frameworks CSS à partir de l'attribut href d'une balise <link>.
+    
+    Args:
+        href (str): Valeur de l'attribut href.
+        technologies (dict): Dictionnaire des technologies détectées, mis à jour.
+    """
+    href = href.lower()
+    if 'bootstrap' in href:
+        technologies['Bootstrap'] = extract_version(href, 'bootstrap')
+    if 'tailwind' in href:
+        technologies['Tailwind CSS'] = extract_version(href, 'tailwind')
+
 def detect_technologies(soup):
     """
     Détecte les technologies utilisées sur la page web en analysant le DOM.
@@ -31,39 +81,40 @@ def detect_technologies(soup):
     technologies = {}
     
     # Détection des frameworks JavaScript via les balises <script>
-    scripts = soup.find_all('script')
-    for script in scripts:
-        src = script.get('src', '').lower()
-        
-        # Exemple de détection de React
-        if 'react' in src:
-            technologies['React'] = extract_version(src, 'react')
-        
-        # Exemple de détection de Angular
-        if 'angular' in src:
-            technologies['Angular'] = extract_version(src, 'angular')
-        
-        # Exemple de détection de Vue.js
-        if 'vue' in src:
-            technologies['Vue.js'] = extract_version(src, 'vue')
-        
-        # Ajouter d'autres détections selon les besoins
+    for script in soup.find_all('script'):
+        detect_script_technology(script.get('src', ''), technologies)
     
     # Détection via les meta tags
-    meta_tags = soup.find_all('meta')
-    for meta in meta_tags:
-        if meta.get('name') == 'generator':
-            technologies['CMS'] = meta.get('content', 'Unknown')
+    for meta in soup.find_all('meta'):
+        detect_meta_technology(meta.get('name'), meta.get('content', 'Unknown'), technologies)
     
     # Détection des frameworks CSS via les balises <link>
-    links = soup.find_all('link')
-    for link in links:
-        href = link.get('href', '').lower()
-        if 'bootstrap' in href:
-            technologies['Bootstrap'] = extract_version(href, 'bootstrap')
-        if 'tailwind' in href:
-            technologies['Tailwind CSS'] = extract_version(href, 'tailwind')
+    for link in soup.find_all('link'):
+        detect_link_technology(link.get('href', ''), technologies)
+    
+    return technologies
+
+def detect_technologies_from_nodes(nodes):
+    """
+    Détecte les technologies à partir d'une liste de balises déjà extraites du DOM
+    (par exemple les modifications relevées par modules.dom_tracker), sans
+    analyser le document complet.
+    
+    Args:
+        nodes (list): Balises sous la forme {'tag': 'script'|'link'|'meta', 'attrs': dict}.
     
+    Returns:
+        dict: Dictionnaire des technologies détectées avec leurs versions si disponibles.
+    """
+    technologies = {}
+    for node in nodes:
+        attrs = node.get('attrs', {})
+        if node['tag'] == 'script':
+            detect_script_technology(attrs.get('src', ''), technologies)
+        elif node['tag'] == 'meta':
+            detect_meta_technology(attrs.get('name'), attrs.get('content', 'Unknown'), technologies)
+        elif node['tag'] == 'link':
+            detect_link_technology(attrs.get('href', ''), technologies)
     return technologies
 
 def extract_version(url, technology):
@@ -0,0 +1,150 @@
+# modules/dom_tracker.py
+
+import logging
+from modules.dom_analyzer import detect_technologies_from_nodes
+
+# Script injecté : un MutationObserver accumule les ajouts, suppressions et
+# modifications d'attributs des balises <script>, <link> et <meta>. Les balises
+# déjà présentes à l'installation sont relevées comme ajoutées.
+_INSTALL_SCRIPT = """
+return (function() {
+    if (window.__boneBreakerDomTracker) {
+        return false;
+    }
+    var TAGS = 'script,link,meta';
+    var state = {changes: []};
+    function describe(element, type) {
+        var attrs = {};
+        for (var i = 0; i < element.attributes.length; i++) {
+            attrs[element.attributes[i].name] = element.attributes[i].value;
+        }
+        return {type: type, tag: element.tagName.toLowerCase(), attrs: attrs};
+    }
+    function collect(node, type) {
+        if (node.nodeType !== 1) {
+            return;
+        }
+        if (node.matches(TAGS)) {
+            state.changes.push(describe(node, type));
+        }
+        var elements = node.querySelectorAll(TAGS);
+        for (var i = 0; i < elements.length; i++) {
+            state.changes.push(describe(elements[i], type));
+        }
+    }
+    collect(document.documentElement, 'added');
+    new MutationObserver(function(mutations) {
+        mutations.forEach(function(mutation) {
+            if (mutation.type === 'childList') {
+                mutation.addedNodes.forEach(function(node) { collect(node, 'added'); });
+                mutation.removedNodes.forEach(function(node) { collect(node, 'removed'); });
+            } else if (mutation.type === 'attributes' && mutation.target.matches(TAGS)) {
+                var change = describe(mutation.target, 'attribute');
+                change.attribute = mutation.attributeName;
+                change.old_value = mutation.oldValue;
+                state.changes.push(change);
+            }
+        });
+    }).observe(document, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeOldValue: true,
+        attributeFilter: ['src', 'href', 'rel', 'name', 'property', 'content', 'type']
+    });
+    window.__boneBreakerDomTracker = state;
+    return true;
+})();
+"""
+
+# Script de récupération des modifications accumulées (null si la page a changé)
+_DRAIN_SCRIPT = """
+var state = window.__boneBreakerDomTracker;
+if (!state) {
+    return null;
+}
+return state.changes.splice(0, state.changes.length);
+"""
+
+class DomTracker:
+    """
+    Suivi incrémental du DOM entre les étapes d'interaction.
+
+    Au lieu de relire et d'analyser tout page_source après chaque interaction,
+    chaque étape ne récupère que les balises ajoutées, supprimées ou modifiées
+    depuis l'étape précédente, et la détection des technologies n'est appliquée
+    qu'à ces deltas. Après une navigation vers un nouveau document, le suivi est
+    réinstallé et l'étape reçoit les balises du nouveau document.
+    """
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver (webdriver.Firefox): Instance du navigateur Selenium.
+        """
+        self.driver = driver
+        self.technologies = {}
+        self.steps = []
+
+    def install(self):
+        """
+        Injecte le suivi dans la page courante. Les balises déjà présentes sont
+        considérées comme connues (analysées par ailleurs avec page_source).
+        """
+        self._execute(_INSTALL_SCRIPT)
+        self._execute(_DRAIN_SCRIPT)
+
+    def _execute(self, script):
+        try:
+            return self.driver.execute_script(script)
+        except Exception as e:
+            logging.debug(f"Suivi du DOM indisponible : {e}")
+            return None
+
+    def drain(self):
+        """
+        Récupère les modifications accumulées depuis le dernier appel.
+
+        Returns:
+            tuple: (liste des modifications, True si un nouveau document a été chargé).
+        """
+        changes = self._execute(_DRAIN_SCRIPT)
+        if changes is not None:
+            return changes, False
+        # Nouveau document : le suivi est réinstallé et relève ses balises
+        self._execute(_INSTALL_SCRIPT)
+        return self._execute(_DRAIN_SCRIPT) or [], True
+
+    def record_step(self, step):
+        """
+        Enregistre les modifications du DOM provoquées par une étape d'interaction
+        et met à jour les technologies détectées à partir de ces seules modifications.
+
+        Args:
+            step (str): Nom de l'étape (ex: 'search_submit').
+
+        Returns:
+            dict: Résumé de l'étape.
+        """
+        changes, reset = self.drain()
+        present = [change for change in changes if change['type'] in ('added', 'attribute')]
+        detected = detect_technologies_from_nodes(present)
+        new_technologies = {
+            name: version for name, version in detected.items()
+            if self.technologies.get(name) != version
+        }
+        self.technologies.update(detected)
+        summary = {
+            'step': step,
+            'new_document': reset,
+            'added': [change for change in changes if change['type'] == 'added'],
+            'removed': [change for change in changes if change['type'] == 'removed'],
+            'attributes': [change for change in changes if change['type'] == 'attribute'],
+            'new_technologies': new_technologies
+        }
+        self.steps.append(summary)
+        logging.info(
+            f"Étape '{step}' : {len(summary['added'])} ajout(s), {len(summary['removed'])} suppression(s), "
+            f"{len(summary['attributes'])} modification(s) d'attributs, nouvelles technologies : {new_technologies}"
+        )
+        return summary
@@ -2,6 +2,40 @@
 
 import json
 import os
+from modules.request_blocker import get_blocked_reason
+
+def serialize_request(request):
+    """
+    Convertit une requête interceptée (avec sa réponse) en dictionnaire sérialisable.
+
+    Args:
+        request (seleniumwire.request.Request): Requête interceptée ayant une réponse.
+
+    Returns:
+        dict: Détails de la requête et de la réponse.
+    """
+    # Tenter d'accéder aux cookies via 'cookies' attribut
+    try:
+        cookies = request.response.cookies
+    except AttributeError:
+        # Si 'cookies' n'existe pas, récupérer via 'Set-Cookie' header
+        set_cookie = request.response.headers.get('Set-Cookie', '')
+        cookies = set_cookie if set_cookie else ''
+    data = {
+        'url': request.url,
+        'method': request.method,
+        'status_code': request.response.status_code,
+        'request_headers': dict(request.headers),
+        'response_headers': dict(request.response.headers),
+        'cookies': cookies,
+        'blocked': False
+    }
+    # Requête bloquée par la politique de blocage (voir modules.request_blocker)
+    blocked_reason = get_blocked_reason(request.response)
+    if blocked_reason:
+        data['blocked'] = True
+        data['blocked_reason'] = blocked_reason
+    return data
 
 def intercept_requests_selenium(driver):
     """
@@ -16,22 +50,7 @@ def intercept_requests_selenium(driver):
     intercepted_requests = []
     for request in driver.requests:
         if request.response:
-            # Tenter d'accéder aux cookies via 'cookies' attribut
-            try:
-                cookies = request.response.cookies
-            except AttributeError:
-                # Si 'cookies' n'existe pas, récupérer via 'Set-Cookie' header
-                set_cookie = request.response.headers.get('Set-Cookie', '')
-                cookies = set_cookie if set_cookie else ''
-            data = {
-                'url': request.url,
-                'method': request.method,
-                'status_code': request.response.status_code,
-                'request_headers': dict(request.headers),
-                'response_headers': dict(request.response.headers),
-                'cookies': cookies
-            }
-            intercepted_requests.append(data)
+            intercepted_requests.append(serialize_request(request))
     return intercepted_requests
 
 def save_requests(project_path, requests_data):
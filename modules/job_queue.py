@@ -0,0 +1,232 @@
+# modules/job_queue.py
+
+import abc
+import json
+import os
+import sqlite3
+import time
+import logging
+
+class JobQueue(abc.ABC):
+    """
+    Interface d'une file de tâches d'audit partagée entre plusieurs travailleurs.
+
+    Une tâche réclamée est louée ('lease') pour une durée limitée : le travailleur
+    doit prolonger le bail régulièrement (heartbeat). Si le travailleur s'arrête
+    brutalement, le bail expire et la tâche peut être reprise par un autre.
+    """
+
+    @abc.abstractmethod
+    def enqueue(self, payload, priority=0, max_attempts=3):
+        """
+        Ajoute une tâche à la file.
+
+        Args:
+            payload (dict): Paramètres de l'audit (sérialisables en JSON).
+            priority (int): Priorité (les plus grandes valeurs passent en premier).
+            max_attempts (int): Nombre maximal de tentatives.
+
+        Returns:
+            int: Identifiant de la tâche.
+        """
+
+    @abc.abstractmethod
+    def claim(self, worker_id, lease_seconds):
+        """
+        Réclame la prochaine tâche disponible.
+
+        Returns:
+            dict: Tâche réclamée ({'id', 'payload', 'attempts', ...}) ou None.
+        """
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        """
+        Prolonge le bail d'une tâche.
+
+        Returns:
+            bool: False si le bail a été perdu (tâche reprise par un autre travailleur).
+        """
+
+    @abc.abstractmethod
+    def complete(self, job_id, worker_id, result):
+        """
+        Marque une tâche comme terminée avec son résultat.
+
+        Returns:
+            bool: False si le bail avait été perdu.
+        """
+
+    @abc.abstractmethod
+    def fail(self, job_id, worker_id, error):
+        """
+        Signale l'échec d'une tâche : elle est replanifiée avec un délai croissant,
+        ou marquée en échec définitif une fois le nombre maximal de tentatives atteint.
+
+        Returns:
+            bool: False si le bail avait été perdu.
+        """
+
+    @abc.abstractmethod
+    def stats(self):
+        """
+        Retourne le nombre de tâches par statut.
+
+        Returns:
+            dict: Statut -> nombre de tâches.
+        """
+
+class SQLiteJobQueue(JobQueue):
+    """
+    File de tâches stockée dans une base SQLite locale, utilisable par plusieurs
+    processus de la même machine (ou via un système de fichiers partagé).
+    """
+
+    def __init__(self, db_path, backoff_base=5, backoff_max=300):
+        """
+        Args:
+            db_path (str): Chemin de la base SQLite.
+            backoff_base (float): Délai (secondes) avant la première nouvelle tentative.
+            backoff_max (float): Délai maximal entre deux tentatives.
+        """
+        self.db_path = db_path
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, available_at)'
+            )
+
+    def _connect(self):
+        return _Connection(self.db_path)
+
+    def enqueue(self, payload, priority=0, max_attempts=3):
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                'INSERT INTO jobs (payload, priority, max_attempts, available_at, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (json.dumps(payload, ensure_ascii=False), priority, max_attempts, now, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker_id, lease_seconds):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            # Baux expirés : la tâche est abandonnée si toutes les tentatives sont épuisées
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Bail expiré', lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = connection.execute(
+                "SELECT id, payload, attempts, max_attempts FROM jobs "
+                "WHERE (status = 'pending' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row[0])
+            )
+            connection.execute('COMMIT')
+        return {
+            'id': row[0],
+            'payload': json.loads(row[1]),
+            'attempts': row[2] + 1,
+            'max_attempts': row[3]
+        }
+
+    def _update_owned(self, job_id, worker_id, assignments, params):
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (*params, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        return self._update_owned(job_id, worker_id, 'lease_expires = ?', (time.time() + lease_seconds,))
+
+    def complete(self, job_id, worker_id, result):
+        return self._update_owned(
+            job_id, worker_id,
+            "status = 'done', lease_owner = NULL, lease_expires = NULL, result = ?",
+            (json.dumps(result, ensure_ascii=False),)
+        )
+
+    def fail(self, job_id, worker_id, error):
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return False
+            attempts, max_attempts = row
+            now = time.time()
+            if attempts >= max_attempts:
+                status, available_at = 'failed', now
+            else:
+                # Délai exponentiel entre les tentatives
+                status = 'pending'
+                available_at = now + min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+            connection.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "error = ?, updated_at = ? WHERE id = ?",
+                (status, available_at, str(error), now, job_id)
+            )
+            connection.execute('COMMIT')
+        logging.info(f"Tâche {job_id} en échec (tentative {attempts}/{max_attempts}) : {status}.")
+        return True
+
+    def stats(self):
+        with self._connect() as connection:
+            return dict(connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+class _Connection:
+    """
+    Connexion SQLite utilisable comme gestionnaire de contexte (fermée en sortie).
+    """
+
+    def __init__(self, db_path):
+        # isolation_level=None : les transactions sont ouvertes explicitement (BEGIN IMMEDIATE)
+        self._connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+
+    def __enter__(self):
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self._connection.in_transaction:
+            self._connection.execute('ROLLBACK')
+        self._connection.close()
+        return False
@@ -0,0 +1,229 @@
+# modules/log_config.py
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+import logging
+import logging.handlers
+from datetime import datetime
+
+# Format texte historique des logs
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Événements émis à chaque requête, soumis à l'échantillonnage et à la limitation de débit
+PER_REQUEST_EVENTS = {'request', 'blocked', 'cache_hit', 'replay_miss'}
+
+# Écouteur actif (un seul par processus)
+_listener = None
+_quiet = False
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formate chaque enregistrement en une ligne JSON (horodatage, niveau, message
+    et champs structurés de l'événement).
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        event = getattr(record, 'event', None)
+        if event is not None:
+            entry['event'] = event
+            entry['data'] = getattr(record, 'event_data', {})
+        skipped = getattr(record, 'skipped', 0)
+        if skipped:
+            entry['skipped'] = skipped
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class EventRateLimiter(logging.Filter):
+    """
+    Échantillonne et limite le débit des événements émis à chaque requête.
+
+    Seul un événement sur 'sample_every' est retenu, puis un seau à jetons
+    ('rate' événements par seconde, rafales de 'burst') borne le débit de
+    chaque type d'événement. Les autres enregistrements passent sans limite.
+    Le nombre d'événements omis est reporté sur le suivant retenu ('skipped').
+    """
+
+    def __init__(self, rate=20, burst=50, sample_every=1, events=PER_REQUEST_EVENTS):
+        """
+        Args:
+            rate (float): Événements retenus par seconde et par type (0 : pas de limite).
+            burst (int): Nombre d'événements acceptés en rafale.
+            sample_every (int): Ne retenir qu'un événement sur N.
+            events (set): Types d'événements concernés.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.sample_every = max(1, sample_every)
+        self.events = events
+        self.dropped = {}
+        self._seen = {}
+        self._pending = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        if event not in self.events:
+            return True
+        with self._lock:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            keep = seen % self.sample_every == 0
+            if keep and self.rate > 0:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(event, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                keep = tokens >= 1
+                self._buckets[event] = (tokens - 1 if keep else tokens, now)
+            if not keep:
+                self.dropped[event] = self.dropped.get(event, 0) + 1
+                self._pending[event] = self._pending.get(event, 0) + 1
+                return False
+            skipped = self._pending.pop(event, 0)
+        if skipped:
+            record.skipped = skipped
+            record.msg = f"{record.getMessage()} ({skipped} événement(s) similaire(s) omis)"
+            record.args = None
+        return True
+
+class ProgressCounter:
+    """
+    Compteur d'avancement affiché sur une seule ligne (mode silencieux) : il
+    remplace l'affichage d'une ligne par requête capturée.
+    """
+
+    def __init__(self, label, interval=1.0, enabled=None, stream=None):
+        """
+        Args:
+            label (str): Libellé du compteur (ex: 'Requêtes capturées').
+            interval (float): Intervalle minimal entre deux affichages (secondes).
+            enabled (bool): Afficher le compteur (défaut : en mode silencieux uniquement).
+            stream (file): Flux d'affichage (défaut : sys.stderr).
+        """
+        self.label = label
+        self.interval = interval
+        self.enabled = _quiet if enabled is None else enabled
+        self.stream = stream or sys.stderr
+        self.count = 0
+        self._last_display = 0
+        self._lock = threading.Lock()
+
+    def increment(self, amount=1):
+        with self._lock:
+            self.count += amount
+            now = time.monotonic()
+            if self.enabled and now - self._last_display >= self.interval:
+                self._last_display = now
+                self._display()
+
+    def _display(self, end=''):
+        self.stream.write(f"\r{self.label} : {self.count}{end}")
+        self.stream.flush()
+
+    def close(self):
+        """
+        Affiche la valeur finale du compteur.
+        """
+        with self._lock:
+            if self.enabled:
+                self._display('\n')
+
+def log_event(event, message, *args, level=logging.INFO, **data):
+    """
+    Journalise un événement structuré (champs 'event' et 'data' en sortie JSON).
+
+    Le message n'est mis en forme (avec 'args', à la manière de logging) que si
+    le niveau est actif et que l'événement n'est pas écarté par l'échantillonnage :
+    les appels depuis les intercepteurs du proxy restent peu coûteux.
+
+    Args:
+        event (str): Type d'événement (ex: 'request').
+        message (str): Message lisible (ex: "Requête bloquée : %s").
+        *args: Arguments du message.
+        level (int): Niveau de log.
+        **data: Champs de l'événement.
+    """
+    logging.log(level, message, *args, extra={'event': event, 'event_data': data})
+
+def is_quiet():
+    """
+    Indique si le mode silencieux est actif.
+    """
+    return _quiet
+
+def setup_logging(level='INFO', log_format='text', log_file=None, quiet=False,
+                  request_rate=20, request_burst=50, request_sample_every=1):
+    """
+    Configure des logs non bloquants : les enregistrements sont placés dans une
+    file et écrits par un thread dédié, de sorte que les boucles de capture ne
+    paient jamais le coût des entrées/sorties de la console ou du disque.
+
+    Args:
+        level (str): Niveau minimal des logs.
+        log_format (str): Format de la console ('text' ou 'json').
+        log_file (str): Fichier de logs au format JSON Lines (optionnel).
+        quiet (bool): N'afficher que les avertissements et les erreurs sur la console
+            (les compteurs d'avancement remplacent les messages par requête).
+        request_rate (float): Événements par requête retenus par seconde (0 : pas de limite).
+        request_burst (int): Événements par requête acceptés en rafale.
+        request_sample_every (int): Ne retenir qu'un événement par requête sur N.
+
+    Returns:
+        EventRateLimiter: Le filtre appliqué (statistiques des événements omis).
+    """
+    global _listener, _quiet
+    stop_logging()
+    _quiet = quiet
+
+    console = logging.StreamHandler()
+    console.setFormatter(JsonLinesFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    if quiet:
+        console.setLevel(logging.WARNING)
+    handlers = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    rate_limiter = EventRateLimiter(request_rate, request_burst, request_sample_every)
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(rate_limiter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return rate_limiter
+
+def stop_logging():
+    """
+    Vide la file des logs et arrête le thread d'écriture.
+    """
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        try:
+            listener.stop()
+        except Exception:
+            pass
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(stop_logging)
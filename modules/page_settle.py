@@ -0,0 +1,205 @@
+# modules/page_settle.py
+
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+
+# Paramètres par défaut de la détection de stabilisation de la page
+DEFAULT_SETTLE_OPTIONS = {
+    'idle_ms': 500,            # Durée sans requête en cours pour considérer le réseau inactif
+    'timeout': 30,             # Durée maximale d'attente (secondes)
+    'poll_interval': 0.1,      # Intervalle entre deux vérifications (secondes)
+    'long_request_ms': 10000,  # Au-delà, une requête sans réponse est ignorée (long polling, websocket...)
+    'wait_dom': False          # Attendre aussi la stabilisation des mutations du DOM
+}
+
+# Script injecté pour mémoriser l'instant de la dernière mutation du DOM
+_DOM_OBSERVER_SCRIPT = """
+if (!window.__boneBreakerSettle) {
+    window.__boneBreakerSettle = {lastMutation: Date.now()};
+    var observer = new MutationObserver(function() {
+        window.__boneBreakerSettle.lastMutation = Date.now();
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return Date.now() - window.__boneBreakerSettle.lastMutation;
+"""
+
+def resolve_settle_options(settle_options=None):
+    """
+    Fusionne les options fournies avec les options par défaut.
+
+    Args:
+        settle_options (dict): Options de stabilisation (optionnel).
+
+    Returns:
+        dict: Options complètes.
+    """
+    options = dict(DEFAULT_SETTLE_OPTIONS)
+    if settle_options:
+        options.update({key: value for key, value in settle_options.items() if value is not None})
+    return options
+
+class NetworkActivity:
+    """
+    Suivi en mémoire de l'activité réseau d'un navigateur, alimenté par une
+    paire d'intercepteurs Selenium Wire (voir browser_config.set_interceptors).
+
+    Lire driver.requests désérialise toutes les requêtes stockées, corps
+    compris : trop coûteux pour être interrogé toutes les 100 ms pendant le
+    chargement. Ce suivi ne conserve que les requêtes en cours.
+
+    Selenium Wire n'attribue request.id qu'à l'enregistrement de la requête,
+    après l'intercepteur de requêtes, et l'intercepteur de réponses reçoit un
+    nouvel objet Request : les requêtes en cours sont donc indexées par
+    (méthode, URL), chaque réponse retirant la plus ancienne requête identique.
+    """
+
+    def __init__(self):
+        self.request_count = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def request_interceptor(self, request):
+        key = (request.method.upper(), request.url)
+        with self._lock:
+            self._in_flight.setdefault(key, deque()).append(time.monotonic())
+            self.request_count += 1
+
+    def response_interceptor(self, request, response):
+        key = (request.method.upper(), request.url)
+        with self._lock:
+            started = self._in_flight.get(key)
+            if started:
+                started.popleft()
+                if not started:
+                    del self._in_flight[key]
+
+    def snapshot(self, long_request_ms):
+        """
+        Returns:
+            tuple: (nombre total de requêtes, nombre de requêtes en cours depuis
+            moins de 'long_request_ms' millisecondes).
+        """
+        limit = time.monotonic() - long_request_ms / 1000
+        pending = 0
+        with self._lock:
+            for key in list(self._in_flight):
+                started = self._in_flight[key]
+                # Requêtes restées sans réponse (long polling, connexion interrompue) : oubliées
+                while started and started[0] < limit:
+                    started.popleft()
+                if started:
+                    pending += len(started)
+                else:
+                    del self._in_flight[key]
+            return self.request_count, pending
+
+def count_pending_requests(driver, long_request_ms):
+    """
+    Compte les requêtes interceptées par Selenium Wire qui n'ont pas encore de réponse.
+
+    Utilise le suivi en mémoire du navigateur (driver.network_activity) s'il est
+    installé, sinon parcourt driver.requests.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+        long_request_ms (int): Âge au-delà duquel une requête en attente est ignorée.
+
+    Returns:
+        tuple: (nombre total de requêtes, nombre de requêtes en cours).
+    """
+    activity = getattr(driver, 'network_activity', None)
+    if activity is not None:
+        return activity.snapshot(long_request_ms)
+    requests_list = driver.requests
+    now = datetime.now()
+    pending = 0
+    for request in requests_list:
+        if request.response is None:
+            age_ms = (now - request.date).total_seconds() * 1000 if request.date else 0
+            if age_ms < long_request_ms:
+                pending += 1
+    return len(requests_list), pending
+
+def get_document_ready_state(driver):
+    """
+    Retourne la valeur de document.readyState, ou None si elle est inaccessible.
+    """
+    try:
+        return driver.execute_script('return document.readyState')
+    except Exception as e:
+        logging.debug(f"document.readyState inaccessible : {e}")
+        return None
+
+def get_dom_quiet_ms(driver):
+    """
+    Retourne le temps écoulé (ms) depuis la dernière mutation du DOM, ou None en cas d'échec.
+    """
+    try:
+        return driver.execute_script(_DOM_OBSERVER_SCRIPT)
+    except Exception as e:
+        logging.debug(f"Observation des mutations du DOM impossible : {e}")
+        return None
+
+def wait_for_page_settle(driver, settle_options=None, audit_deadline=None):
+    """
+    Attend que la page soit stable : document.readyState à 'complete' et aucune
+    requête réseau en cours pendant 'idle_ms' millisecondes (et, en option,
+    aucune mutation du DOM sur la même durée), dans la limite de 'timeout'
+    et du temps restant à l'audit.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+        settle_options (dict): Options de stabilisation (voir DEFAULT_SETTLE_OPTIONS).
+        audit_deadline (AuditDeadline): Budget de temps de l'audit (optionnel).
+
+    Returns:
+        bool: True si la page s'est stabilisée, False si le délai maximal a été atteint.
+
+    Raises:
+        AuditTimeout: Si le budget de l'audit est épuisé avant la stabilisation.
+    """
+    options = resolve_settle_options(settle_options)
+    idle_s = options['idle_ms'] / 1000
+    start = time.monotonic()
+    timeout = options['timeout']
+    if audit_deadline is not None:
+        timeout = min(timeout, audit_deadline.remaining())
+    deadline = start + timeout
+    last_request_count = None
+    idle_since = None
+
+    while True:
+        now = time.monotonic()
+        request_count, pending = count_pending_requests(driver, options['long_request_ms'])
+        ready = get_document_ready_state(driver) == 'complete'
+
+        # Toute nouvelle requête ou requête en cours réinitialise la fenêtre d'inactivité
+        if not ready or pending or request_count != last_request_count:
+            idle_since = None
+        elif idle_since is None:
+            idle_since = now
+        last_request_count = request_count
+
+        if idle_since is not None and now - idle_since >= idle_s:
+            if not options['wait_dom']:
+                break
+            quiet_ms = get_dom_quiet_ms(driver)
+            if quiet_ms is None or quiet_ms >= options['idle_ms']:
+                break
+
+        if now >= deadline:
+            if audit_deadline is not None:
+                audit_deadline.check()
+            logging.warning(
+                f"Page non stabilisée après {timeout:.1f}s "
+                f"({pending} requête(s) en cours, readyState complet : {ready})."
+            )
+            return False
+        time.sleep(options['poll_interval'])
+
+    logging.info(f"Page stabilisée en {time.monotonic() - start:.2f}s.")
+    return True
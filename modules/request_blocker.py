@@ -0,0 +1,216 @@
+# modules/request_blocker.py
+
+import json
+import os
+import re
+import threading
+import logging
+from modules.log_config import log_event
+from urllib.parse import urlsplit
+
+# En-tête ajouté aux réponses des requêtes bloquées (conservé dans la capture)
+BLOCKED_HEADER = 'X-Bone-Breaker-Blocked'
+
+# Politique par défaut du mode automatique : seuls le document, les scripts
+# et les feuilles de style sont utiles à la détection des technologies.
+# 'block_third_party' repose sur get_registered_domain (deux derniers labels) :
+# approximatif pour les suffixes à deux niveaux (*.co.uk) et les adresses IP.
+DEFAULT_BLOCKING_POLICY = {
+    'resource_types': ['image', 'media', 'font', 'beacon'],
+    'extensions': [
+        '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp',
+        '.mp4', '.webm', '.ogg', '.mp3', '.wav', '.m4a', '.m3u8', '.ts',
+        '.woff', '.woff2', '.ttf', '.otf', '.eot'
+    ],
+    'url_patterns': [
+        r'google-analytics\.com/(?:g/|j/)?collect',
+        r'analytics\.google\.com/g/collect',
+        r'stats\.g\.doubleclick\.net',
+        r'facebook\.com/tr[/?]',
+        r'bat\.bing\.com/action',
+        r'/pixel(?:\.gif)?(?:\?|$)'
+    ],
+    'block_third_party': False,
+    'allowed_domains': []
+}
+
+# Types de ressources jamais bloqués : nécessaires à la détection des technologies
+NEVER_BLOCKED_TYPES = {'document', 'script', 'stylesheet'}
+
+# Correspondance entre l'en-tête Sec-Fetch-Dest envoyé par Firefox et le type de ressource
+FETCH_DEST_TYPES = {
+    'document': 'document',
+    'iframe': 'document',
+    'frame': 'document',
+    'script': 'script',
+    'style': 'stylesheet',
+    'image': 'image',
+    'video': 'media',
+    'audio': 'media',
+    'track': 'media',
+    'font': 'font',
+    'empty': 'xhr'
+}
+
+def get_resource_type(request):
+    """
+    Détermine le type de ressource d'une requête à partir de ses en-têtes.
+
+    Args:
+        request (seleniumwire.request.Request): Requête interceptée.
+
+    Returns:
+        str: Type de ressource ('document', 'script', 'image', 'beacon'...) ou 'other'.
+    """
+    fetch_dest = (request.headers.get('Sec-Fetch-Dest') or '').lower()
+    resource_type = FETCH_DEST_TYPES.get(fetch_dest, 'other')
+    # navigator.sendBeacon : requête POST sans destination en mode no-cors. Un fetch()
+    # ordinaire (mode cors ou same-origin) reste un appel d'API, même en text/plain
+    if resource_type == 'xhr' and request.method.upper() == 'POST':
+        fetch_mode = (request.headers.get('Sec-Fetch-Mode') or '').lower()
+        content_type = (request.headers.get('Content-Type') or '').lower()
+        if fetch_mode == 'no-cors' and (content_type.startswith('text/plain') or content_type.startswith('text/ping')):
+            resource_type = 'beacon'
+    return resource_type
+
+def get_registered_domain(host):
+    """
+    Approximation du domaine enregistré d'un hôte (deux derniers labels).
+
+    Sans liste des suffixes publics, tous les hôtes d'un suffixe à deux niveaux
+    partagent le même domaine ('a.co.uk' et 'b.co.uk' donnent 'co.uk'), et une
+    adresse IP est réduite à ses deux derniers octets.
+    """
+    labels = (host or '').lower().split('.')
+    return '.'.join(labels[-2:])
+
+def get_blocked_reason(response):
+    """
+    Retourne la raison du blocage d'une réponse, ou None si la requête n'a pas été bloquée.
+
+    Args:
+        response (seleniumwire.request.Response): Réponse interceptée.
+
+    Returns:
+        str: Raison du blocage ou None.
+    """
+    return response.headers.get(BLOCKED_HEADER)
+
+class BlockingPolicy:
+    """
+    Politique de blocage de requêtes par type de ressource, extension, motif
+    d'URL ou domaine tiers, appliquée via l'intercepteur de requêtes de Selenium Wire.
+    """
+
+    def __init__(self, resource_types=None, extensions=None, url_patterns=None,
+                 block_third_party=False, allowed_domains=None):
+        """
+        Args:
+            resource_types (list): Types de ressources à bloquer (voir get_resource_type).
+            extensions (list): Extensions de fichiers à bloquer (ex: '.png').
+            url_patterns (list): Expressions régulières d'URL à bloquer.
+            block_third_party (bool): Bloquer les requêtes vers des domaines tiers (voir
+                les limites de get_registered_domain : suffixes à deux niveaux, adresses IP).
+            allowed_domains (list): Domaines tiers toujours autorisés (CDN...).
+        """
+        self.resource_types = set(resource_types or [])
+        self.extensions = tuple(extension.lower() for extension in extensions or [])
+        self.url_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in url_patterns or []]
+        self.block_third_party = block_third_party
+        self.allowed_domains = {domain.lower() for domain in allowed_domains or []}
+        self.blocked_count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crée une politique à partir d'un dictionnaire (même format que DEFAULT_BLOCKING_POLICY).
+        """
+        return cls(
+            resource_types=data.get('resource_types'),
+            extensions=data.get('extensions'),
+            url_patterns=data.get('url_patterns'),
+            block_third_party=data.get('block_third_party', False),
+            allowed_domains=data.get('allowed_domains')
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Charge une politique depuis un fichier JSON.
+
+        Raises:
+            FileNotFoundError: Si le fichier n'existe pas.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Politique de blocage introuvable : {path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        """
+        Retourne la politique sous forme de dictionnaire (pour state.json).
+        """
+        return {
+            'resource_types': sorted(self.resource_types),
+            'extensions': list(self.extensions),
+            'url_patterns': [pattern.pattern for pattern in self.url_patterns],
+            'block_third_party': self.block_third_party,
+            'allowed_domains': sorted(self.allowed_domains)
+        }
+
+    def get_block_reason(self, request, first_party_domain):
+        """
+        Indique pourquoi une requête doit être bloquée.
+
+        Args:
+            request (seleniumwire.request.Request): Requête interceptée.
+            first_party_domain (str): Domaine enregistré de la page auditée.
+
+        Returns:
+            str: Raison du blocage, ou None si la requête est autorisée.
+        """
+        resource_type = get_resource_type(request)
+        # Documents, cadres, scripts et feuilles de style ne sont jamais bloqués, quelle que
+        # soit leur extension (ex: module '/src/main.ts') ou leur URL
+        if resource_type in NEVER_BLOCKED_TYPES:
+            return None
+        if resource_type in self.resource_types:
+            return f'type:{resource_type}'
+        parts = urlsplit(request.url)
+        if self.extensions and parts.path.lower().endswith(self.extensions):
+            return f"extension:{os.path.splitext(parts.path)[1].lower()}"
+        for pattern in self.url_patterns:
+            if pattern.search(request.url):
+                return f'pattern:{pattern.pattern}'
+        if self.block_third_party:
+            domain = get_registered_domain(parts.hostname)
+            if domain != first_party_domain and domain not in self.allowed_domains:
+                return f'third-party:{domain}'
+        return None
+
+    def create_interceptor(self, page_url):
+        """
+        Crée l'intercepteur de requêtes Selenium Wire appliquant la politique.
+
+        Les requêtes bloquées reçoivent une réponse vide (204) marquée par
+        l'en-tête BLOCKED_HEADER, afin d'apparaître dans la capture.
+
+        Args:
+            page_url (str): URL de la page auditée (définit le domaine principal).
+
+        Returns:
+            callable: Intercepteur de la forme f(request).
+        """
+        first_party_domain = get_registered_domain(urlsplit(page_url).hostname)
+
+        def interceptor(request):
+            reason = self.get_block_reason(request, first_party_domain)
+            if reason:
+                request.create_response(status_code=204, headers={BLOCKED_HEADER: reason}, body=b'')
+                with self._lock:
+                    self.blocked_count += 1
+                log_event('blocked', "Requête bloquée (%s) : %s", reason, request.url,
+                          level=logging.DEBUG, url=request.url, reason=reason)
+
+        return interceptor
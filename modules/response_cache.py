@@ -0,0 +1,227 @@
+# modules/response_cache.py
+
+import threading
+import time
+import logging
+from modules.log_config import log_event
+
+# En-tête ajouté aux réponses servies depuis le cache (pour ne pas les y réenregistrer)
+CACHE_HEADER = 'X-Bone-Breaker-Cache'
+
+# Codes de statut dont la réponse peut être partagée entre navigateurs
+CACHEABLE_STATUS_CODES = {200, 203, 300, 301, 308, 404, 410}
+
+# Destinations (Sec-Fetch-Dest) jamais partagées : le document servi dépend du
+# profil (User-Agent) même sans en-tête Vary, et c'est lui que l'audit compare
+UNSHARED_FETCH_DESTS = {'document', 'iframe', 'frame'}
+
+def get_cache_key(request):
+    """
+    Construit la clé de cache d'une requête (méthode et URL).
+
+    Args:
+        request (seleniumwire.request.Request): Requête interceptée.
+
+    Returns:
+        tuple: Clé de cache.
+    """
+    return (request.method.upper(), request.url)
+
+def get_vary_headers(response):
+    """
+    Retourne la liste des en-têtes de requête listés dans l'en-tête Vary de la réponse.
+
+    Args:
+        response (seleniumwire.request.Response): Réponse interceptée.
+
+    Returns:
+        list: Noms des en-têtes (en minuscules), ou ['*'] si la réponse varie sur tout.
+    """
+    vary = response.headers.get('Vary', '') or ''
+    return [name.strip().lower() for name in vary.split(',') if name.strip()]
+
+def is_request_shareable(request):
+    """
+    Indique si la requête peut être servie depuis le cache (GET, hors documents et cadres).
+
+    Firefox n'envoie les en-têtes Fetch Metadata qu'aux origines sécurisées : sans
+    Sec-Fetch-Dest (sites http://), une requête acceptant du HTML est traitée
+    comme une navigation.
+
+    Args:
+        request (seleniumwire.request.Request): Requête interceptée.
+
+    Returns:
+        bool: True si la requête peut être partagée entre navigateurs.
+    """
+    if request.method.upper() != 'GET':
+        return False
+    fetch_dest = (request.headers.get('Sec-Fetch-Dest', '') or '').lower()
+    if not fetch_dest:
+        return 'text/html' not in (request.headers.get('Accept', '') or '').lower()
+    return fetch_dest not in UNSHARED_FETCH_DESTS
+
+def is_response_shareable(request, response):
+    """
+    Indique si une réponse peut être resservie à un autre navigateur.
+
+    Seules les ressources (hors documents et cadres) obtenues par GET, sans
+    cookie émis ni 'no-store', sont partagées, afin de ne pas mélanger des
+    contenus personnalisés ou propres à un profil.
+
+    Args:
+        request (seleniumwire.request.Request): Requête interceptée.
+        response (seleniumwire.request.Response): Réponse reçue.
+
+    Returns:
+        bool: True si la réponse est partageable.
+    """
+    if not is_request_shareable(request):
+        return False
+    if response.status_code not in CACHEABLE_STATUS_CODES:
+        return False
+    if response.headers.get('Set-Cookie'):
+        return False
+    if 'no-store' in (response.headers.get('Cache-Control', '') or '').lower():
+        return False
+    if '*' in get_vary_headers(response):
+        return False
+    return True
+
+class ResponseCache:
+    """
+    Cache local de réponses HTTP partagé entre plusieurs navigateurs Selenium Wire.
+
+    La première requête vers une URL part sur le réseau ; les requêtes identiques
+    émises par les autres navigateurs (même en parallèle) attendent brièvement sa
+    réponse et la reçoivent depuis le cache. L'en-tête Vary est respecté, et les
+    documents et cadres ne sont jamais partagés (voir UNSHARED_FETCH_DESTS).
+
+    L'attente bloque le proxy du navigateur qui attend : elle est courte, et un
+    navigateur n'attend jamais une requête qu'il a lui-même en cours.
+    """
+
+    def __init__(self, wait_timeout=2):
+        """
+        Args:
+            wait_timeout (float): Durée maximale (secondes) d'attente d'une requête
+                identique déjà en cours avant de partir sur le réseau.
+        """
+        self.wait_timeout = wait_timeout
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def _find_entry(self, request):
+        """
+        Recherche une entrée compatible avec la requête (en tenant compte de Vary).
+        """
+        for entry in self._entries.get(get_cache_key(request), []):
+            if all(request.headers.get(name) == value for name, value in entry['vary'].items()):
+                return entry
+        return None
+
+    def lookup(self, request, owner=None):
+        """
+        Retourne l'entrée en cache correspondant à la requête, en attendant au besoin
+        la fin d'une requête identique en cours dans un autre navigateur. Si aucune
+        requête identique n'est en cours, la requête courante est enregistrée comme
+        requête de référence.
+
+        Args:
+            request (seleniumwire.request.Request): Requête interceptée.
+            owner (str): Identifiant du navigateur émetteur (ex: profil d'affichage).
+
+        Returns:
+            dict: Entrée du cache ou None si la requête doit partir sur le réseau.
+        """
+        if not is_request_shareable(request):
+            return None
+        key = get_cache_key(request)
+        with self._lock:
+            entry = self._find_entry(request)
+            if entry:
+                return entry
+            pending = self._in_flight.get(key)
+            # Une requête de référence restée sans réponse est abandonnée
+            if pending is None or time.monotonic() - pending[1] > self.wait_timeout:
+                self._in_flight[key] = (threading.Event(), time.monotonic(), owner)
+                return None
+            if pending[2] == owner:
+                # Requête identique en cours dans ce même navigateur : l'attendre
+                # bloquerait son propre proxy
+                return None
+        # Une requête identique est en cours dans un autre navigateur
+        pending[0].wait(max(0, self.wait_timeout - (time.monotonic() - pending[1])))
+        with self._lock:
+            return self._find_entry(request)
+
+    def store(self, request, response):
+        """
+        Enregistre une réponse et libère les navigateurs qui l'attendent.
+
+        Args:
+            request (seleniumwire.request.Request): Requête interceptée.
+            response (seleniumwire.request.Response): Réponse reçue.
+        """
+        key = get_cache_key(request)
+        with self._lock:
+            if is_response_shareable(request, response):
+                entry = {
+                    'status_code': response.status_code,
+                    'reason': response.reason,
+                    'headers': list(response.headers.items()),
+                    'body': response.body,
+                    'vary': {name: request.headers.get(name) for name in get_vary_headers(response)},
+                    'stored_at': time.time()
+                }
+                self._entries.setdefault(key, []).append(entry)
+                self.stats['stored'] += 1
+            pending = self._in_flight.pop(key, None)
+        if pending:
+            pending[0].set()
+
+    def create_interceptors(self, owner):
+        """
+        Crée les intercepteurs d'un navigateur partageant ce cache.
+
+        Args:
+            owner (str): Identifiant du navigateur (ex: profil d'affichage).
+
+        Returns:
+            tuple: (intercepteur de requêtes, intercepteur de réponses).
+        """
+        return (
+            lambda request: self.request_interceptor(request, owner),
+            self.response_interceptor
+        )
+
+    def request_interceptor(self, request, owner=None):
+        """
+        Intercepteur de requêtes Selenium Wire : sert la réponse depuis le cache si possible.
+        """
+        entry = self.lookup(request, owner)
+        if entry:
+            # L'identifiant de la requête n'est pas encore attribué dans l'intercepteur :
+            # la réponse servie est marquée par un en-tête, comme les requêtes bloquées
+            request.create_response(
+                status_code=entry['status_code'],
+                headers=entry['headers'] + [(CACHE_HEADER, 'hit')],
+                body=entry['body']
+            )
+            with self._lock:
+                self.stats['hits'] += 1
+            log_event('cache_hit', "Réponse servie depuis le cache local : %s", request.url,
+                      level=logging.DEBUG, url=request.url)
+        else:
+            with self._lock:
+                self.stats['misses'] += 1
+
+    def response_interceptor(self, request, response):
+        """
+        Intercepteur de réponses Selenium Wire : alimente le cache avec les réponses réseau.
+        """
+        if response.headers.get(CACHE_HEADER):
+            return
+        self.store(request, response)
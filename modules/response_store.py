@@ -0,0 +1,240 @@
+# modules/response_store.py
+
+import hashlib
+import json
+import os
+import threading
+import logging
+from modules.log_config import log_event
+from urllib.parse import urlsplit, urlunsplit
+from modules.response_cache import get_vary_headers
+from modules.request_blocker import get_blocked_reason
+
+# En-tête ajouté aux réponses absentes de l'enregistrement lors du rejeu
+REPLAY_MISS_HEADER = 'X-Bone-Breaker-Replay'
+
+def strip_query(url):
+    """
+    Retourne l'URL sans sa chaîne de requête ni son fragment.
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+def get_request_key(method, url, body):
+    """
+    Construit la clé d'enregistrement d'une requête : méthode, URL et, pour les
+    requêtes avec corps (POST...), empreinte du corps envoyé.
+
+    Args:
+        method (str): Méthode HTTP.
+        url (str): URL de la requête.
+        body (bytes): Corps de la requête.
+
+    Returns:
+        str: Clé de la requête.
+    """
+    body_hash = hashlib.sha256(body).hexdigest() if body else ''
+    return f"{method.upper()} {url} {body_hash}"
+
+class ResponseStore:
+    """
+    Enregistrement local des réponses d'une session d'audit, rejouable sans réseau.
+
+    Le dossier contient un index 'index.jsonl' (une entrée par réponse, ajoutée au
+    fil de l'eau) et les corps des réponses dans 'bodies/', nommés par leur empreinte
+    SHA-256 afin qu'un même fichier ne soit stocké qu'une fois.
+
+    Chaque entrée porte le profil d'affichage du navigateur qui l'a reçue : lors
+    du rejeu d'un audit multi-profils, chaque profil retrouve ses propres réponses
+    (un document sans en-tête Vary diffère souvent entre mobile et desktop).
+    """
+
+    def __init__(self, store_dir):
+        """
+        Args:
+            store_dir (str): Dossier de l'enregistrement.
+        """
+        self.store_dir = store_dir
+        self.index_file = os.path.join(store_dir, 'index.jsonl')
+        self.bodies_dir = os.path.join(store_dir, 'bodies')
+        self._entries = {}
+        self._by_path = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self.stats = {'recorded': 0, 'replayed': 0, 'missing': 0}
+
+    def load(self):
+        """
+        Charge l'index d'un enregistrement existant.
+
+        Returns:
+            ResponseStore: L'enregistrement chargé.
+
+        Raises:
+            FileNotFoundError: Si l'index de l'enregistrement est introuvable.
+        """
+        if not os.path.exists(self.index_file):
+            raise FileNotFoundError(f"Aucun enregistrement trouvé dans {self.store_dir}.")
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self._add_entry(json.loads(line))
+        logging.info(f"{sum(len(entries) for entries in self._entries.values())} réponses chargées depuis {self.store_dir}.")
+        return self
+
+    def _add_entry(self, entry):
+        self._entries.setdefault(entry['key'], []).append(entry)
+        self._by_path.setdefault((entry['method'], strip_query(entry['url'])), []).append(entry)
+
+    def _is_recorded(self, entry):
+        return any(
+            existing['body_hash'] == entry['body_hash']
+            and existing['status_code'] == entry['status_code']
+            and existing['vary'] == entry['vary']
+            and existing.get('profile') == entry['profile']
+            for existing in self._entries.get(entry['key'], [])
+        )
+
+    def record(self, request, response, profile=None):
+        """
+        Enregistre une réponse complète (statut, en-têtes et corps).
+
+        Args:
+            request (seleniumwire.request.Request): Requête interceptée.
+            response (seleniumwire.request.Response): Réponse reçue.
+            profile (str): Profil d'affichage du navigateur (optionnel).
+        """
+        body = response.body or b''
+        body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            'key': get_request_key(request.method, request.url, request.body),
+            'method': request.method.upper(),
+            'url': request.url,
+            'vary': {name: request.headers.get(name) for name in get_vary_headers(response)},
+            'profile': profile,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': list(response.headers.items()),
+            'body_hash': body_hash
+        }
+        with self._lock:
+            if self._is_recorded(entry):
+                return
+            os.makedirs(self.bodies_dir, exist_ok=True)
+            body_file = os.path.join(self.bodies_dir, body_hash)
+            if not os.path.exists(body_file):
+                with open(body_file, 'wb') as f:
+                    f.write(body)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._add_entry(entry)
+            self.stats['recorded'] += 1
+
+    def find(self, request, profile=None):
+        """
+        Retrouve la réponse enregistrée pour une requête.
+
+        Les réponses successives à une même requête sont resservies, pour chaque
+        profil, dans l'ordre d'enregistrement (la dernière est répétée). Les
+        réponses reçues par le même profil sont préférées. À défaut de
+        correspondance exacte, une réponse de même URL sans chaîne de requête est
+        utilisée (paramètres anti-cache).
+
+        Args:
+            request (seleniumwire.request.Request): Requête interceptée.
+            profile (str): Profil d'affichage du navigateur (optionnel).
+
+        Returns:
+            dict: Entrée enregistrée ou None.
+        """
+        key = get_request_key(request.method, request.url, request.body)
+        with self._lock:
+            candidates = self._entries.get(key) or self._by_path.get((request.method.upper(), strip_query(request.url)), [])
+            matching = [
+                entry for entry in candidates
+                if all(request.headers.get(name) == value for name, value in entry['vary'].items())
+            ] or candidates
+            # Enregistrements antérieurs sans profil : partagés par tous les profils
+            matching = [entry for entry in matching if entry.get('profile') == profile] or matching
+            if not matching:
+                return None
+            cursor = self._cursors.get((profile, key), 0)
+            self._cursors[(profile, key)] = cursor + 1
+            return matching[min(cursor, len(matching) - 1)]
+
+    def read_body(self, entry):
+        """
+        Lit le corps enregistré d'une réponse.
+        """
+        with open(os.path.join(self.bodies_dir, entry['body_hash']), 'rb') as f:
+            return f.read()
+
+    def create_interceptors(self, profile=None):
+        """
+        Crée les intercepteurs d'un navigateur partageant cet enregistrement.
+
+        Args:
+            profile (str): Profil d'affichage du navigateur (optionnel).
+
+        Returns:
+            tuple: (intercepteur de requêtes pour le rejeu, intercepteur de réponses
+            pour l'enregistrement).
+        """
+        return (
+            lambda request: self.request_interceptor(request, profile),
+            lambda request, response: self.response_interceptor(request, response, profile)
+        )
+
+    def request_interceptor(self, request, profile=None):
+        """
+        Intercepteur de requêtes Selenium Wire pour le rejeu : sert la réponse
+        enregistrée, ou une erreur 504 si la requête n'a pas été enregistrée,
+        sans jamais accéder au réseau.
+        """
+        entry = self.find(request, profile)
+        if entry:
+            request.create_response(
+                status_code=entry['status_code'],
+                headers=entry['headers'],
+                body=self.read_body(entry)
+            )
+            with self._lock:
+                self.stats['replayed'] += 1
+        else:
+            request.create_response(
+                status_code=504,
+                headers={REPLAY_MISS_HEADER: 'miss', 'Content-Type': 'text/plain'},
+                body=b'Response not recorded'
+            )
+            with self._lock:
+                self.stats['missing'] += 1
+            log_event('replay_miss', "Réponse absente de l'enregistrement : %s", request.url,
+                      level=logging.DEBUG, url=request.url)
+
+    def response_interceptor(self, request, response, profile=None):
+        """
+        Intercepteur de réponses Selenium Wire pour l'enregistrement.
+
+        Les réponses vides créées pour les requêtes bloquées ne sont pas enregistrées :
+        un rejeu sans blocage doit servir la vraie ressource ou signaler son absence.
+        """
+        if get_blocked_reason(response):
+            return
+        try:
+            self.record(request, response, profile)
+        except OSError as e:
+            logging.error(f"Erreur lors de l'enregistrement de {request.url} : {e}")
+
+def get_store_dir(project_dir):
+    """
+    Retourne le dossier d'enregistrement d'un projet.
+
+    Args:
+        project_dir (str): Chemin du répertoire du projet (ou directement de l'enregistrement).
+
+    Returns:
+        str: Chemin du dossier d'enregistrement.
+    """
+    if os.path.exists(os.path.join(project_dir, 'index.jsonl')):
+        return project_dir
+    return os.path.join(project_dir, 'recording')
@@ -2,7 +2,8 @@
 
 from modules.browser_config import (
     launch_selenium_browser,
-    detect_mobile_version_selenium
+    capture_served_snapshot,
+    detect_mobile_version
 )
 from modules.http_monitor import (
     intercept_requests_selenium,
@@ -68,13 +69,19 @@ def test_selenium_firefox_automatic():
 
 def test_selenium_firefox_manual():
     try:
+        # Contenu de référence servi au profil desktop
+        desktop_driver = launch_selenium_browser(browser_name='firefox', mode='automatique', profile='desktop')
+        desktop_driver.get('https://www.google.com')
+        desktop_snapshot = capture_served_snapshot(desktop_driver)
+        desktop_driver.quit()
+
         print("Lancement de Selenium Firefox en mode manuel...")
         driver = launch_selenium_browser(browser_name='firefox', mode='manuel', mobile=True)
         print(f"Naviguer vers l'URL : https://www.google.com")
         driver.get('https://www.google.com')
-        is_mobile = detect_mobile_version_selenium(driver, 'https://www.google.com')
-        print(f"Mode mobile détecté : {is_mobile}")
-        assert is_mobile, "Selenium Mobile Firefox : Détection mobile échouée"
+        mobile_version = detect_mobile_version(capture_served_snapshot(driver), desktop_snapshot)
+        print(f"Version mobile détectée : {mobile_version}")
+        assert mobile_version['is_mobile_version'], "Selenium Mobile Firefox : Détection mobile échouée"
         
         # Analyse du DOM
         html_content = driver.page_source
@@ -3,48 +3,122 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from modules.page_settle import resolve_settle_options, wait_for_page_settle
+from modules.deadline import AuditTimeout
+import time
 import logging
 
-def simulate_user_interaction(driver):
+def wait_for_condition(driver, condition, settle_options=None, audit_deadline=None):
+    """
+    Attend la stabilisation de la page puis une condition Selenium.
+
+    Le réseau étant inactif, la condition est en général déjà remplie ; elle
+    reste toutefois interrogée (éléments affichés par un minuteur ou une
+    transition CSS) pendant le temps restant du délai de stabilisation, dans
+    la limite du budget de l'audit.
+
+    Args:
+        driver (webdriver.Firefox): Instance du navigateur Selenium.
+        condition (callable): Condition attendue (expected_conditions).
+        settle_options (dict): Options de stabilisation (optionnel).
+        audit_deadline (AuditDeadline): Budget de temps de l'audit (optionnel).
+
+    Returns:
+        Le résultat de la condition.
+
+    Raises:
+        TimeoutException: Si la condition n'est pas remplie dans le délai.
+        AuditTimeout: Si le budget de l'audit est épuisé.
+    """
+    options = resolve_settle_options(settle_options)
+    start = time.monotonic()
+    wait_for_page_settle(driver, options, audit_deadline)
+    timeout = max(0, options['timeout'] - (time.monotonic() - start))
+    if audit_deadline is not None:
+        timeout = min(timeout, audit_deadline.remaining())
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=options['poll_interval']).until(condition)
+    except TimeoutException:
+        # Délai écourté par le budget de l'audit : l'expiration prime sur l'échec de la condition
+        if audit_deadline is not None:
+            audit_deadline.check()
+        raise
+
+def record_dom_step(tracker, step):
+    """
+    Relève les modifications du DOM provoquées par une étape (si le suivi est actif).
+    
+    Args:
+        tracker (DomTracker): Suivi incrémental du DOM (optionnel).
+        step (str): Nom de l'étape.
+    """
+    if tracker is not None:
+        tracker.record_step(step)
+
+def simulate_user_interaction(driver, settle_options=None, tracker=None, audit_deadline=None):
     """
     Simule des interactions utilisateur sur la page web.
     
     Args:
         driver (webdriver.Firefox): Instance du navigateur Selenium.
+        settle_options (dict): Options de stabilisation de la page (optionnel).
+        tracker (DomTracker): Suivi incrémental du DOM, relevé après chaque étape (optionnel).
+        audit_deadline (AuditDeadline): Budget de temps de l'audit (optionnel).
+
+    Raises:
+        AuditTimeout: Si le budget de l'audit est épuisé (les autres erreurs sont journalisées).
     """
     try:
         # Exemple 1 : Remplir un champ de recherche et soumettre
-        search_box = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.NAME, 'q'))  # Modifier le sélecteur selon la page
+        search_box = wait_for_condition(
+            driver,
+            EC.presence_of_element_located((By.NAME, 'q')),  # Modifier le sélecteur selon la page
+            settle_options,
+            audit_deadline
         )
         search_box.send_keys('Selenium WebDriver')
         search_box.submit()
         logging.info("Recherche effectuée avec succès.")
         
         # Attendre que les résultats de la recherche soient chargés
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'result-stats'))  # Modifier le sélecteur selon la page
+        wait_for_condition(
+            driver,
+            EC.presence_of_element_located((By.ID, 'result-stats')),  # Modifier le sélecteur selon la page
+            settle_options,
+            audit_deadline
         )
         logging.info("Résultats de la recherche chargés.")
+        record_dom_step(tracker, 'search_submit')
         
         # Exemple 2 : Cliquer sur le premier résultat de recherche
-        first_result = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'h3'))
+        first_result = wait_for_condition(
+            driver,
+            EC.element_to_be_clickable((By.CSS_SELECTOR, 'h3')),
+            settle_options,
+            audit_deadline
         )
         first_result.click()
         logging.info("Navigation vers le premier résultat réussie.")
         
         # Attendre que la nouvelle page soit chargée
-        WebDriverWait(driver, 10).until(
-            EC.title_contains('Selenium')
+        wait_for_condition(
+            driver,
+            EC.title_contains('Selenium'),
+            settle_options,
+            audit_deadline
         )
         logging.info("Nouvelle page chargée avec succès.")
+        record_dom_step(tracker, 'first_result_click')
         
         # Exemple 3 : Remplir un formulaire de contact (si disponible)
         # Ceci est un exemple générique. Adaptez-le selon la structure de la page.
         try:
-            contact_form = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, 'contact-form'))  # Modifier le sélecteur selon la page
+            contact_form = wait_for_condition(
+                driver,
+                EC.presence_of_element_located((By.ID, 'contact-form')),  # Modifier le sélecteur selon la page
+                settle_options,
+                audit_deadline
             )
             name_field = contact_form.find_element(By.NAME, 'name')
             email_field = contact_form.find_element(By.NAME, 'email')
@@ -59,36 +133,59 @@ def simulate_user_interaction(driver):
             logging.info("Formulaire de contact soumis avec succès.")
             
             # Attendre une confirmation
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.thank-you-message'))  # Modifier le sélecteur selon la page
+            wait_for_condition(
+                driver,
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.thank-you-message')),  # Modifier le sélecteur selon la page
+                settle_options,
+                audit_deadline
             )
             logging.info("Confirmation de soumission du formulaire reçue.")
+            record_dom_step(tracker, 'contact_form_submit')
+        except AuditTimeout:
+            raise
         except Exception as e:
             logging.warning(f"Aucun formulaire de contact trouvé ou erreur lors de la soumission : {e}")
         
+    except AuditTimeout:
+        raise
     except Exception as e:
         logging.error(f"Erreur lors de la simulation des interactions utilisateur : {e}")
 
-def simulate_navigation(driver):
+def simulate_navigation(driver, settle_options=None, tracker=None, audit_deadline=None):
     """
     Simule une navigation conditionnelle entre les pages.
     
     Args:
         driver (webdriver.Firefox): Instance du navigateur Selenium.
+        settle_options (dict): Options de stabilisation de la page (optionnel).
+        tracker (DomTracker): Suivi incrémental du DOM, relevé après chaque étape (optionnel).
+        audit_deadline (AuditDeadline): Budget de temps de l'audit (optionnel).
+
+    Raises:
+        AuditTimeout: Si le budget de l'audit est épuisé (les autres erreurs sont journalisées).
     """
     try:
         # Exemple : Naviguer vers une page spécifique via le menu
-        menu_link = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.LINK_TEXT, 'About'))  # Modifier le texte du lien selon la page
+        menu_link = wait_for_condition(
+            driver,
+            EC.element_to_be_clickable((By.LINK_TEXT, 'About')),  # Modifier le texte du lien selon la page
+            settle_options,
+            audit_deadline
         )
         menu_link.click()
         logging.info("Navigation vers la page 'About' réussie.")
         
         # Attendre que la nouvelle page soit chargée
-        WebDriverWait(driver, 10).until(
-            EC.title_contains('About')
+        wait_for_condition(
+            driver,
+            EC.title_contains('About'),
+            settle_options,
+            audit_deadline
         )
         logging.info("Page 'About' chargée avec succès.")
+        record_dom_step(tracker, 'navigation_about')
         
+    except AuditTimeout:
+        raise
     except Exception as e:
         logging.error(f"Erreur lors de la simulation de navigation : {e}")
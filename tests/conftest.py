@@ -0,0 +1,52 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# Les modules sont importés comme dans bone_breaker.py ('modules.xxx')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeHeaders(dict):
+    """
+    En-têtes insensibles à la casse, à la manière de seleniumwire.
+    """
+
+    def __init__(self, headers=None):
+        super().__init__((name.lower(), value) for name, value in (headers or {}).items())
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, body=b'', reason='OK'):
+        self.status_code = status_code
+        self.headers = FakeHeaders(dict(headers or {}))
+        self.body = body
+        self.reason = reason
+
+class FakeRequest:
+    """
+    Requête minimale imitant seleniumwire.request.Request dans un intercepteur :
+    l'identifiant n'est attribué qu'à l'enregistrement de la requête (None ici).
+    """
+
+    def __init__(self, url, method='GET', headers=None, body=b''):
+        self.id = None
+        self.url = url
+        self.method = method
+        self.body = body
+        self.headers = FakeHeaders(headers)
+        self.response = None
+
+    def create_response(self, status_code, headers=None, body=b''):
+        self.response = FakeResponse(status_code, headers, body)
+
+@pytest.fixture
+def make_request():
+    return FakeRequest
+
+@pytest.fixture
+def make_response():
+    return FakeResponse
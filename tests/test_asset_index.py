@@ -0,0 +1,94 @@
+# tests/test_asset_index.py
+
+import gzip
+import json
+
+import pytest
+
+# Le décodage des corps de réponse repose sur Selenium Wire
+pytest.importorskip('seleniumwire')
+
+from modules.asset_index import (  # noqa: E402
+    AssetHashCache, AssetIndex, hash_content, identify_assets, merge_identified_versions
+)
+
+JQUERY = b'/*! jQuery v3.7.1 */\r\n(function(){})();  \r\n'
+
+@pytest.fixture
+def asset_index(tmp_path):
+    release_dir = tmp_path / 'releases' / 'jquery' / '3.7.1'
+    release_dir.mkdir(parents=True)
+    (release_dir / 'jquery.min.js').write_bytes(JQUERY)
+    index_file = str(tmp_path / 'index.json')
+    AssetIndex.build_from_directory(str(tmp_path / 'releases')).save(index_file)
+    return AssetIndex.load(index_file)
+
+def make_asset_request(make_request, make_response, url, body, **headers):
+    request = make_request(url)
+    request.response = make_response(body=body, headers={'Content-Type': 'application/javascript', **headers})
+    return request
+
+def test_normalized_hash_ignores_line_endings():
+    assert hash_content(JQUERY)[1] == hash_content(JQUERY.replace(b'\r\n', b'\n'))[1]
+
+def test_identify_assets(asset_index, make_request, make_response):
+    requests_list = [
+        make_asset_request(make_request, make_response, 'https://cdn.example.com/jquery.js', JQUERY),
+        # Fins de ligne réécrites par le CDN : empreinte normalisée
+        make_asset_request(make_request, make_response, 'https://cdn.other.com/jq.js', JQUERY.replace(b'\r\n', b'\n')),
+        make_asset_request(make_request, make_response, 'https://example.com/app.js', b'app()'),
+        make_asset_request(make_request, make_response, 'https://example.com/jquery.gz.js', gzip.compress(JQUERY),
+                           **{'Content-Encoding': 'gzip'})
+    ]
+    identified = identify_assets(requests_list, asset_index)
+    assert [(asset['url'], asset['version']) for asset in identified] == [
+        ('https://cdn.example.com/jquery.js', '3.7.1'),
+        ('https://cdn.other.com/jq.js', '3.7.1'),
+        ('https://example.com/jquery.gz.js', '3.7.1')
+    ]
+    assert merge_identified_versions({'jQuery': 'Unknown'}, identified) == {'jQuery': '3.7.1'}
+
+def test_undecodable_body_is_skipped(asset_index, make_request, make_response):
+    requests_list = [
+        make_asset_request(make_request, make_response, 'https://example.com/broken.js', b'not gzip',
+                           **{'Content-Encoding': 'gzip'}),
+        make_asset_request(make_request, make_response, 'https://cdn.example.com/jquery.js', JQUERY)
+    ]
+    identified = identify_assets(requests_list, asset_index)
+    assert [asset['url'] for asset in identified] == ['https://cdn.example.com/jquery.js']
+
+def test_identifications_cached_by_validator(asset_index, tmp_path, make_request, make_response):
+    cache_file = str(tmp_path / 'users' / 'asset_cache.json')
+    cache = AssetHashCache(cache_file)
+    url = 'https://cdn.example.com/jquery.js'
+    identify_assets([make_asset_request(make_request, make_response, url, JQUERY, ETag='"v1"')], asset_index, cache)
+    cache.save()
+
+    # Même URL et même ETag : le résultat en cache est utilisé sans hacher le corps
+    reloaded = AssetHashCache(cache_file)
+    assert reloaded.get(url, '"v1"')['match']['version'] == '3.7.1'
+    identified = identify_assets(
+        [make_asset_request(make_request, make_response, url, b'changed', ETag='"v1"')], asset_index, reloaded
+    )
+    assert identified[0]['version'] == '3.7.1'
+
+def test_cache_save_merges_other_processes(tmp_path):
+    cache_file = str(tmp_path / 'asset_cache.json')
+    first = AssetHashCache(cache_file)
+    second = AssetHashCache(cache_file)
+    first.set('https://a.example/a.js', 'etag-a', {'match': None})
+    second.set('https://b.example/b.js', 'etag-b', {'match': None})
+    first.save()
+    second.save()
+    with open(cache_file, encoding='utf-8') as f:
+        assert len(json.load(f)) == 2
+    assert list(tmp_path.iterdir()) == [tmp_path / 'asset_cache.json']
+
+def test_unreadable_cache_is_recreated(tmp_path):
+    cache_file = tmp_path / 'asset_cache.json'
+    cache_file.write_text('{truncated', encoding='utf-8')
+    cache = AssetHashCache(str(cache_file))
+    assert cache.get('https://a.example/a.js', 'etag') is None
+    cache.set('https://a.example/a.js', 'etag', {'match': None})
+    cache.save()
+    assert json.loads(cache_file.read_text(encoding='utf-8'))
@@ -0,0 +1,103 @@
+# tests/test_audit_diff.py
+
+import io
+import json
+import os
+
+import pytest
+
+from modules.audit_diff import diff_audits, normalize_url, write_diff
+
+def write_audit(audit_dir, technologies=None, exchanges=None, state=None):
+    os.makedirs(audit_dir, exist_ok=True)
+    state = dict(state or {})
+    if technologies is not None:
+        state['technologies_detected'] = technologies
+    if state:
+        with open(os.path.join(audit_dir, 'state.json'), 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+    if exchanges is not None:
+        with open(os.path.join(audit_dir, 'requests.log'), 'w', encoding='utf-8') as f:
+            json.dump(exchanges, f)
+    return str(audit_dir)
+
+def exchange(url, status_code=200, method='GET', **headers):
+    return {'method': method, 'url': url, 'status_code': status_code, 'response_headers': headers}
+
+def get_changes(differences, kind):
+    return sorted((d['change'], d.get('url') or d.get('name')) for d in differences if d['kind'] == kind)
+
+def test_normalize_url():
+    assert normalize_url('HTTPS://Example.COM:443/a?b=2&_=123&a=1#top') == 'https://example.com/a?a=1&b=2'
+    assert normalize_url('http://example.com:8080/') == 'http://example.com:8080/'
+    assert normalize_url('data:image/png;base64,xyz') == 'data:image/png;base64,xyz'
+
+def test_diff_simple_audits(tmp_path):
+    old_dir = write_audit(tmp_path / 'old', {'nginx': '1.24', 'jQuery': '3.6'}, [
+        exchange('https://example.com/', server='nginx/1.24'),
+        exchange('https://example.com/old.js'),
+        exchange('https://example.com/app.js?cb=1')
+    ])
+    new_dir = write_audit(tmp_path / 'new', {'nginx': '1.25', 'React': '18'}, [
+        exchange('https://example.com/', server='nginx/1.25'),
+        exchange('https://example.com/new.js'),
+        exchange('https://example.com/app.js?cb=2')
+    ])
+    *differences, summary = diff_audits(old_dir, new_dir)
+    assert get_changes(differences, 'technology') == [('added', 'React'), ('changed', 'nginx'), ('removed', 'jQuery')]
+    assert get_changes(differences, 'request') == [
+        ('added', 'https://example.com/new.js'),
+        ('changed', 'https://example.com/'),
+        ('removed', 'https://example.com/old.js')
+    ]
+    assert summary['counts'] == {
+        'technology': {'added': 1, 'removed': 1, 'changed': 1},
+        'request': {'added': 1, 'removed': 1, 'changed': 1}
+    }
+    assert 'profiles' not in summary
+
+def test_identical_audits(tmp_path):
+    exchanges = [exchange('https://example.com/'), exchange('https://example.com/')]
+    old_dir = write_audit(tmp_path / 'old', {'nginx': '1.25'}, exchanges)
+    new_dir = write_audit(tmp_path / 'new', {'nginx': '1.25'}, list(reversed(exchanges)))
+    output = io.StringIO()
+    summary = write_diff(old_dir, new_dir, output)
+    assert summary['counts'] == {}
+    assert output.getvalue().count('\n') == 1
+
+def test_occurrence_count_change(tmp_path):
+    old_dir = write_audit(tmp_path / 'old', exchanges=[exchange('https://example.com/api')])
+    new_dir = write_audit(tmp_path / 'new', exchanges=[exchange('https://example.com/api')] * 2)
+    *differences, _ = diff_audits(old_dir, new_dir)
+    assert [(d['change'], d['old'][0]['count'], d['new'][0]['count']) for d in differences] == [('changed', 1, 2)]
+
+def write_viewports_audit(audit_dir, profiles):
+    write_audit(audit_dir, state={'profiles': {profile: {'directory': profile} for profile in profiles}})
+    for profile, technologies in profiles.items():
+        write_audit(audit_dir / profile, technologies, [])
+    return str(audit_dir)
+
+def test_diff_viewports_audits_per_profile(tmp_path):
+    old_dir = write_viewports_audit(tmp_path / 'old', {'desktop': {'nginx': '1.25'}, 'mobile': {'nginx': '1.25'}})
+    new_dir = write_viewports_audit(tmp_path / 'new', {'desktop': {'nginx': '1.25'}, 'mobile': {'nginx': '1.25', 'AMP': None}})
+    *differences, summary = diff_audits(old_dir, new_dir)
+    assert differences == [{'kind': 'technology', 'change': 'added', 'name': 'AMP', 'version': None, 'profile': 'mobile'}]
+    assert summary['profiles'] == ['desktop', 'mobile']
+
+def test_profile_audited_on_one_side_only(tmp_path):
+    old_dir = write_viewports_audit(tmp_path / 'old', {'desktop': {'nginx': '1.25'}})
+    new_dir = write_viewports_audit(tmp_path / 'new', {'desktop': {'nginx': '1.25'}, 'tablet': {'nginx': '1.25'}})
+    *differences, _ = diff_audits(old_dir, new_dir)
+    assert [(d['profile'], d['change'], d['name']) for d in differences] == [('tablet', 'added', 'nginx')]
+
+def test_viewports_audit_compared_to_simple_audit(tmp_path):
+    old_dir = write_viewports_audit(tmp_path / 'old', {'desktop': {}})
+    new_dir = write_audit(tmp_path / 'new', {}, [])
+    with pytest.raises(ValueError):
+        list(diff_audits(old_dir, new_dir))
+
+def test_empty_audit_directory(tmp_path):
+    old_dir = write_audit(tmp_path / 'old', {}, [])
+    os.makedirs(tmp_path / 'empty')
+    with pytest.raises(ValueError):
+        list(diff_audits(old_dir, str(tmp_path / 'empty')))
@@ -0,0 +1,68 @@
+# tests/test_audit_pipeline.py
+
+import json
+import os
+import threading
+
+import pytest
+
+from modules.audit_pipeline import AuditPipeline, PipelineStage
+
+def test_stage_runs_tasks_in_order():
+    stage = PipelineStage('test')
+    results = []
+    futures = [stage.submit(results.append, index) for index in range(20)]
+    stage.close()
+    assert all(future.done() for future in futures)
+    assert results == list(range(20))
+    # Fermetures répétées sans effet
+    stage.close()
+
+def test_stage_applies_back_pressure():
+    stage = PipelineStage('test', workers=1, queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(5)
+
+    stage.submit(blocking_task)
+    assert started.wait(5)
+    stage.submit(lambda: None)
+    # File pleine : l'appelant est bloqué jusqu'à ce qu'une place se libère
+    submitter = threading.Thread(target=stage.submit, args=(lambda: None,))
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive()
+    release.set()
+    submitter.join(5)
+    assert not submitter.is_alive()
+    stage.close()
+
+def test_stage_propagates_errors():
+    stage = PipelineStage('test')
+    future = stage.submit(lambda: 1 / 0)
+    after = stage.submit(lambda: 'ok')
+    stage.close()
+    with pytest.raises(ZeroDivisionError):
+        future.result()
+    # Une tâche en échec n'arrête pas l'étage
+    assert after.result() == 'ok'
+
+def test_results_saved_when_analysis_completes(tmp_path):
+    path = str(tmp_path / 'dom_analysis.json')
+    failed_path = str(tmp_path / 'failed.json')
+    with AuditPipeline() as pipeline:
+        analysis = pipeline.analysis.submit(pipeline.run_cpu_bound, sorted, [3, 1, 2])
+        pipeline.save_json_when_done(analysis, path)
+        failed = pipeline.analysis.submit(lambda: 1 / 0)
+        pipeline.save_json_when_done(failed, failed_path)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == [1, 2, 3]
+    assert not os.path.exists(failed_path)
+
+def test_cpu_bound_work_in_separate_process():
+    with AuditPipeline(use_processes=True) as pipeline:
+        future = pipeline.analysis.submit(pipeline.run_cpu_bound, os.getpid)
+        assert future.result(30) != os.getpid()
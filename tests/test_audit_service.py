@@ -0,0 +1,182 @@
+# tests/test_audit_service.py
+
+import threading
+import time
+
+import pytest
+
+from modules.audit_service import (
+    MAX_REQUEST_EVENTS, AuditRecord, AuditScheduler, create_app, evict_finished_audits
+)
+
+class FakeBrowser:
+    def __init__(self, key):
+        self.key = key
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+class FakeAudits:
+    """
+    Fonction d'audit et fabrique de navigateurs factices, qui consignent leurs appels.
+    """
+
+    def __init__(self, status='completed', reset_result=True):
+        self.status = status
+        self.reset_result = reset_result
+        self.calls = []
+        self.browsers = []
+        self.resets = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def audit(self, payload, project_dir, driver, progress_callback, cancel_event):
+        self.gate.wait(5)
+        self.calls.append((payload['url'], driver))
+        progress_callback('request', {'request': {'url': payload['url'], 'response_body': 'x' * 100}})
+        if isinstance(self.status, Exception):
+            raise self.status
+        return {'status': self.status}
+
+    def launch(self, payload):
+        browser = FakeBrowser(AuditScheduler.get_browser_key(payload))
+        self.browsers.append(browser)
+        return browser
+
+    def reset(self, driver):
+        self.resets.append(driver)
+        return self.reset_result
+
+def make_record(url, priority=0, mobile=False, tmp_path=None):
+    return AuditRecord(url, {'url': url, 'mobile': mobile}, priority, str(tmp_path or '.'))
+
+def wait_finished(record, timeout=5):
+    index = 0
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        events = record.wait_events(index, timeout=0.1)
+        index += len(events)
+        if events and events[-1]['phase'] == 'finished':
+            return record.status
+    raise AssertionError(f"Audit {record.audit_id} non terminé")
+
+def test_audits_run_by_priority():
+    fake = FakeAudits()
+    fake.gate.clear()
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1, browser_reset=fake.reset)
+    records = [make_record('first')]
+    scheduler.submit(records[0])
+    time.sleep(0.1)
+    # Soumis pendant que l'unique emplacement est occupé
+    for url, priority in (('low', 0), ('high', 10), ('middle', 5), ('low-2', 0)):
+        records.append(make_record(url, priority))
+        scheduler.submit(records[-1])
+    fake.gate.set()
+    for record in records:
+        assert wait_finished(record) == 'completed'
+    assert [url for url, _ in fake.calls] == ['first', 'high', 'middle', 'low', 'low-2']
+
+def test_browser_reused_and_reset_between_audits():
+    fake = FakeAudits()
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1, browser_reset=fake.reset)
+    records = [make_record('a'), make_record('b'), make_record('c', mobile=True)]
+    for record in records:
+        scheduler.submit(record)
+        wait_finished(record)
+    # Un navigateur par profil, effacé après chaque audit
+    assert [browser.key for browser in fake.browsers] == ['desktop', 'mobile']
+    assert fake.calls[0][1] is fake.calls[1][1]
+    assert fake.resets == [driver for _, driver in fake.calls]
+    assert not any(browser.closed for browser in fake.browsers)
+
+def test_browser_relaunched_when_reset_fails():
+    fake = FakeAudits(reset_result=False)
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1, browser_reset=fake.reset)
+    for url in ('a', 'b'):
+        record = make_record(url)
+        scheduler.submit(record)
+        wait_finished(record)
+    assert len(fake.browsers) == 2
+    assert fake.browsers[0].closed
+
+def test_browser_relaunched_without_reset_function():
+    fake = FakeAudits()
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1)
+    for url in ('a', 'b'):
+        record = make_record(url)
+        scheduler.submit(record)
+        wait_finished(record)
+    assert len(fake.browsers) == 2
+
+@pytest.mark.parametrize('status, expected', [
+    ('timed_out', 'timed_out'),
+    ('unexpected', 'error'),
+    (RuntimeError('navigateur planté'), 'error')
+])
+def test_browser_discarded_after_failed_audit(status, expected):
+    fake = FakeAudits(status=status)
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1, browser_reset=fake.reset)
+    record = make_record('a')
+    scheduler.submit(record)
+    assert wait_finished(record) == expected
+    assert fake.browsers[0].closed
+    assert fake.resets == []
+
+def test_cancel_before_start():
+    fake = FakeAudits()
+    fake.gate.clear()
+    scheduler = AuditScheduler(fake.audit, fake.launch, max_concurrency=1, browser_reset=fake.reset)
+    running, queued = make_record('running'), make_record('queued')
+    scheduler.submit(running)
+    scheduler.submit(queued)
+    queued.cancel_event.set()
+    fake.gate.set()
+    assert wait_finished(queued) == 'cancelled'
+    wait_finished(running)
+    assert [url for url, _ in fake.calls] == ['running']
+
+def test_request_events_capped_and_compacted():
+    record = make_record('a')
+    for index in range(MAX_REQUEST_EVENTS + 5):
+        record.add_event('request', {'request': {'url': f'https://example.com/{index}', 'response_body': 'x'}})
+    record.add_event('finished', {'status': 'completed'})
+    record.compact()
+    assert record.request_events == MAX_REQUEST_EVENTS
+    assert record.events[-1]['data']['dropped_request_events'] == 5
+    assert record.events[0]['data']['request'] == {
+        'method': None, 'url': 'https://example.com/0', 'status_code': None, 'blocked': None
+    }
+
+def test_finished_audits_evicted():
+    audits = {}
+    for index in range(3):
+        record = make_record(f'audit-{index}')
+        record.status = 'completed'
+        record.finished_at = time.time() - 10 + index
+        audits[record.audit_id] = record
+    running = make_record('running')
+    audits[running.audit_id] = running
+    evict_finished_audits(audits, retention=3600, max_finished=2)
+    assert sorted(audits) == ['audit-1', 'audit-2', 'running']
+    evict_finished_audits(audits, retention=5)
+    assert sorted(audits) == ['running']
+
+def test_service_routes(tmp_path):
+    fake = FakeAudits()
+    app = create_app(fake.audit, fake.launch, str(tmp_path), max_concurrency=1, browser_reset=fake.reset)
+    client = app.test_client()
+    assert client.post('/audits', json={}).status_code == 400
+    assert client.post('/audits', json={'url': 'https://example.com', 'priority': 'x'}).status_code == 400
+
+    response = client.post('/audits', json={'url': 'https://example.com', 'priority': 3})
+    assert response.status_code == 202
+    audit_id = response.get_json()['id']
+    # Le flux SSE se termine avec l'événement 'finished'
+    stream = client.get(f'/audits/{audit_id}/events').get_data(as_text=True)
+    assert 'event: request' in stream
+    assert stream.rstrip().split('\n')[-2] == 'event: finished'
+    assert client.get(f'/audits/{audit_id}').get_json()['status'] == 'completed'
+    assert client.delete(f'/audits/{audit_id}').status_code == 409
+    assert [audit['id'] for audit in client.get('/audits').get_json()] == [audit_id]
+    assert client.get('/audits/unknown').status_code == 404
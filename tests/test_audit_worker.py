@@ -0,0 +1,72 @@
+# tests/test_audit_worker.py
+
+import os
+import sqlite3
+
+import pytest
+
+from modules.audit_worker import AuditWorker
+from modules.job_queue import SQLiteJobQueue
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+@pytest.fixture
+def job_queue(db_path):
+    return SQLiteJobQueue(db_path, backoff_base=0, backoff_max=0)
+
+def write_result(project_dir, content):
+    with open(os.path.join(project_dir, 'state.json'), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def test_worker_publishes_completed_audit(job_queue, tmp_path):
+    results_dir = str(tmp_path / 'results')
+
+    def audit(payload, project_dir, cancel_event=None):
+        write_result(project_dir, payload['url'])
+        return {'status': 'completed', 'technologies_detected': {'nginx': '1.25'}}
+
+    job_id = job_queue.enqueue({'url': 'https://example.com'})
+    AuditWorker(job_queue, audit, results_dir, worker_id='w1', poll_interval=0).run(exit_when_empty=True)
+
+    project_dir = os.path.join(results_dir, f'job_{job_id}')
+    with open(os.path.join(project_dir, 'state.json'), encoding='utf-8') as f:
+        assert f.read() == 'https://example.com'
+    # Aucun dossier de préparation ne subsiste
+    assert os.listdir(results_dir) == [f'job_{job_id}']
+    assert job_queue.stats() == {'done': 1}
+
+def test_worker_replaces_previous_attempt(job_queue, tmp_path):
+    results_dir = str(tmp_path / 'results')
+    attempts = []
+
+    def audit(payload, project_dir, cancel_event=None):
+        attempts.append(project_dir)
+        write_result(project_dir, f'tentative {len(attempts)}')
+        return {'status': 'timed_out' if len(attempts) == 1 else 'completed'}
+
+    job_id = job_queue.enqueue({'url': 'https://example.com'})
+    AuditWorker(job_queue, audit, results_dir, worker_id='w1', poll_interval=0).run(exit_when_empty=True)
+
+    assert len(attempts) == 2
+    with open(os.path.join(results_dir, f'job_{job_id}', 'state.json'), encoding='utf-8') as f:
+        assert f.read() == 'tentative 2'
+    assert os.listdir(results_dir) == [f'job_{job_id}']
+
+def test_worker_does_not_publish_after_losing_lease(job_queue, db_path, tmp_path):
+    results_dir = str(tmp_path / 'results')
+
+    def audit(payload, project_dir, cancel_event=None):
+        write_result(project_dir, 'résultat périmé')
+        # Bail repris par un autre travailleur sans que le heartbeat l'ait remarqué
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("UPDATE jobs SET lease_owner = 'w2'")
+        return {'status': 'completed'}
+
+    job_id = job_queue.enqueue({'url': 'https://example.com'})
+    worker = AuditWorker(job_queue, audit, results_dir, worker_id='w1')
+    worker.process(job_queue.claim('w1', worker.lease_seconds))
+
+    assert not os.path.exists(os.path.join(results_dir, f'job_{job_id}'))
+    assert job_queue.stats() == {'running': 1}
@@ -0,0 +1,81 @@
+# tests/test_deadline.py
+
+import threading
+import time
+
+import pytest
+
+from modules.deadline import AuditDeadline, AuditTimeout
+
+def test_unlimited_deadline_never_expires():
+    deadline = AuditDeadline()
+    deadline.start_phase('load')
+    deadline.check()
+    assert deadline.remaining() == float('inf')
+
+def test_phase_budget_is_share_of_remaining_time():
+    deadline = AuditDeadline(10, {'load': 0.4, 'analysis': 0.1, 'interactions': 0.5})
+    deadline.start_phase('load')
+    assert deadline.remaining() == pytest.approx(4, abs=0.05)
+    # Phase précédente terminée immédiatement : son temps profite aux suivantes
+    deadline.start_phase('analysis')
+    assert deadline.remaining() == pytest.approx(10 * 0.1 / 0.6, abs=0.05)
+    # Dernière phase : tout le temps restant
+    deadline.start_phase('interactions')
+    assert deadline.remaining() == pytest.approx(10, abs=0.05)
+
+def test_unknown_phase_gets_remaining_time():
+    deadline = AuditDeadline(10, {'load': 0.5, 'capture': 0.5})
+    deadline.start_phase('custom')
+    assert deadline.remaining() == pytest.approx(10, abs=0.05)
+
+def test_check_raises_after_phase_deadline():
+    deadline = AuditDeadline(1, {'load': 0.1, 'capture': 0.9})
+    deadline.start_phase('load')
+    assert deadline.wait(5)
+    with pytest.raises(AuditTimeout) as error:
+        deadline.check()
+    assert error.value.phase == 'load'
+    assert not error.value.cancelled
+    assert deadline.timed_out
+    with pytest.raises(AuditTimeout):
+        deadline.start_phase('capture')
+
+def test_cancel_interrupts_wait():
+    cancel_event = threading.Event()
+    deadline = AuditDeadline(60, cancel_event=cancel_event)
+    deadline.start_phase('load')
+    threading.Timer(0.1, cancel_event.set).start()
+    started = time.monotonic()
+    assert deadline.wait(10)
+    assert time.monotonic() - started < 5
+    with pytest.raises(AuditTimeout) as error:
+        deadline.check()
+    assert error.value.cancelled
+
+def test_watchdog_calls_on_expire_once():
+    calls = []
+    expired = threading.Event()
+
+    def on_expire():
+        calls.append(time.monotonic())
+        expired.set()
+
+    deadline = AuditDeadline(0.2, {'load': 1})
+    deadline.start_phase('load')
+    deadline.watch(on_expire, poll_interval=0.05)
+    assert expired.wait(5)
+    # Un appel à 'check' après le chien de garde n'appelle pas 'on_expire' une seconde fois
+    with pytest.raises(AuditTimeout):
+        deadline.check()
+    deadline.finish()
+    assert len(calls) == 1
+
+def test_finish_stops_watchdog():
+    calls = []
+    deadline = AuditDeadline(0.3, {'load': 1})
+    deadline.start_phase('load')
+    deadline.watch(lambda: calls.append(True), poll_interval=0.05)
+    deadline.finish()
+    time.sleep(0.5)
+    assert calls == []
@@ -0,0 +1,81 @@
+# tests/test_dom_tracker.py
+
+from modules.dom_analyzer import detect_technologies, detect_technologies_from_nodes, parse_dom
+from modules.dom_tracker import _DRAIN_SCRIPT, _INSTALL_SCRIPT, DomTracker
+
+class FakePage:
+    """
+    Navigateur minimal simulant le script de suivi injecté dans la page.
+    """
+
+    def __init__(self, initial_nodes):
+        self.nodes = list(initial_nodes)
+        self.pending = None
+
+    def execute_script(self, script):
+        if script == _INSTALL_SCRIPT:
+            if self.pending is not None:
+                return False
+            self.pending = [dict(node, type='added') for node in self.nodes]
+            return True
+        if script == _DRAIN_SCRIPT:
+            if self.pending is None:
+                return None
+            changes, self.pending = self.pending, []
+            return changes
+        raise AssertionError('script inattendu')
+
+    def mutate(self, change):
+        self.pending.append(change)
+
+    def navigate(self, nodes):
+        # Nouveau document : le script de suivi n'existe plus
+        self.nodes = list(nodes)
+        self.pending = None
+
+def script(src, change_type='added'):
+    return {'type': change_type, 'tag': 'script', 'attrs': {'src': src}}
+
+def test_existing_tags_are_not_reported():
+    page = FakePage([script('/react.16.0.js')])
+    tracker = DomTracker(page)
+    tracker.install()
+    summary = tracker.record_step('idle')
+    assert summary['added'] == [] and not summary['new_document']
+
+def test_step_reports_only_deltas():
+    page = FakePage([script('/app.js')])
+    tracker = DomTracker(page)
+    tracker.install()
+    page.mutate(script('https://cdn.example.com/vue.js?version=3.4.0'))
+    page.mutate(script('/app.js', 'removed'))
+    summary = tracker.record_step('open_menu')
+    assert summary['new_technologies'] == {'Vue.js': '3.4.0'}
+    assert len(summary['added']) == 1 and len(summary['removed']) == 1
+    # Technologie déjà connue : non signalée à nouveau
+    page.mutate(script('https://cdn.example.com/vue.js?version=3.4.0'))
+    assert tracker.record_step('again')['new_technologies'] == {}
+    assert tracker.technologies == {'Vue.js': '3.4.0'}
+    assert [step['step'] for step in tracker.steps] == ['open_menu', 'again']
+
+def test_new_document_reinstalls_tracker():
+    page = FakePage([])
+    tracker = DomTracker(page)
+    tracker.install()
+    page.navigate([{'tag': 'link', 'attrs': {'href': '/bootstrap.min.css?v=5.3.2', 'rel': 'stylesheet'}}])
+    summary = tracker.record_step('navigate')
+    assert summary['new_document']
+    assert summary['new_technologies'] == {'Bootstrap': '5.3.2'}
+
+def test_node_detection_matches_full_document():
+    html = (
+        '<html><head><meta name="generator" content="WordPress 6.4">'
+        '<link rel="stylesheet" href="/tailwind.css"><script src="/angular.min.js"></script></head></html>'
+    )
+    soup = parse_dom(html)
+    nodes = [
+        {'tag': element.name, 'attrs': {name: ' '.join(value) if isinstance(value, list) else value
+                                        for name, value in element.attrs.items()}}
+        for element in soup.find_all(['script', 'link', 'meta'])
+    ]
+    assert detect_technologies_from_nodes(nodes) == detect_technologies(soup)
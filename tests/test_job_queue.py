@@ -0,0 +1,162 @@
+# tests/test_job_queue.py
+
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import pytest
+
+from modules.job_queue import JobQueue, SQLiteJobQueue
+
+LEASE = 0.3
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+@pytest.fixture
+def job_queue(db_path):
+    return SQLiteJobQueue(db_path, backoff_base=0.2, backoff_max=0.5)
+
+def get_job(db_path, job_id):
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    try:
+        return dict(connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+    finally:
+        connection.close()
+
+def claim_and_crash(db_path, lease_seconds):
+    """
+    Réclame une tâche puis s'arrête brutalement, sans la terminer ni la libérer.
+    """
+    SQLiteJobQueue(db_path).claim('crashed', lease_seconds)
+    os._exit(1)
+
+def claim_all(db_path, worker_id, results):
+    job_queue = SQLiteJobQueue(db_path)
+    while True:
+        job = job_queue.claim(worker_id, 30)
+        if job is None:
+            return
+        results.put(job['id'])
+        job_queue.complete(job['id'], worker_id, {'worker': worker_id})
+
+def test_job_queue_is_abstract():
+    with pytest.raises(TypeError):
+        JobQueue()
+
+def test_claim_order_by_priority(job_queue):
+    low = job_queue.enqueue({'url': 'https://low.example'})
+    high = job_queue.enqueue({'url': 'https://high.example'}, priority=5)
+    assert job_queue.claim('w1', LEASE)['id'] == high
+    job = job_queue.claim('w1', LEASE)
+    assert job == {'id': low, 'payload': {'url': 'https://low.example'}, 'attempts': 1, 'max_attempts': 3}
+    assert job_queue.claim('w1', LEASE) is None
+
+def test_expired_lease_is_taken_over(job_queue):
+    job_id = job_queue.enqueue({'url': 'https://example.com'})
+    assert job_queue.claim('w1', LEASE)['id'] == job_id
+    # Bail en cours : la tâche n'est pas disponible
+    assert job_queue.claim('w2', LEASE) is None
+    time.sleep(LEASE + 0.1)
+    job = job_queue.claim('w2', LEASE)
+    assert job['id'] == job_id
+    assert job['attempts'] == 2
+    # L'ancien détenteur a perdu le bail
+    assert not job_queue.heartbeat(job_id, 'w1', LEASE)
+    assert not job_queue.complete(job_id, 'w1', {})
+    assert not job_queue.fail(job_id, 'w1', 'erreur')
+    assert job_queue.complete(job_id, 'w2', {'ok': True})
+    assert job_queue.stats() == {'done': 1}
+
+def test_heartbeat_extends_lease(job_queue):
+    job_id = job_queue.enqueue({})
+    job_queue.claim('w1', LEASE)
+    for _ in range(3):
+        time.sleep(LEASE / 2)
+        assert job_queue.heartbeat(job_id, 'w1', LEASE)
+    assert job_queue.claim('w2', LEASE) is None
+
+def test_fail_retries_with_backoff(job_queue, db_path):
+    job_id = job_queue.enqueue({})
+    job_queue.claim('w1', LEASE)
+    before = time.time()
+    assert job_queue.fail(job_id, 'w1', 'première erreur')
+    job = get_job(db_path, job_id)
+    assert job['status'] == 'pending'
+    assert job['error'] == 'première erreur'
+    assert job['available_at'] - before == pytest.approx(0.2, abs=0.05)
+    # Délai de nouvelle tentative en cours
+    assert job_queue.claim('w1', LEASE) is None
+    time.sleep(0.25)
+    assert job_queue.claim('w1', LEASE)['attempts'] == 2
+    # Délai doublé à chaque tentative, dans la limite de backoff_max
+    before = time.time()
+    job_queue.fail(job_id, 'w1', 'deuxième erreur')
+    assert get_job(db_path, job_id)['available_at'] - before == pytest.approx(0.4, abs=0.05)
+
+def test_backoff_is_capped(db_path):
+    job_queue = SQLiteJobQueue(db_path, backoff_base=10, backoff_max=15)
+    job_id = job_queue.enqueue({}, max_attempts=5)
+    with sqlite3.connect(db_path) as connection:
+        connection.execute('UPDATE jobs SET attempts = 3 WHERE id = ?', (job_id,))
+    job_queue.claim('w1', LEASE)
+    before = time.time()
+    job_queue.fail(job_id, 'w1', 'erreur')
+    assert get_job(db_path, job_id)['available_at'] - before == pytest.approx(15, abs=0.1)
+
+def test_fail_after_max_attempts(job_queue, db_path):
+    job_id = job_queue.enqueue({}, max_attempts=2)
+    job_queue.claim('w1', LEASE)
+    job_queue.fail(job_id, 'w1', 'erreur 1')
+    time.sleep(0.25)
+    assert job_queue.claim('w1', LEASE)['attempts'] == 2
+    job_queue.fail(job_id, 'w1', 'erreur 2')
+    assert get_job(db_path, job_id)['status'] == 'failed'
+    assert job_queue.claim('w1', LEASE) is None
+    assert job_queue.stats() == {'failed': 1}
+
+def test_expired_lease_after_max_attempts(job_queue, db_path):
+    job_id = job_queue.enqueue({}, max_attempts=1)
+    job_queue.claim('w1', LEASE)
+    time.sleep(LEASE + 0.1)
+    assert job_queue.claim('w2', LEASE) is None
+    job = get_job(db_path, job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Bail expiré'
+
+def test_crashed_worker_job_is_recovered(job_queue, db_path):
+    context = multiprocessing.get_context('spawn')
+    job_id = job_queue.enqueue({'url': 'https://example.com'})
+    process = context.Process(target=claim_and_crash, args=(db_path, LEASE))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 1
+    job = get_job(db_path, job_id)
+    assert job['status'] == 'running'
+    assert job['lease_owner'] == 'crashed'
+
+    time.sleep(max(0, job['lease_expires'] - time.time()) + 0.1)
+    job = job_queue.claim('w2', LEASE)
+    assert job['id'] == job_id
+    assert job['attempts'] == 2
+    assert job_queue.complete(job_id, 'w2', {})
+
+def test_concurrent_workers_claim_each_job_once(job_queue, db_path):
+    context = multiprocessing.get_context('spawn')
+    job_ids = {job_queue.enqueue({'index': index}) for index in range(40)}
+    results = context.Queue()
+    processes = [
+        context.Process(target=claim_all, args=(db_path, f'w{index}', results))
+        for index in range(4)
+    ]
+    for process in processes:
+        process.start()
+    claimed = [results.get(timeout=60) for _ in job_ids]
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    assert sorted(claimed) == sorted(job_ids)
+    assert job_queue.stats() == {'done': len(job_ids)}
@@ -0,0 +1,95 @@
+# tests/test_log_config.py
+
+import io
+import json
+import logging
+
+import pytest
+
+from modules.log_config import (
+    EventRateLimiter, JsonLinesFormatter, ProgressCounter, log_event, setup_logging, stop_logging
+)
+
+@pytest.fixture
+def root_logger():
+    """
+    Restaure la configuration du logger racine modifiée par setup_logging.
+    """
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def make_record(event=None, message='message'):
+    record = logging.LogRecord('root', logging.INFO, __file__, 1, message, None, None)
+    if event is not None:
+        record.event = event
+        record.event_data = {}
+    return record
+
+def test_other_records_are_not_limited():
+    limiter = EventRateLimiter(rate=1, burst=1)
+    assert all(limiter.filter(make_record()) for _ in range(100))
+    assert all(limiter.filter(make_record('finished')) for _ in range(100))
+
+def test_burst_then_rate_limit():
+    limiter = EventRateLimiter(rate=0.001, burst=3)
+    kept = [limiter.filter(make_record('request')) for _ in range(10)]
+    assert kept == [True] * 3 + [False] * 7
+    assert limiter.dropped == {'request': 7}
+    # Chaque type d'événement dispose de son propre seau
+    assert limiter.filter(make_record('blocked'))
+
+def test_skipped_events_reported_on_next_kept():
+    limiter = EventRateLimiter(rate=0, sample_every=4)
+    records = [make_record('request', f'requête {index}') for index in range(5)]
+    kept = [record for record in records if limiter.filter(record)]
+    assert [record.getMessage() for record in kept] == [
+        'requête 0', 'requête 4 (3 événement(s) similaire(s) omis)'
+    ]
+    assert kept[1].skipped == 3
+
+def test_json_lines_format():
+    record = make_record('request', 'Nouvelle requête capturée : https://example.com/')
+    record.event_data = {'url': 'https://example.com/', 'status_code': 200}
+    entry = json.loads(JsonLinesFormatter().format(record))
+    assert entry['event'] == 'request'
+    assert entry['data'] == {'url': 'https://example.com/', 'status_code': 200}
+    assert entry['message'] == 'Nouvelle requête capturée : https://example.com/'
+
+def test_setup_logging_writes_through_listener(root_logger, tmp_path):
+    log_file = tmp_path / 'audit.jsonl'
+    limiter = setup_logging(level='DEBUG', log_file=str(log_file), quiet=True, request_rate=0.001, request_burst=2)
+    for index in range(5):
+        log_event('request', "Nouvelle requête capturée : %s", f'https://example.com/{index}',
+                  url=f'https://example.com/{index}')
+    logging.info('Audit terminé.')
+    stop_logging()
+    entries = [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+    assert [entry.get('event') for entry in entries] == ['request', 'request', None]
+    assert entries[0]['message'] == 'Nouvelle requête capturée : https://example.com/0'
+    assert limiter.dropped == {'request': 3}
+
+def test_message_not_formatted_when_level_disabled(root_logger, tmp_path):
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError('message mis en forme')
+
+    setup_logging(level='INFO', log_file=str(tmp_path / 'audit.jsonl'))
+    log_event('blocked', "Requête bloquée : %s", Unformattable(), level=logging.DEBUG)
+
+def test_progress_counter():
+    stream = io.StringIO()
+    counter = ProgressCounter('Requêtes capturées', interval=0, enabled=True, stream=stream)
+    for _ in range(3):
+        counter.increment()
+    counter.close()
+    assert stream.getvalue().endswith('\rRequêtes capturées : 3\n')
+    disabled = io.StringIO()
+    ProgressCounter('Requêtes', enabled=False, stream=disabled).increment()
+    assert disabled.getvalue() == ''
@@ -0,0 +1,78 @@
+# tests/test_page_settle.py
+
+import time
+
+import pytest
+
+from modules.deadline import AuditDeadline, AuditTimeout
+from modules.page_settle import NetworkActivity, count_pending_requests, wait_for_page_settle
+
+class FakeDriver:
+    """
+    Navigateur minimal : suivi de l'activité réseau et document chargé.
+    """
+
+    def __init__(self):
+        self.network_activity = NetworkActivity()
+        self.ready_state = 'complete'
+
+    def execute_script(self, script):
+        return self.ready_state
+
+def test_requests_pending_until_their_response(make_request, make_response):
+    activity = NetworkActivity()
+    requests = [make_request(f'https://example.com/api/{index}') for index in range(5)]
+    for request in requests:
+        activity.request_interceptor(request)
+    # L'intercepteur de réponses reçoit un nouvel objet Request (sans identifiant)
+    activity.response_interceptor(make_request('https://example.com/api/0'), make_response())
+    assert activity.snapshot(10000) == (5, 4)
+    for request in requests[1:]:
+        activity.response_interceptor(make_request(request.url), make_response())
+    assert activity.snapshot(10000) == (5, 0)
+
+def test_identical_requests_are_counted_separately(make_request, make_response):
+    activity = NetworkActivity()
+    for _ in range(3):
+        activity.request_interceptor(make_request('https://example.com/poll'))
+    activity.request_interceptor(make_request('https://example.com/poll', method='POST'))
+    activity.response_interceptor(make_request('https://example.com/poll'), make_response())
+    assert activity.snapshot(10000) == (4, 3)
+    # Réponse sans requête connue (requête déjà oubliée) : ignorée
+    activity.response_interceptor(make_request('https://example.com/other'), make_response())
+    assert activity.snapshot(10000) == (4, 3)
+
+def test_long_requests_are_forgotten(make_request):
+    activity = NetworkActivity()
+    activity.request_interceptor(make_request('https://example.com/long-poll'))
+    time.sleep(0.15)
+    activity.request_interceptor(make_request('https://example.com/api'))
+    assert activity.snapshot(100) == (2, 1)
+
+def test_settle_waits_for_pending_request(make_request, make_response):
+    driver = FakeDriver()
+    request = make_request('https://example.com/slow')
+    driver.network_activity.request_interceptor(request)
+    options = {'idle_ms': 100, 'timeout': 0.4, 'poll_interval': 0.02}
+    # Requête lente toujours en cours : la page n'est pas stable
+    assert not wait_for_page_settle(driver, options)
+    driver.network_activity.response_interceptor(make_request(request.url), make_response())
+    assert count_pending_requests(driver, 10000) == (1, 0)
+    started = time.monotonic()
+    assert wait_for_page_settle(driver, options)
+    assert time.monotonic() - started >= 0.1
+
+def test_settle_waits_for_document(make_request):
+    driver = FakeDriver()
+    driver.ready_state = 'loading'
+    assert not wait_for_page_settle(driver, {'idle_ms': 50, 'timeout': 0.2, 'poll_interval': 0.02})
+
+def test_settle_bounded_by_audit_deadline(make_request):
+    driver = FakeDriver()
+    driver.network_activity.request_interceptor(make_request('https://example.com/slow'))
+    deadline = AuditDeadline(0.2, {'load': 1})
+    deadline.start_phase('load')
+    started = time.monotonic()
+    with pytest.raises(AuditTimeout):
+        wait_for_page_settle(driver, {'timeout': 30, 'poll_interval': 0.02}, deadline)
+    assert time.monotonic() - started < 1
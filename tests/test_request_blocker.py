@@ -0,0 +1,91 @@
+# tests/test_request_blocker.py
+
+import json
+
+import pytest
+
+from modules.request_blocker import (
+    BLOCKED_HEADER, DEFAULT_BLOCKING_POLICY, BlockingPolicy, get_blocked_reason, get_resource_type
+)
+
+PAGE_URL = 'https://www.example.com/'
+
+@pytest.fixture
+def policy():
+    return BlockingPolicy.from_dict(DEFAULT_BLOCKING_POLICY)
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Sec-Fetch-Dest': 'document'}, 'document'),
+    ({'Sec-Fetch-Dest': 'iframe'}, 'document'),
+    ({'Sec-Fetch-Dest': 'script'}, 'script'),
+    ({'Sec-Fetch-Dest': 'style'}, 'stylesheet'),
+    ({'Sec-Fetch-Dest': 'image'}, 'image'),
+    ({'Sec-Fetch-Dest': 'font'}, 'font'),
+    ({}, 'other')
+])
+def test_resource_type_from_fetch_dest(make_request, headers, expected):
+    assert get_resource_type(make_request('https://example.com/x', headers=headers)) == expected
+
+def test_beacon_detection(make_request):
+    beacon = {'Sec-Fetch-Dest': 'empty', 'Sec-Fetch-Mode': 'no-cors', 'Content-Type': 'text/plain;charset=UTF-8'}
+    assert get_resource_type(make_request('https://example.com/b', 'POST', beacon)) == 'beacon'
+    ping = dict(beacon, **{'Content-Type': 'text/ping'})
+    assert get_resource_type(make_request('https://example.com/b', 'POST', ping)) == 'beacon'
+    # fetch() en text/plain : appel d'API, pas une balise
+    api_call = dict(beacon, **{'Sec-Fetch-Mode': 'cors'})
+    assert get_resource_type(make_request('https://example.com/api', 'POST', api_call)) == 'xhr'
+    assert get_resource_type(make_request('https://example.com/b', 'GET', beacon)) == 'xhr'
+
+def test_default_policy_reasons(policy, make_request):
+    first_party = 'example.com'
+    image = make_request('https://www.example.com/logo', headers={'Sec-Fetch-Dest': 'image'})
+    assert policy.get_block_reason(image, first_party) == 'type:image'
+    icon = make_request('https://www.example.com/favicon.ICO?v=2')
+    assert policy.get_block_reason(icon, first_party) == 'extension:.ico'
+    tracker = make_request('https://www.google-analytics.com/g/collect?v=2', headers={'Sec-Fetch-Dest': 'empty'})
+    assert policy.get_block_reason(tracker, first_party).startswith('pattern:')
+    script = make_request('https://cdn.other.net/app.js', headers={'Sec-Fetch-Dest': 'script'})
+    assert policy.get_block_reason(script, first_party) is None
+    # Le document n'est jamais bloqué, même s'il correspond à une règle
+    document = make_request('https://www.example.com/pixel.gif', headers={'Sec-Fetch-Dest': 'document'})
+    assert policy.get_block_reason(document, first_party) is None
+
+@pytest.mark.parametrize('url, fetch_dest', [
+    ('https://www.example.com/src/main.ts', 'script'),
+    ('https://www.example.com/pixel.js', 'script'),
+    ('https://www.example.com/fonts.woff2.css', 'style')
+])
+def test_scripts_and_stylesheets_are_never_blocked(url, fetch_dest, make_request):
+    policy = BlockingPolicy.from_dict(dict(DEFAULT_BLOCKING_POLICY, block_third_party=True))
+    request = make_request(url, headers={'Sec-Fetch-Dest': fetch_dest})
+    assert policy.get_block_reason(request, 'other.com') is None
+
+def test_video_segment_is_blocked(policy, make_request):
+    segment = make_request('https://www.example.com/stream/segment1.ts')
+    assert policy.get_block_reason(segment, 'example.com') == 'extension:.ts'
+
+def test_third_party_blocking(make_request):
+    policy = BlockingPolicy(block_third_party=True, allowed_domains=['cdn.net'])
+    assert policy.get_block_reason(make_request('https://static.example.com/a.js'), 'example.com') is None
+    assert policy.get_block_reason(make_request('https://code.cdn.net/a.js'), 'example.com') is None
+    assert policy.get_block_reason(make_request('https://ads.tracker.io/a.js'), 'example.com') == 'third-party:tracker.io'
+
+def test_interceptor_answers_blocked_requests(policy, make_request):
+    interceptor = policy.create_interceptor(PAGE_URL)
+    image = make_request('https://www.example.com/photo.jpg')
+    interceptor(image)
+    assert image.response.status_code == 204
+    assert get_blocked_reason(image.response) == 'extension:.jpg'
+    assert image.response.headers.get(BLOCKED_HEADER) == 'extension:.jpg'
+
+    script = make_request('https://www.example.com/main.ts', headers={'Sec-Fetch-Dest': 'script'})
+    interceptor(script)
+    assert script.response is None
+    assert policy.blocked_count == 1
+
+def test_policy_round_trip(policy, tmp_path):
+    path = tmp_path / 'policy.json'
+    path.write_text(json.dumps(policy.to_dict()), encoding='utf-8')
+    assert BlockingPolicy.from_file(str(path)).to_dict() == policy.to_dict()
+    with pytest.raises(FileNotFoundError):
+        BlockingPolicy.from_file(str(tmp_path / 'missing.json'))
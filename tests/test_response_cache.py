@@ -0,0 +1,126 @@
+# tests/test_response_cache.py
+
+import threading
+import time
+
+from modules.response_cache import CACHE_HEADER, ResponseCache, is_request_shareable, is_response_shareable
+
+SCRIPT_URL = 'https://cdn.example.com/app.js'
+
+def script_headers(**headers):
+    return {'Sec-Fetch-Dest': 'script', **headers}
+
+def test_response_served_to_other_browser(make_request, make_response):
+    cache = ResponseCache()
+    desktop_request, desktop_response = cache.create_interceptors('desktop')
+    mobile_request, _ = cache.create_interceptors('mobile')
+
+    request = make_request(SCRIPT_URL, headers=script_headers())
+    desktop_request(request)
+    assert request.response is None
+    desktop_response(request, make_response(body=b'console.log(1)', headers={'Content-Type': 'text/javascript'}))
+
+    replayed = make_request(SCRIPT_URL, headers=script_headers())
+    mobile_request(replayed)
+    assert replayed.response.status_code == 200
+    assert replayed.response.body == b'console.log(1)'
+    assert replayed.response.headers.get(CACHE_HEADER) == 'hit'
+    # La réponse servie depuis le cache n'est pas réenregistrée
+    desktop_response(replayed, replayed.response)
+    assert cache.stats == {'hits': 1, 'misses': 1, 'stored': 1}
+
+def test_documents_are_never_shared(make_request, make_response):
+    cache = ResponseCache()
+    request = make_request('https://example.com/', headers={'Sec-Fetch-Dest': 'document'})
+    cache.request_interceptor(request, 'desktop')
+    cache.response_interceptor(request, make_response(body=b'<html>'))
+
+    other = make_request('https://example.com/', headers={'Sec-Fetch-Dest': 'document'})
+    cache.request_interceptor(other, 'mobile')
+    assert other.response is None
+    assert cache.stats['stored'] == 0
+
+def test_navigation_without_fetch_metadata_is_not_shared(make_request):
+    # Origine non sécurisée (http://) : pas d'en-tête Sec-Fetch-Dest
+    navigation = make_request('http://example.com/', headers={'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'})
+    assert not is_request_shareable(navigation)
+    assert is_request_shareable(make_request('http://example.com/app.js', headers={'Accept': '*/*'}))
+
+def test_cache_hit_does_not_skip_other_responses(make_request, make_response):
+    cache = ResponseCache(wait_timeout=5)
+    first = make_request(SCRIPT_URL, headers=script_headers())
+    cache.request_interceptor(first, 'desktop')
+    cache.response_interceptor(first, make_response(body=b'app'))
+    hit = make_request(SCRIPT_URL, headers=script_headers())
+    cache.request_interceptor(hit, 'mobile')
+    cache.response_interceptor(hit, hit.response)
+
+    # Réponse réseau suivante (autre URL) : enregistrée et transmise aux navigateurs en attente
+    other_url = 'https://cdn.example.com/vendor.js'
+    network = make_request(other_url, headers=script_headers())
+    cache.request_interceptor(network, 'desktop')
+    waiting = make_request(other_url, headers=script_headers())
+    waiter = threading.Thread(target=cache.request_interceptor, args=(waiting, 'mobile'))
+    waiter.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    cache.response_interceptor(make_request(other_url, headers=script_headers()), make_response(body=b'vendor'))
+    waiter.join(5)
+    assert time.monotonic() - started < 1
+    assert waiting.response.body == b'vendor'
+    assert cache.stats == {'hits': 2, 'misses': 2, 'stored': 2}
+
+def test_unshareable_responses(make_request, make_response):
+    request = make_request(SCRIPT_URL, headers=script_headers())
+    assert is_response_shareable(request, make_response())
+    assert not is_response_shareable(request, make_response(status_code=500))
+    assert not is_response_shareable(request, make_response(headers={'Set-Cookie': 'id=1'}))
+    assert not is_response_shareable(request, make_response(headers={'Cache-Control': 'private, no-store'}))
+    assert not is_response_shareable(request, make_response(headers={'Vary': '*'}))
+    post = make_request(SCRIPT_URL, method='POST', headers=script_headers())
+    assert not is_response_shareable(post, make_response())
+
+def test_vary_headers_are_respected(make_request, make_response):
+    cache = ResponseCache()
+    request = make_request(SCRIPT_URL, headers=script_headers(**{'Accept-Language': 'fr'}))
+    cache.request_interceptor(request, 'desktop')
+    cache.response_interceptor(request, make_response(headers={'Vary': 'Accept-Language'}))
+
+    english = make_request(SCRIPT_URL, headers=script_headers(**{'Accept-Language': 'en'}))
+    cache.request_interceptor(english, 'mobile')
+    assert english.response is None
+    french = make_request(SCRIPT_URL, headers=script_headers(**{'Accept-Language': 'fr'}))
+    cache.request_interceptor(french, 'tablet')
+    assert french.response is not None
+
+def test_waits_for_identical_request_of_other_browser(make_request, make_response):
+    cache = ResponseCache(wait_timeout=5)
+    first = make_request(SCRIPT_URL, headers=script_headers())
+    cache.request_interceptor(first, 'desktop')
+
+    second = make_request(SCRIPT_URL, headers=script_headers())
+    waiter = threading.Thread(target=cache.request_interceptor, args=(second, 'mobile'))
+    waiter.start()
+    time.sleep(0.1)
+    assert waiter.is_alive()
+    cache.response_interceptor(first, make_response(body=b'shared'))
+    waiter.join(5)
+    assert second.response.body == b'shared'
+
+def test_same_browser_does_not_wait_for_itself(make_request):
+    cache = ResponseCache(wait_timeout=5)
+    cache.request_interceptor(make_request(SCRIPT_URL, headers=script_headers()), 'desktop')
+    started = time.monotonic()
+    duplicate = make_request(SCRIPT_URL, headers=script_headers())
+    cache.request_interceptor(duplicate, 'desktop')
+    assert time.monotonic() - started < 0.5
+    assert duplicate.response is None
+
+def test_wait_is_bounded(make_request):
+    cache = ResponseCache(wait_timeout=0.2)
+    cache.request_interceptor(make_request(SCRIPT_URL, headers=script_headers()), 'desktop')
+    started = time.monotonic()
+    other = make_request(SCRIPT_URL, headers=script_headers())
+    cache.request_interceptor(other, 'mobile')
+    assert time.monotonic() - started < 1
+    assert other.response is None
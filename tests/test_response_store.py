@@ -0,0 +1,87 @@
+# tests/test_response_store.py
+
+import pytest
+
+from modules.request_blocker import BLOCKED_HEADER
+from modules.response_store import REPLAY_MISS_HEADER, ResponseStore, get_store_dir
+
+PAGE_URL = 'https://example.com/'
+
+@pytest.fixture
+def store_dir(tmp_path):
+    return str(tmp_path / 'recording')
+
+def record(store, make_request, make_response, url, response_body, profile=None, **kwargs):
+    _, response_interceptor = store.create_interceptors(profile)
+    response_interceptor(make_request(url, **kwargs), make_response(body=response_body, headers={'Content-Type': 'text/html'}))
+
+def replay(store, make_request, url, profile=None, **kwargs):
+    request_interceptor, _ = store.create_interceptors(profile)
+    request = make_request(url, **kwargs)
+    request_interceptor(request)
+    return request.response
+
+def test_record_and_replay(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    record(store, make_request, make_response, PAGE_URL, b'<html>')
+    # Réponse identique : enregistrée une seule fois
+    record(store, make_request, make_response, PAGE_URL, b'<html>')
+    assert store.stats['recorded'] == 1
+    assert get_store_dir(store_dir) == store_dir
+
+    replayed = ResponseStore(store_dir).load()
+    response = replay(replayed, make_request, PAGE_URL)
+    assert response.status_code == 200
+    assert response.body == b'<html>'
+    assert response.headers.get('Content-Type') == 'text/html'
+    assert replayed.stats['replayed'] == 1
+
+def test_missing_recording(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ResponseStore(str(tmp_path / 'missing')).load()
+
+def test_replay_miss(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    record(store, make_request, make_response, PAGE_URL, b'<html>')
+    response = replay(store, make_request, 'https://example.com/unknown.js')
+    assert response.status_code == 504
+    assert response.headers.get(REPLAY_MISS_HEADER) == 'miss'
+    assert store.stats['missing'] == 1
+
+def test_successive_responses_replayed_in_order(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    for body in (b'1', b'2'):
+        record(store, make_request, make_response, 'https://example.com/api/counter', body)
+    bodies = [replay(store, make_request, 'https://example.com/api/counter').body for _ in range(3)]
+    # La dernière réponse est répétée
+    assert bodies == [b'1', b'2', b'2']
+
+def test_request_body_is_part_of_the_key(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    record(store, make_request, make_response, 'https://example.com/api', b'a', method='POST', body=b'{"q": "a"}')
+    record(store, make_request, make_response, 'https://example.com/api', b'b', method='POST', body=b'{"q": "b"}')
+    assert replay(store, make_request, 'https://example.com/api', method='POST', body=b'{"q": "b"}').body == b'b'
+
+def test_cache_busting_query_falls_back_to_path(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    record(store, make_request, make_response, 'https://example.com/app.js?v=1', b'app')
+    assert replay(store, make_request, 'https://example.com/app.js?v=2').body == b'app'
+
+def test_each_profile_replays_its_own_responses(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    record(store, make_request, make_response, PAGE_URL, b'desktop', profile='desktop')
+    record(store, make_request, make_response, PAGE_URL, b'mobile', profile='mobile')
+
+    replayed = ResponseStore(store_dir).load()
+    # Le profil mobile demande le document en premier : il reçoit quand même le sien
+    assert replay(replayed, make_request, PAGE_URL, profile='mobile').body == b'mobile'
+    assert replay(replayed, make_request, PAGE_URL, profile='desktop').body == b'desktop'
+    # Profil absent de l'enregistrement : une réponse enregistrée reste servie
+    assert replay(replayed, make_request, PAGE_URL, profile='tablet').body in (b'desktop', b'mobile')
+
+def test_blocked_responses_are_not_recorded(store_dir, make_request, make_response):
+    store = ResponseStore(store_dir)
+    _, response_interceptor = store.create_interceptors()
+    response_interceptor(make_request('https://example.com/logo.png'),
+                         make_response(204, headers={BLOCKED_HEADER: 'extension:.png'}))
+    assert store.stats['recorded'] == 0